@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_kb import make_group_messages
+from tgtaps_support_bot.infrastructure.bot.anti_spam import GroupAntiSpam
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import ensure_db
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import (
+    close_connection_manager,
+    open_connection_manager,
+    write_connection,
+)
+from tgtaps_support_bot.infrastructure.persistence.write_behind import WriteBehindQueue
+
+MODES = ("sqlite", "memory", "memory+persist")
+
+
+class SQLiteAntiSpam(GroupAntiSpam):
+    # The previous implementation, kept as the baseline: four statements and a commit per message.
+    async def should_answer(self, chat_id: int, question_norm: str) -> bool:
+        now = int(time.time())
+        dedup_key = self._dedup_key(chat_id, question_norm)
+        async with write_connection(self.sqlite_path) as db:
+            await db.execute("DELETE FROM group_question_dedup WHERE expires_at_epoch < ?", (now,))
+            exists = await db.execute_fetchall(
+                "SELECT dedup_key FROM group_question_dedup WHERE dedup_key = ?",
+                (dedup_key,),
+            )
+            if exists:
+                return False
+            await db.execute(
+                "INSERT INTO group_question_dedup (dedup_key, chat_id, question_norm, expires_at_epoch) "
+                "VALUES (?, ?, ?, ?)",
+                (dedup_key, chat_id, question_norm, now + self.ttl_sec),
+            )
+            return True
+
+
+async def _run(mode: str, sqlite_path: str, messages: list[tuple[int, str]], concurrency: int) -> None:
+    await ensure_db(sqlite_path)
+    async with write_connection(sqlite_path) as db:
+        await db.execute("DELETE FROM group_question_dedup")
+    await open_connection_manager(sqlite_path)
+    queue = WriteBehindQueue(sqlite_path)
+    if mode == "sqlite":
+        anti_spam: GroupAntiSpam = SQLiteAntiSpam(sqlite_path, 900)
+    else:
+        anti_spam = GroupAntiSpam(sqlite_path, 900, persist=mode == "memory+persist", write_queue=queue)
+        await queue.start()
+
+    async def worker(chunk: list[tuple[int, str]]) -> int:
+        answered = 0
+        for chat_id, question in chunk:
+            answered += await anti_spam.should_answer(chat_id, question)
+        return answered
+
+    started = time.perf_counter()
+    answered = sum(await asyncio.gather(*(worker(messages[i::concurrency]) for i in range(concurrency))))
+    elapsed = time.perf_counter() - started
+    await queue.stop()
+    await close_connection_manager(sqlite_path)
+    print(f"{mode:>15}: {len(messages) / elapsed:10.0f} msg/s | answered {answered} of {len(messages)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Group anti-spam throughput: SQLite per message vs in-memory store.")
+    parser.add_argument("--messages", type=int, default=20_000, help="Group messages to check")
+    parser.add_argument("--chats", type=int, default=200, help="Distinct group chats")
+    parser.add_argument("--vocabulary", type=int, default=5_000, help="Distinct normalized questions")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent handlers")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    messages = make_group_messages(args.messages, chats=args.chats, vocabulary=args.vocabulary)
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_path = (Path(tmp) / "kb.sqlite3").as_posix()
+        for mode in args.modes:
+            asyncio.run(_run(mode, sqlite_path, messages, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
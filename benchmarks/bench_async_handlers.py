@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.synthetic_kb import make_queries, make_rows
+from tgtaps_support_bot.application.use_cases.query_resolution import (
+    resolve_private_question_async,
+)
+from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+from tgtaps_support_bot.infrastructure.search.search_executor import (
+    EXECUTOR_KINDS,
+    AsyncSearchService,
+)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def _chat(service: AsyncSearchService, queries: list[str], latencies: list[float]) -> None:
+    for query in queries:
+        started = time.perf_counter()
+        await resolve_private_question_async(
+            search_service=service,
+            question=query,
+            min_confidence=55.0,
+            ambiguity_delta=8.0,
+        )
+        # Stand-in for the reply and logging I/O that follows every search.
+        await asyncio.sleep(0.002)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def _ping(stop: asyncio.Event, latencies: list[float]) -> None:
+    # A cheap handler (e.g. /start) that only needs the event loop to be free.
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.005)
+        latencies.append((time.perf_counter() - started) * 1000 - 5.0)
+
+
+async def _run(kind: str, engine: SearchEngine, chats: int, per_chat: int, workers: int) -> None:
+    service = AsyncSearchService(engine, executor_kind=kind, max_workers=workers)
+    await service.search("warm up")
+    queries = make_queries(chats * per_chat)
+    search_latencies: list[float] = []
+    ping_latencies: list[float] = []
+    stop = asyncio.Event()
+    ping = asyncio.create_task(_ping(stop, ping_latencies))
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(_chat(service, queries[i * per_chat : (i + 1) * per_chat], search_latencies) for i in range(chats))
+    )
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ping
+    await service.close()
+    print(
+        f"{kind:>7}: {len(search_latencies) / elapsed:7.1f} q/s | "
+        f"search p50={statistics.median(search_latencies):7.1f} ms p99={_percentile(search_latencies, 0.99):7.1f} ms | "
+        f"loop lag p50={statistics.median(ping_latencies):6.1f} ms p99={_percentile(ping_latencies, 0.99):6.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Handler latency under concurrent chats per search executor.")
+    parser.add_argument("--size", type=int, default=10_000, help="Number of synthetic articles")
+    parser.add_argument("--chats", type=int, default=20, help="Concurrent chats")
+    parser.add_argument("--per-chat", type=int, default=10, help="Messages per chat")
+    parser.add_argument("--workers", type=int, default=4, help="Executor workers")
+    parser.add_argument("--kinds", nargs="+", choices=EXECUTOR_KINDS, default=list(EXECUTOR_KINDS))
+    args = parser.parse_args()
+
+    engine = SearchEngine(make_rows(args.size), candidate_budget=3000, full_scan_below=55.0, mode="batch")
+    for kind in args.kinds:
+        asyncio.run(_run(kind, engine, args.chats, args.per_chat, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from benchmarks.synthetic_kb import make_queries, make_rows
+from tgtaps_support_bot.domain.services.search_engine import SEARCH_MODES, SearchEngine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-query latency of SearchEngine.search on a synthetic KB.")
+    parser.add_argument("--size", type=int, default=10_000, help="Number of synthetic articles")
+    parser.add_argument("--queries", type=int, default=50, help="Number of queries to time")
+    parser.add_argument("--candidate-budget", type=int, default=None, help="Max articles scored per query")
+    parser.add_argument(
+        "--full-scan-below", type=float, default=55.0, help="Rescore all articles when the pruned best is lower"
+    )
+    parser.add_argument("--trigram-budget", type=int, default=0, help="Max typo candidates from the trigram index")
+    parser.add_argument("--mode", choices=SEARCH_MODES, default="loop", help="Scoring backend")
+    parser.add_argument("--workers", type=int, default=1, help="rapidfuzz worker threads for batch mode")
+    args = parser.parse_args()
+
+    rows = make_rows(args.size)
+    started = time.perf_counter()
+    engine = SearchEngine(
+        rows,
+        candidate_budget=args.candidate_budget,
+        trigram_budget=args.trigram_budget,
+        full_scan_below=args.full_scan_below,
+        mode=args.mode,
+        workers=args.workers,
+    )
+    build_ms = (time.perf_counter() - started) * 1000
+
+    timings: list[float] = []
+    for query in make_queries(args.queries):
+        started = time.perf_counter()
+        engine.search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) > 1 else timings[0]
+    print(f"mode={args.mode} articles={args.size} queries={args.queries} build_ms={build_ms:.1f}")
+    print(f"mean_ms={statistics.fmean(timings):.2f} p50_ms={statistics.median(timings):.2f} p95_ms={p95:.2f}")
+
+
+if __name__ == "__main__":
+    main()
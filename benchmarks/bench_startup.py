@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_kb import make_rows
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import ensure_db
+
+
+async def _probe(sqlite_path: str, use_snapshot: bool) -> None:
+    from tgtaps_support_bot.application.use_cases.query_resolution import (
+        resolve_private_question_async,
+    )
+    from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+    from tgtaps_support_bot.infrastructure.persistence.index_snapshot import (
+        load_or_build_index,
+        snapshot_path_for,
+    )
+    from tgtaps_support_bot.infrastructure.search.search_executor import (
+        AsyncSearchService,
+    )
+
+    await ensure_db(sqlite_path)
+    index, source = await load_or_build_index(sqlite_path, snapshot_path_for(sqlite_path) if use_snapshot else None)
+    service = AsyncSearchService(SearchEngine.from_index(index, candidate_budget=3000, full_scan_below=55.0, mode="batch"))
+    resolution = await resolve_private_question_async(
+        search_service=service,
+        question="как подключить кошелек",
+        min_confidence=55.0,
+        ambiguity_delta=8.0,
+    )
+    await service.close()
+    print(f"index={source} status={resolution.status}")
+
+
+def _seed(sqlite_path: str, size: int) -> None:
+    asyncio.run(ensure_db(sqlite_path))
+    rows = make_rows(size)
+    columns = list(rows[0])
+    with sqlite3.connect(sqlite_path) as db:
+        db.executemany(
+            f"INSERT INTO kb_articles ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [tuple(r[c] for c in columns) for r in rows],
+        )
+
+
+def _launch(sqlite_path: str, use_snapshot: bool) -> tuple[float, str]:
+    cmd = [sys.executable, "-m", "benchmarks.bench_startup", "--probe", sqlite_path]
+    if not use_snapshot:
+        cmd.append("--no-snapshot")
+    started = time.perf_counter()
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout.strip()
+    return (time.perf_counter() - started) * 1000, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process launch to first answered question, with and without snapshot.")
+    parser.add_argument("--size", type=int, default=50_000, help="Number of synthetic articles")
+    parser.add_argument("--probe", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--no-snapshot", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        asyncio.run(_probe(args.probe, not args.no_snapshot))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_path = (Path(tmp) / "kb.sqlite3").as_posix()
+        _seed(sqlite_path, args.size)
+        for label, use_snapshot in (("no snapshot", False), ("cold, writes snapshot", True), ("snapshot", True)):
+            elapsed, out = _launch(sqlite_path, use_snapshot)
+            print(f"{label:>22}: {elapsed:8.1f} ms  ({out})")
+
+
+if __name__ == "__main__":
+    main()
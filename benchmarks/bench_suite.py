@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections import Counter
+from datetime import UTC, datetime
+from pathlib import Path
+
+from benchmarks.synthetic_kb import ROOT, make_queries, make_rows
+from config.env.settings import get_settings
+from tgtaps_support_bot.application.use_cases.query_resolution import (
+    resolve_private_question,
+)
+from tgtaps_support_bot.domain.services.search_cache import SearchResultCache
+from tgtaps_support_bot.domain.services.search_engine import SEARCH_MODES, SearchEngine
+
+WORKLOADS = ("synthetic", "query_logs", "exports")
+
+
+def load_query_log_questions(sqlite_path: str, limit: int) -> list[str]:
+    if not Path(sqlite_path).exists():
+        raise SystemExit(f"{sqlite_path} does not exist; pass --sqlite-path to a bot database with query_logs.")
+    with sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True) as db:
+        rows = db.execute("SELECT question FROM query_logs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    return [r[0] for r in reversed(rows)]
+
+
+def load_export_questions(export_dir: str, limit: int) -> list[str]:
+    from tgtaps_support_bot.infrastructure.parsers.chat_parser import extract_questions
+
+    return extract_questions(export_dir)[:limit]
+
+
+def _queries(args: argparse.Namespace) -> list[str]:
+    if args.workload == "query_logs":
+        queries = load_query_log_questions(args.sqlite_path, args.queries)
+    elif args.workload == "exports":
+        queries = load_export_questions(args.export_dir, args.queries)
+    else:
+        queries = make_queries(args.queries, en_share=args.en_share)
+    if not queries:
+        raise SystemExit(f"No queries found for workload {args.workload!r}")
+    return queries
+
+
+def _percentiles(timings: list[float]) -> dict[str, float]:
+    ordered = sorted(timings)
+
+    def pick(pct: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 3)
+
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def _timed(fn, queries: list[str]) -> tuple[list[float], float, list]:
+    timings: list[float] = []
+    outputs = []
+    started = time.perf_counter()
+    for query in queries:
+        t0 = time.perf_counter()
+        outputs.append(fn(query))
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings, time.perf_counter() - started, outputs
+
+
+def _allocations(fn, queries: list[str]) -> dict[str, float]:
+    # Separate pass: tracemalloc slows every allocation, so it must not skew the timings above.
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for query in queries:
+            fn(query)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib": round((peak - before) / 1024, 1), "retained_kib": round((after - before) / 1024, 1)}
+
+
+def run_size(size: int, queries: list[str], args: argparse.Namespace) -> dict:
+    rows = make_rows(size, en_share=args.en_share)
+    cache = SearchResultCache(max_entries=args.cache_size) if args.cache_size else None
+    started = time.perf_counter()
+    engine = SearchEngine(
+        rows,
+        candidate_budget=args.candidate_budget,
+        trigram_budget=args.trigram_budget,
+        full_scan_below=args.min_confidence,
+        mode=args.mode,
+        workers=args.workers,
+        cache=cache,
+    )
+    build_ms = (time.perf_counter() - started) * 1000
+
+    def search(query: str):
+        return engine.search(query)
+
+    def resolve(query: str):
+        return resolve_private_question(
+            search_engine=engine,
+            question=query,
+            min_confidence=args.min_confidence,
+            ambiguity_delta=args.ambiguity_delta,
+        )
+
+    report: dict = {"articles": size, "build_ms": round(build_ms, 1)}
+    for name, fn in (("search", search), ("resolve_private_question", resolve)):
+        if cache is not None:
+            cache.clear()
+        fn(queries[0])
+        timings, elapsed, outputs = _timed(fn, queries)
+        if name == "search":
+            distribution = Counter(results[0].reason if results else "none" for results in outputs)
+        else:
+            distribution = Counter(resolution.status for resolution in outputs)
+        if cache is not None:
+            cache.clear()
+        report[name] = {
+            "throughput_qps": round(len(queries) / elapsed, 1),
+            **_percentiles(timings),
+            "allocations": _allocations(fn, queries[: args.alloc_queries]),
+            "distribution": dict(sorted(distribution.items())),
+        }
+    return report
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _print_summary(report: dict) -> None:
+    for entry in report["results"]:
+        for name in ("search", "resolve_private_question"):
+            stats = entry[name]
+            print(
+                f"{entry['articles']:>7} {name:>24}: {stats['throughput_qps']:8.1f} q/s | "
+                f"p50={stats['p50_ms']:7.2f} p95={stats['p95_ms']:7.2f} p99={stats['p99_ms']:7.2f} ms | "
+                f"peak={stats['allocations']['peak_kib']:8.1f} KiB | {stats['distribution']}"
+            )
+
+
+def _print_diff(report: dict, baseline_path: str) -> None:
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    old = {entry["articles"]: entry for entry in baseline["results"]}
+    print(f"vs {baseline_path} ({baseline.get('revision')}):")
+    for entry in report["results"]:
+        prev = old.get(entry["articles"])
+        if prev is None:
+            continue
+        for name in ("search", "resolve_private_question"):
+            deltas = []
+            for key in ("throughput_qps", "p50_ms", "p95_ms", "p99_ms"):
+                before, after = prev[name][key], entry[name][key]
+                change = (after - before) / before * 100 if before else 0.0
+                deltas.append(f"{key}={change:+.1f}%")
+            print(f"{entry['articles']:>7} {name:>24}: " + " ".join(deltas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Search and resolution benchmarks over synthetic KBs of several sizes.")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated KB sizes")
+    parser.add_argument("--workload", choices=WORKLOADS, default="synthetic", help="Where replayed queries come from")
+    parser.add_argument(
+        "--sqlite-path", default=get_settings().sqlite_path, help="Database with query_logs for --workload query_logs"
+    )
+    parser.add_argument("--export-dir", default="data/raw_exports", help="Telegram exports for --workload exports")
+    parser.add_argument("--queries", type=int, default=500, help="Max number of queries to replay")
+    parser.add_argument("--alloc-queries", type=int, default=100, help="Queries replayed under tracemalloc")
+    parser.add_argument("--en-share", type=float, default=0.3, help="Share of English articles and synthetic queries")
+    parser.add_argument("--candidate-budget", type=int, default=3000, help="Max articles scored per query")
+    parser.add_argument("--trigram-budget", type=int, default=200, help="Max typo candidates from the trigram index")
+    parser.add_argument("--mode", choices=SEARCH_MODES, default="batch", help="Scoring backend")
+    parser.add_argument("--workers", type=int, default=1, help="rapidfuzz worker threads for batch mode")
+    parser.add_argument("--cache-size", type=int, default=0, help="Result cache entries (0 disables the cache)")
+    parser.add_argument("--min-confidence", type=float, default=55.0)
+    parser.add_argument("--ambiguity-delta", type=float, default=8.0)
+    parser.add_argument("--out", default=None, help="JSON output path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", default=None, help="Previous JSON result to print relative changes against")
+    args = parser.parse_args()
+
+    queries = _queries(args)
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    started_at = datetime.now(UTC)
+    report = {
+        "revision": _git_revision(),
+        "started_at": started_at.isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workload": args.workload,
+        "queries": len(queries),
+        "config": {
+            "mode": args.mode,
+            "workers": args.workers,
+            "candidate_budget": args.candidate_budget,
+            "trigram_budget": args.trigram_budget,
+            "cache_size": args.cache_size,
+            "en_share": args.en_share,
+            "min_confidence": args.min_confidence,
+            "ambiguity_delta": args.ambiguity_delta,
+        },
+        "results": [run_size(size, queries, args) for size in sizes],
+    }
+
+    out = Path(args.out) if args.out else ROOT / "benchmarks" / "results" / f"{started_at:%Y%m%dT%H%M%SZ}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    _print_summary(report)
+    if args.compare:
+        _print_diff(report, args.compare)
+    print(f"Saved {out}")
+
+
+if __name__ == "__main__":
+    main()
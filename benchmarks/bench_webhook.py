@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import socket
+import statistics
+import time
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.types import Message
+from aiohttp import ClientSession, web
+
+from benchmarks.synthetic_kb import make_queries
+from tgtaps_support_bot.presentation.telegram.webhook import (
+    SECRET_HEADER,
+    WebhookServer,
+)
+
+TOKEN = "42:BENCH"
+SECRET = "bench-secret"
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StandInApi:
+    # Just enough of the Bot API for polling, setWebhook and sendMessage; every call pays --api-delay-ms.
+    def __init__(self, delay_sec: float):
+        self.delay_sec = delay_sec
+        self.updates: list[dict] = []
+        self.replied_at: dict[int, float] = {}
+        self.done = asyncio.Event()
+        self.expected = 0
+        self._new_updates = asyncio.Event()
+        self._runner: web.AppRunner | None = None
+        self.base = ""
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        port = _free_port()
+        await web.TCPSite(self._runner, "127.0.0.1", port).start()
+        self.base = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+    def push(self, update: dict) -> None:
+        self.updates.append(update)
+        self._new_updates.set()
+
+    def expect(self, count: int) -> None:
+        self.replied_at.clear()
+        self.expected = count
+        self.done.clear()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        form = await request.post()
+        if method == "getupdates":
+            result = await self._get_updates(int(form.get("offset", 0)), float(form.get("timeout", 0)))
+        elif method == "sendmessage":
+            self.replied_at[int(form["text"].split(" ", 1)[0])] = time.perf_counter()
+            if len(self.replied_at) >= self.expected:
+                self.done.set()
+            chat = {"id": int(form["chat_id"]), "type": "private"}
+            result = {"message_id": 1, "date": 0, "chat": chat, "text": form["text"]}
+        elif method == "getme":
+            result = {"id": 42, "is_bot": True, "first_name": "bench", "username": "bench_bot"}
+        else:
+            result = True
+        if self.delay_sec:
+            await asyncio.sleep(self.delay_sec)
+        return web.json_response({"ok": True, "result": result})
+
+    async def _get_updates(self, offset: int, timeout: float) -> list[dict]:
+        self.updates = [u for u in self.updates if u["update_id"] >= offset]
+        if not self.updates:
+            self._new_updates.clear()
+            try:
+                await asyncio.wait_for(self._new_updates.wait(), timeout)
+            except TimeoutError:
+                return []
+        return self.updates[:100]
+
+
+def _update(update_id: int, chat_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "u"},
+            "text": text,
+        },
+    }
+
+
+def _dispatcher(handler_ms: float) -> Dispatcher:
+    router = Router()
+
+    @router.message()
+    async def echo(message: Message) -> None:
+        # Stand-in for search and logging; replies go out directly so outbox pacing does not mask the transport.
+        await asyncio.sleep(handler_ms / 1000)
+        await message.answer(message.text)
+
+    dp = Dispatcher()
+    dp.include_router(router)
+    return dp
+
+
+async def _inject(
+    api: StandInApi,
+    deliver,
+    *,
+    first_id: int,
+    count: int,
+    chats: int,
+    rate: float,
+) -> dict[int, float]:
+    api.expect(count)
+    injected_at: dict[int, float] = {}
+    pending = []
+    for i, question in enumerate(make_queries(count)):
+        update = _update(first_id + i, 1000 + i % chats, f"{first_id + i} {question}")
+        injected_at[first_id + i] = time.perf_counter()
+        pending.append(asyncio.create_task(deliver(update)))
+        if rate:
+            await asyncio.sleep(1 / rate)
+    await asyncio.gather(*pending)
+    try:
+        await asyncio.wait_for(api.done.wait(), 30)
+    except TimeoutError:
+        pass
+    return injected_at
+
+
+def _report(mode: str, api: StandInApi, injected_at: dict[int, float], acks: list[float]) -> None:
+    latencies = [(api.replied_at[i] - at) * 1000 for i, at in injected_at.items() if i in api.replied_at]
+    elapsed = max(api.replied_at.values()) - min(injected_at.values())
+    line = (
+        f"{mode:>7}: {len(latencies) / elapsed:7.1f} updates/s | "
+        f"end-to-end p50={statistics.median(latencies):7.1f} ms p95={_percentile(latencies, 0.95):7.1f} ms "
+        f"max={max(latencies):7.1f} ms | lost={len(injected_at) - len(latencies)}"
+    )
+    if acks:
+        line += f" | ack p50={statistics.median(acks):5.1f} ms p95={_percentile(acks, 0.95):5.1f} ms"
+    print(line)
+
+
+async def _bench_polling(api: StandInApi, args: argparse.Namespace) -> None:
+    bot = Bot(TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(api.base)))
+    dp = _dispatcher(args.handler_ms)
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False, polling_timeout=10))
+
+    async def deliver(update: dict) -> None:
+        api.push(update)
+
+    await _inject(api, deliver, first_id=1, count=1, chats=1, rate=0)
+    injected_at = await _inject(api, deliver, first_id=2, count=args.updates, chats=args.chats, rate=args.rate)
+    # Replies are timed on arrival; let their responses travel back before the stand-in goes away.
+    await asyncio.sleep(api.delay_sec + 0.1)
+    await dp.stop_polling()
+    await polling
+    _report("polling", api, injected_at, [])
+
+
+async def _bench_webhook(api: StandInApi, args: argparse.Namespace) -> None:
+    bot = Bot(TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(api.base)))
+    dp = _dispatcher(args.handler_ms)
+    port = _free_port()
+    server = WebhookServer(
+        bot,
+        dp,
+        url=f"http://127.0.0.1:{port}",
+        path="/webhook",
+        secret_token=SECRET,
+        host="127.0.0.1",
+        port=port,
+        max_connections=args.max_connections,
+    )
+    await server.start()
+    url = f"http://127.0.0.1:{port}/webhook"
+    acks: list[float] = []
+    # Telegram opens at most max_connections parallel deliveries to one webhook.
+    connections = asyncio.Semaphore(args.max_connections)
+
+    async with ClientSession() as http:
+
+        async def deliver(update: dict) -> None:
+            async with connections:
+                await asyncio.sleep(api.delay_sec)
+                started = time.perf_counter()
+                async with http.post(url, json=update, headers={SECRET_HEADER: SECRET}) as response:
+                    assert response.status == 200, response.status
+                acks.append((time.perf_counter() - started) * 1000)
+
+        await _inject(api, deliver, first_id=10**6, count=1, chats=1, rate=0)
+        acks.clear()
+        injected_at = await _inject(
+            api, deliver, first_id=10**6 + 1, count=args.updates, chats=args.chats, rate=args.rate
+        )
+    await server.stop()
+    _report("webhook", api, injected_at, acks)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    for mode in args.modes:
+        api = StandInApi(args.api_delay_ms / 1000)
+        await api.start()
+        try:
+            await (_bench_polling if mode == "polling" else _bench_webhook)(api, args)
+        finally:
+            await api.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Polling vs webhook transport against a local stand-in Bot API.")
+    parser.add_argument("--updates", type=int, default=2000, help="Updates to deliver")
+    parser.add_argument("--chats", type=int, default=200, help="Distinct chats the updates come from")
+    parser.add_argument("--rate", type=float, default=0.0, help="Updates per second to inject; 0 sends a burst")
+    parser.add_argument("--handler-ms", type=float, default=5.0, help="Simulated work per update")
+    parser.add_argument("--api-delay-ms", type=float, default=0.0, help="Simulated one-way latency to Telegram")
+    parser.add_argument("--max-connections", type=int, default=40, help="Parallel webhook deliveries")
+    parser.add_argument("--modes", nargs="+", choices=("polling", "webhook"), default=["polling", "webhook"])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
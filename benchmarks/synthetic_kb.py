@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from tgtaps_support_bot.domain.value_objects.text_normalization import normalize_text
+
+RU_VERBS = ("как подключить", "почему не работает", "где найти", "как настроить", "что делать если", "как удалить")
+RU_NOUNS = (
+    "кошелек",
+    "реферальную систему",
+    "задания",
+    "платежи stars",
+    "аналитику",
+    "кнопку",
+    "бота",
+    "mini app",
+    "награду",
+    "таблицу лидеров",
+)
+EN_VERBS = ("how to connect", "why does not work", "where to find", "how to set up", "how to remove")
+EN_NOUNS = ("wallet", "referral link", "daily tasks", "stars payments", "leaderboard", "webapp button", "rewards")
+CATEGORIES = ("wallet", "payments", "referrals", "tasks", "analytics", "general", "community")
+TAGS = ("ton", "wallet", "stars", "invite", "tasks", "ui", "api", "bot", "mini-app")
+
+
+def _phrase(rng: random.Random, en_share: float = 0.3) -> str:
+    if rng.random() >= en_share:
+        return f"{rng.choice(RU_VERBS)} {rng.choice(RU_NOUNS)} {rng.choice(RU_NOUNS)}"
+    return f"{rng.choice(EN_VERBS)} {rng.choice(EN_NOUNS)} {rng.choice(EN_NOUNS)}"
+
+
+def make_rows(size: int, *, seed: int = 42, en_share: float = 0.3) -> list[dict]:
+    rng = random.Random(seed)
+    rows: list[dict] = []
+    for i in range(size):
+        question = f"{_phrase(rng, en_share)} {i}"
+        aliases = [normalize_text(_phrase(rng, en_share)) for _ in range(rng.randint(0, 3))]
+        rows.append(
+            {
+                "id": f"synthetic_{i:06d}",
+                "question": question,
+                "question_norm": normalize_text(question),
+                "summary": f"Ответ для синтетической статьи {i}.",
+                "steps_json": json.dumps([f"Шаг {n}" for n in range(1, 4)], ensure_ascii=False),
+                "docs_links_json": "[]",
+                "video_links_json": "[]",
+                "category": rng.choice(CATEGORIES),
+                "tags_json": json.dumps(rng.sample(TAGS, 2), ensure_ascii=False),
+                "aliases_json": json.dumps(aliases, ensure_ascii=False),
+                "related_ids_json": "[]",
+                "answer_version": 1,
+                "status": "active" if rng.random() < 0.9 else "deprecated",
+                "valid_from": "2026-01-01T00:00:00+00:00",
+                "valid_to": None,
+                "source": "synthetic",
+                "updated_at": "2026-01-01T00:00:00+00:00",
+            }
+        )
+    return rows
+
+
+def make_queries(count: int, *, seed: int = 7, en_share: float = 0.3) -> list[str]:
+    rng = random.Random(seed)
+    suffixes = ("?", " в tgtaps?", " помогите", " в боте", " please")
+    return [_phrase(rng, en_share) + rng.choice(suffixes) for _ in range(count)]
+
+
+def make_group_messages(count: int, *, chats: int, vocabulary: int, seed: int = 7) -> list[tuple[int, str]]:
+    rng = random.Random(seed)
+    phrases = [normalize_text(_phrase(rng)) + f" {i}" for i in range(vocabulary)]
+    # Skewed like real group chatter: a few questions repeat constantly.
+    weights = [1.0 / (rank + 1) for rank in range(vocabulary)]
+    picks = rng.choices(range(vocabulary), weights=weights, k=count)
+    return [(rng.randrange(chats), phrases[q]) for q in picks]
@@ -8,15 +8,78 @@ class Settings(BaseSettings):
     bot_token: str = Field(default="", alias="BOT_TOKEN")
     bot_username: str = Field(default="your_support_bot", alias="BOT_USERNAME")
     bot_language: str = Field(default="ru", alias="BOT_LANGUAGE")
+    bot_mode: str = Field(default="polling", alias="BOT_MODE")
+    webhook_url: str = Field(default="", alias="WEBHOOK_URL")
+    webhook_path: str = Field(default="/telegram/webhook", alias="WEBHOOK_PATH")
+    webhook_secret: str = Field(default="", alias="WEBHOOK_SECRET")
+    webhook_host: str = Field(default="0.0.0.0", alias="WEBHOOK_HOST")
+    webhook_port: int = Field(default=8080, alias="WEBHOOK_PORT")
+    webhook_max_connections: int = Field(default=40, alias="WEBHOOK_MAX_CONNECTIONS")
+    webhook_max_in_flight: int = Field(default=200, alias="WEBHOOK_MAX_IN_FLIGHT")
+    webhook_drain_timeout_sec: float = Field(default=15.0, alias="WEBHOOK_DRAIN_TIMEOUT_SEC")
 
     sqlite_path: str = Field(default="data/generated/kb.sqlite3", alias="SQLITE_PATH")
+    sqlite_read_pool_size: int = Field(default=2, alias="SQLITE_READ_POOL_SIZE")
+    sqlite_cache_size_kib: int = Field(default=16384, alias="SQLITE_CACHE_SIZE_KIB")
+    sqlite_mmap_size: int = Field(default=268435456, alias="SQLITE_MMAP_SIZE")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS")
+    write_behind_batch_rows: int = Field(default=200, alias="WRITE_BEHIND_BATCH_ROWS")
+    write_behind_flush_ms: float = Field(default=250.0, alias="WRITE_BEHIND_FLUSH_MS")
+    write_behind_max_queue: int = Field(default=10000, alias="WRITE_BEHIND_MAX_QUEUE")
+    last_answer_cache_size: int = Field(default=10000, alias="LAST_ANSWER_CACHE_SIZE")
+    last_answer_flush_sec: float = Field(default=5.0, alias="LAST_ANSWER_FLUSH_SEC")
+    retention_days: int = Field(default=180, alias="RETENTION_DAYS")
+    retention_rollup_days: int = Field(default=365, alias="RETENTION_ROLLUP_DAYS")
+    retention_batch_rows: int = Field(default=5000, alias="RETENTION_BATCH_ROWS")
+    retention_interval_sec: float = Field(default=21600.0, alias="RETENTION_INTERVAL_SEC")
+    retention_archive_dir: str = Field(default="data/generated/archive", alias="RETENTION_ARCHIVE_DIR")
+    backup_dir: str = Field(default="data/generated/backups", alias="BACKUP_DIR")
+    backup_keep: int = Field(default=7, alias="BACKUP_KEEP")
+    backup_interval_sec: float = Field(default=3600.0, alias="BACKUP_INTERVAL_SEC")
+    backup_step_pages: int = Field(default=256, alias="BACKUP_STEP_PAGES")
+    backup_step_pause_ms: float = Field(default=1.0, alias="BACKUP_STEP_PAUSE_MS")
+    analytics_copy_path: str = Field(default="", alias="ANALYTICS_COPY_PATH")
+    analytics_copy_refresh_sec: float = Field(default=300.0, alias="ANALYTICS_COPY_REFRESH_SEC")
+    analytics_timeout_sec: float = Field(default=5.0, alias="ANALYTICS_TIMEOUT_SEC")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
 
     support_usernames: str = Field(default="tgtaps_support,admin", alias="SUPPORT_USERNAMES")
     group_antispam_ttl_sec: int = Field(default=900, alias="GROUP_ANTISPAM_TTL_SEC")
+    group_antispam_persist: bool = Field(default=True, alias="GROUP_ANTISPAM_PERSIST")
+    group_antispam_max_entries: int = Field(default=100000, alias="GROUP_ANTISPAM_MAX_ENTRIES")
+    group_require_question: bool = Field(default=True, alias="GROUP_REQUIRE_QUESTION")
+    group_min_tokens: int = Field(default=2, alias="GROUP_MIN_TOKENS")
+    group_chat_cooldown_sec: float = Field(default=5.0, alias="GROUP_CHAT_COOLDOWN_SEC")
+    group_stats_max_chats: int = Field(default=10000, alias="GROUP_STATS_MAX_CHATS")
+    rate_limit_enabled: bool = Field(default=True, alias="RATE_LIMIT_ENABLED")
+    rate_limit_user_rate: float = Field(default=0.5, alias="RATE_LIMIT_USER_RATE")
+    rate_limit_user_burst: float = Field(default=5, alias="RATE_LIMIT_USER_BURST")
+    rate_limit_chat_rate: float = Field(default=2.0, alias="RATE_LIMIT_CHAT_RATE")
+    rate_limit_chat_burst: float = Field(default=30, alias="RATE_LIMIT_CHAT_BURST")
+    rate_limit_global_rate: float = Field(default=50.0, alias="RATE_LIMIT_GLOBAL_RATE")
+    rate_limit_global_burst: float = Field(default=100, alias="RATE_LIMIT_GLOBAL_BURST")
+    rate_limit_notice_sec: float = Field(default=10.0, alias="RATE_LIMIT_NOTICE_SEC")
+    outbox_chat_interval_sec: float = Field(default=1.0, alias="OUTBOX_CHAT_INTERVAL_SEC")
+    outbox_group_interval_sec: float = Field(default=3.0, alias="OUTBOX_GROUP_INTERVAL_SEC")
+    outbox_global_rate: float = Field(default=30.0, alias="OUTBOX_GLOBAL_RATE")
+    outbox_max_pending: int = Field(default=2000, alias="OUTBOX_MAX_PENDING")
+    outbox_max_per_chat: int = Field(default=50, alias="OUTBOX_MAX_PER_CHAT")
+    outbox_max_attempts: int = Field(default=5, alias="OUTBOX_MAX_ATTEMPTS")
+    outbox_drain_timeout_sec: float = Field(default=10.0, alias="OUTBOX_DRAIN_TIMEOUT_SEC")
     min_confidence: float = Field(default=55.0, alias="MIN_CONFIDENCE")
     ambiguity_delta: float = Field(default=8.0, alias="AMBIGUITY_DELTA")
     owner_ids: str = Field(default="", alias="OWNER_IDS")
+    search_candidate_budget: int = Field(default=3000, alias="SEARCH_CANDIDATE_BUDGET")
+    search_trigram_budget: int = Field(default=200, alias="SEARCH_TRIGRAM_BUDGET")
+    search_trigram_min_dice: float = Field(default=0.3, alias="SEARCH_TRIGRAM_MIN_DICE")
+    search_engine_mode: str = Field(default="batch", alias="SEARCH_ENGINE_MODE")
+    search_workers: int = Field(default=1, alias="SEARCH_WORKERS")
+    search_cache_size: int = Field(default=2048, alias="SEARCH_CACHE_SIZE")
+    search_cache_ttl_sec: int = Field(default=300, alias="SEARCH_CACHE_TTL_SEC")
+    search_executor: str = Field(default="thread", alias="SEARCH_EXECUTOR")
+    search_executor_workers: int = Field(default=4, alias="SEARCH_EXECUTOR_WORKERS")
+    search_index_snapshot: bool = Field(default=True, alias="SEARCH_INDEX_SNAPSHOT")
+    kb_reload_interval_sec: float = Field(default=30.0, alias="KB_RELOAD_INTERVAL_SEC")
 
     docs_base_url: str = Field(default="https://tgtaps.gitbook.io/tgtaps-docs", alias="DOCS_BASE_URL")
     docs_max_pages: int = Field(default=80, alias="DOCS_MAX_PAGES")
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from config.env.settings import get_settings
+from tgtaps_support_bot.infrastructure.persistence.sqlite_backup import (
+    create_backup,
+    list_backups,
+    quick_check,
+    restore_backup,
+)
+
+
+async def main() -> None:
+    load_dotenv()
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Create, list or restore online backups of the bot database.")
+    parser.add_argument("--backup-dir", default=settings.backup_dir, help="Directory with rotated backups")
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Take a backup now")
+    create.add_argument("--keep", type=int, default=settings.backup_keep, help="Backups to keep after rotation")
+    commands.add_parser("list", help="List backups with their quick_check result")
+    restore = commands.add_parser("restore", help="Replace the database with a backup (stop the bot first)")
+    restore.add_argument("backup", help="Backup file, or 'latest'")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        report = await asyncio.to_thread(
+            create_backup,
+            settings.sqlite_path,
+            args.backup_dir,
+            keep=args.keep,
+            step_pages=settings.backup_step_pages,
+            pause_sec=max(0.0, settings.backup_step_pause_ms) / 1000,
+        )
+        print(
+            f"Backup {report.path}: {report.pages} pages in {report.steps} steps, "
+            f"{report.duration_ms:.0f} ms (max step {report.max_step_pause_ms:.2f} ms)"
+        )
+        return
+
+    backups = list_backups(args.backup_dir, settings.sqlite_path)
+    if args.command == "list":
+        for path in backups:
+            print(f"{path.as_posix()}  {path.stat().st_size} bytes  {await asyncio.to_thread(quick_check, path.as_posix())}")
+        if not backups:
+            print(f"No backups in {args.backup_dir}")
+        return
+
+    if args.backup == "latest":
+        if not backups:
+            raise SystemExit(f"No backups in {args.backup_dir}")
+        source = backups[-1].as_posix()
+    else:
+        source = args.backup
+    if Path(settings.sqlite_path).exists():
+        # Keep the database being replaced, outside the rotated set.
+        safety = await asyncio.to_thread(
+            create_backup, settings.sqlite_path, f"{args.backup_dir}/pre-restore", keep=1_000_000
+        )
+        print(f"Saved current database to {safety.path}")
+    pages = await asyncio.to_thread(restore_backup, source, settings.sqlite_path)
+    print(f"Restored {settings.sqlite_path} from {source} ({pages} pages)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
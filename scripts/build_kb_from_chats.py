@@ -28,8 +28,11 @@ async def main() -> None:
 
     export_dir = Path(args.export_dir).resolve()
     items = build_qa_from_exports(export_dir.as_posix(), settings.support_usernames_set)
-    count = await upsert_articles(settings.sqlite_path, items)
-    print(f"Imported {count} chat-based KB entries from {export_dir}")
+    result = await upsert_articles(settings.sqlite_path, items)
+    print(
+        f"Imported {result.total} chat-based KB entries from {export_dir}: "
+        f"{result.inserted} inserted, {result.updated} updated, {result.unchanged} unchanged"
+    )
 
 
 if __name__ == "__main__":
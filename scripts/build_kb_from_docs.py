@@ -3,6 +3,7 @@ from __future__ import annotations
 import argparse
 import asyncio
 import sys
+from pathlib import Path
 
 from dotenv import load_dotenv
 
@@ -12,7 +13,7 @@ if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
 from config.env.settings import get_settings
-from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import ensure_db, upsert_articles
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import UpsertResult, ensure_db, upsert_articles
 from tgtaps_support_bot.infrastructure.parsers.doc_parser import crawl_docs_to_articles
 
 
@@ -30,17 +31,22 @@ async def main() -> None:
         "https://tgtaps.gitbook.io/tgtaps-docs",
         "https://docs.tgtaps.com/tgtaps-docs",
     ]
-    total = 0
+    total = UpsertResult()
     used = []
     for url in [u for u in start_urls if u]:
         items = crawl_docs_to_articles(url, max_pages=settings.docs_max_pages, max_depth=settings.docs_max_depth)
         if not items:
             continue
-        count = await upsert_articles(settings.sqlite_path, items)
-        total += count
+        result = await upsert_articles(settings.sqlite_path, items)
+        total.inserted += result.inserted
+        total.updated += result.updated
+        total.unchanged += result.unchanged
         used.append(url)
     if used:
-        print(f"Imported {total} docs-based KB entries from: {', '.join(used)}")
+        print(
+            f"Imported {total.total} docs-based KB entries from: {', '.join(used)}: "
+            f"{total.inserted} inserted, {total.updated} updated, {total.unchanged} unchanged"
+        )
     else:
         print("Imported 0 docs-based KB entries (docs URL not reachable in current environment)")
 
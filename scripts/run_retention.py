@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sqlite3
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from config.env.settings import get_settings
+from tgtaps_support_bot.infrastructure.persistence.retention import (
+    enable_incremental_vacuum,
+    run_retention,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import ensure_db
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import (
+    close_connection_manager,
+    open_connection_manager,
+)
+
+
+async def main() -> None:
+    load_dotenv()
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Archive old query logs, purge expired rows and compact the database.")
+    parser.add_argument("--days", type=int, default=settings.retention_days, help="Keep rows newer than this many days")
+    parser.add_argument(
+        "--rollup-days",
+        type=int,
+        default=settings.retention_rollup_days,
+        help="Keep analytics rollups newer than this many days (0 keeps them all)",
+    )
+    parser.add_argument("--archive-dir", default=settings.retention_archive_dir, help="Where gzip JSONL archives go")
+    parser.add_argument("--batch-rows", type=int, default=settings.retention_batch_rows, help="Rows per archive/delete batch")
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="First switch an older database to incremental auto_vacuum with a full VACUUM (best with the bot stopped)",
+    )
+    args = parser.parse_args()
+
+    await ensure_db(settings.sqlite_path)
+    await open_connection_manager(settings.sqlite_path, read_pool_size=1)
+    try:
+        if args.vacuum:
+            try:
+                converted = await enable_incremental_vacuum(settings.sqlite_path)
+            except sqlite3.OperationalError as exc:
+                raise SystemExit(f"VACUUM failed ({exc}); stop the bot or retry when it is idle") from exc
+            print("Switched to incremental auto_vacuum" if converted else "Incremental auto_vacuum already enabled")
+        report = await run_retention(
+            settings.sqlite_path,
+            horizon_days=args.days,
+            archive_dir=args.archive_dir,
+            batch_rows=args.batch_rows,
+            rollup_horizon_days=args.rollup_days,
+        )
+    finally:
+        await close_connection_manager(settings.sqlite_path)
+    for table, count in report.archived.items():
+        print(f"Archived {count} rows from {table}")
+    print(f"Purged {report.expired_dedup_rows} expired group dedup rows")
+    for table, count in report.purged_rollups.items():
+        print(f"Purged {count} rollup rows from {table}")
+    if not report.incremental_vacuum:
+        print("Skipped compaction: run once with --vacuum to enable incremental auto_vacuum")
+    for path in sorted(report.archive_files):
+        print(f"  {path}")
+    print(
+        f"Freed {report.freed_pages} pages; database {report.bytes_before} -> {report.bytes_after} bytes "
+        f"(reclaimed {report.reclaimed_bytes}) in {report.elapsed_ms:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
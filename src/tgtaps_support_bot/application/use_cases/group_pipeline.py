@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Callable
+
+from tgtaps_support_bot.application.use_cases.query_resolution import (
+    GroupResolution,
+    resolve_group_question_async,
+)
+from tgtaps_support_bot.domain.value_objects.text_normalization import (
+    looks_like_question,
+    normalize_text,
+)
+from tgtaps_support_bot.infrastructure.bot.anti_spam import GroupAntiSpam
+from tgtaps_support_bot.infrastructure.search.search_executor import AsyncSearchService
+
+log = logging.getLogger(__name__)
+
+# Cheapest first; dedup goes last because passing it claims the key.
+GROUP_GATES = ("min_tokens", "not_question", "cooldown", "duplicate")
+
+
+class GroupMessagePipeline:
+    def __init__(
+        self,
+        *,
+        search_service: AsyncSearchService,
+        anti_spam: GroupAntiSpam,
+        min_confidence: float,
+        require_question: bool = True,
+        min_tokens: int = 2,
+        chat_cooldown_sec: float = 5.0,
+        max_chats: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.search_service = search_service
+        self.anti_spam = anti_spam
+        self.min_confidence = min_confidence
+        self.require_question = require_question
+        self.min_tokens = min_tokens
+        self.chat_cooldown_sec = chat_cooldown_sec
+        self.max_chats = max(1, max_chats)
+        self._clock = clock
+        # Both dicts are kept in last-touched order, so the stalest chat is always at the front.
+        self._last_reply: dict[int, float] = {}
+        self.totals: Counter[str] = Counter()
+        self.per_chat: dict[int, Counter[str]] = {}
+        self.evicted_chats = 0
+        self.search_ms = 0.0
+
+    def _gate(self, chat_id: int, question: str, norm: str) -> str | None:
+        if len(norm.split()) < self.min_tokens:
+            return "min_tokens"
+        if self.require_question and not looks_like_question(question):
+            return "not_question"
+        last = self._last_reply.get(chat_id)
+        if last is not None and self._clock() - last < self.chat_cooldown_sec:
+            return "cooldown"
+        return None
+
+    def _chat_counters(self, chat_id: int) -> Counter[str]:
+        counters = self.per_chat.pop(chat_id, None)
+        if counters is None:
+            counters = Counter()
+            if len(self.per_chat) >= self.max_chats:
+                del self.per_chat[next(iter(self.per_chat))]
+                self.evicted_chats += 1
+        self.per_chat[chat_id] = counters
+        return counters
+
+    async def process(self, chat_id: int, question: str) -> GroupResolution | None:
+        counters = self._chat_counters(chat_id)
+        counters["seen"] += 1
+        self.totals["seen"] += 1
+        norm = normalize_text(question)
+        rejected = self._gate(chat_id, question, norm)
+        if rejected is None and not await self.anti_spam.should_answer(chat_id, norm):
+            rejected = "duplicate"
+        if rejected is not None:
+            counters[rejected] += 1
+            self.totals[rejected] += 1
+            return None
+
+        started = time.perf_counter()
+        resolution = await resolve_group_question_async(
+            search_service=self.search_service,
+            question=question,
+            min_confidence=self.min_confidence,
+        )
+        self.search_ms += (time.perf_counter() - started) * 1000
+        counters["searched"] += 1
+        self.totals["searched"] += 1
+        return resolution
+
+    def record_reply(self, chat_id: int) -> None:
+        now = self._clock()
+        last_reply = self._last_reply
+        last_reply.pop(chat_id, None)
+        # Replies are appended in time order; once the front is out of cooldown it gates nothing.
+        while last_reply:
+            oldest = next(iter(last_reply))
+            if now - last_reply[oldest] < self.chat_cooldown_sec and len(last_reply) < self.max_chats:
+                break
+            del last_reply[oldest]
+        last_reply[chat_id] = now
+
+    def _summary(self, counters: Counter[str], avg_search_ms: float) -> dict[str, float]:
+        skipped = counters["seen"] - counters["searched"]
+        return {
+            "seen": counters["seen"],
+            "searched": counters["searched"],
+            **{gate: counters[gate] for gate in GROUP_GATES},
+            "saved_search_ms": round(skipped * avg_search_ms, 1),
+        }
+
+    def stats(self) -> dict[str, object]:
+        # Skipped messages are costed at the average search actually run.
+        avg_search_ms = self.search_ms / self.totals["searched"] if self.totals["searched"] else 0.0
+        return {
+            "avg_search_ms": round(avg_search_ms, 3),
+            **self._summary(self.totals, avg_search_ms),
+            "evicted_chats": self.evicted_chats,
+            "per_chat": {chat_id: self._summary(c, avg_search_ms) for chat_id, c in self.per_chat.items()},
+        }
+
+    async def stop(self) -> None:
+        stats = self.stats()
+        per_chat = stats.pop("per_chat")
+        log.info("Group pipeline stopped: %s across %s chats", stats, len(per_chat))
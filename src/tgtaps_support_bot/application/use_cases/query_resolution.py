@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from tgtaps_support_bot.domain.services.search_engine import SearchEngine, SearchResult
+from tgtaps_support_bot.infrastructure.search.search_executor import AsyncSearchService
 
 
 @dataclass(slots=True)
@@ -19,15 +20,13 @@ class GroupResolution:
     result: SearchResult | None
 
 
-def resolve_private_question(
+def classify_private_results(
+    norm: str,
+    results: list[SearchResult],
     *,
-    search_engine: SearchEngine,
-    question: str,
     min_confidence: float,
     ambiguity_delta: float,
 ) -> PrivateResolution:
-    results = search_engine.search(question)
-    norm = search_engine.normalize(question)
     if not results or results[0].score < min_confidence:
         return PrivateResolution(question_norm=norm, status="not_found", results=[])
     if len(results) > 1 and (results[0].score - results[1].score) < ambiguity_delta:
@@ -35,6 +34,24 @@ def resolve_private_question(
     return PrivateResolution(question_norm=norm, status="matched", results=results)
 
 
+def classify_group_results(norm: str, results: list[SearchResult], *, min_confidence: float) -> GroupResolution:
+    if not results or results[0].score < min_confidence:
+        return GroupResolution(question_norm=norm, status="not_found", result=None)
+    return GroupResolution(question_norm=norm, status="matched", result=results[0])
+
+
+def resolve_private_question(
+    *,
+    search_engine: SearchEngine,
+    question: str,
+    min_confidence: float,
+    ambiguity_delta: float,
+) -> PrivateResolution:
+    results = search_engine.search(question)
+    norm = search_engine.normalize(question)
+    return classify_private_results(norm, results, min_confidence=min_confidence, ambiguity_delta=ambiguity_delta)
+
+
 def resolve_group_question(
     *,
     search_engine: SearchEngine,
@@ -43,6 +60,27 @@ def resolve_group_question(
 ) -> GroupResolution:
     results = search_engine.search(question)
     norm = search_engine.normalize(question)
-    if not results or results[0].score < min_confidence:
-        return GroupResolution(question_norm=norm, status="not_found", result=None)
-    return GroupResolution(question_norm=norm, status="matched", result=results[0])
+    return classify_group_results(norm, results, min_confidence=min_confidence)
+
+
+async def resolve_private_question_async(
+    *,
+    search_service: AsyncSearchService,
+    question: str,
+    min_confidence: float,
+    ambiguity_delta: float,
+) -> PrivateResolution:
+    results = await search_service.search(question)
+    norm = search_service.normalize(question)
+    return classify_private_results(norm, results, min_confidence=min_confidence, ambiguity_delta=ambiguity_delta)
+
+
+async def resolve_group_question_async(
+    *,
+    search_service: AsyncSearchService,
+    question: str,
+    min_confidence: float,
+) -> GroupResolution:
+    results = await search_service.search(question)
+    norm = search_service.normalize(question)
+    return classify_group_results(norm, results, min_confidence=min_confidence)
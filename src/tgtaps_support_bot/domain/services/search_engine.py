@@ -1,12 +1,25 @@
 from __future__ import annotations
 
-import json
+import heapq
 from dataclasses import dataclass
 
-from rapidfuzz import fuzz
+import numpy as np
+from rapidfuzz import fuzz, process
 
+from tgtaps_support_bot.domain.services.search_cache import SearchResultCache
+from tgtaps_support_bot.domain.services.search_index import CompiledArticle, SearchIndex
 from tgtaps_support_bot.domain.value_objects.text_normalization import normalize_text
 
+SEARCH_MODES = ("loop", "batch")
+
+_QUESTION_WEIGHT = 0.45
+_ALIAS_WEIGHT = 0.25
+_OVERLAP_STEP = 6.0
+_OVERLAP_CAP = 24.0
+_CATEGORY_BONUS = 5.0
+_INACTIVE_PENALTY = 40.0
+_MIN_FUZZY_SCORE = 35.0
+
 
 @dataclass(slots=True)
 class SearchResult:
@@ -16,15 +29,81 @@ class SearchResult:
 
 
 class SearchEngine:
-    def __init__(self, rows: list[dict]):
-        self.rows = rows
-        self.by_question_norm = {r["question_norm"]: r for r in rows}
-        self.alias_to_rows: dict[str, list[dict]] = {}
-        self.category_map: dict[str, list[dict]] = {}
-        for row in rows:
-            for alias in json.loads(row["aliases_json"]):
-                self.alias_to_rows.setdefault(alias, []).append(row)
-            self.category_map.setdefault(row["category"], []).append(row)
+    def __init__(
+        self,
+        rows: list[dict],
+        *,
+        candidate_budget: int | None = None,
+        trigram_budget: int = 0,
+        min_trigram_dice: float = 0.3,
+        full_scan_below: float = 0.0,
+        mode: str = "loop",
+        workers: int = 1,
+        cache: SearchResultCache | None = None,
+    ):
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode!r}. Expected one of {SEARCH_MODES}.")
+        self.candidate_budget = candidate_budget
+        self.trigram_budget = trigram_budget
+        self.min_trigram_dice = min_trigram_dice
+        self.full_scan_below = full_scan_below
+        self.mode = mode
+        self.workers = workers
+        self.cache = cache
+        self._index = SearchIndex.from_rows(rows)
+
+    @classmethod
+    def from_index(cls, index: SearchIndex, **options) -> SearchEngine:
+        engine = cls([], **options)
+        engine._index = index
+        return engine
+
+    def options(self) -> dict:
+        return {
+            "candidate_budget": self.candidate_budget,
+            "trigram_budget": self.trigram_budget,
+            "min_trigram_dice": self.min_trigram_dice,
+            "full_scan_below": self.full_scan_below,
+            "mode": self.mode,
+            "workers": self.workers,
+        }
+
+    @property
+    def index(self) -> SearchIndex:
+        return self._index
+
+    @property
+    def rows(self) -> list[dict]:
+        return self._index.rows
+
+    @property
+    def articles(self) -> list[CompiledArticle]:
+        return self._index.articles
+
+    @property
+    def kb_version(self) -> str:
+        return self._index.kb_version
+
+    def get_article(self, article_id: str) -> CompiledArticle | None:
+        return self._index.by_id.get(article_id)
+
+    def swap_index(self, index: SearchIndex) -> None:
+        self._index = index
+        if self.cache is not None:
+            self.cache.clear()
+
+    def candidate_ids(self, q_tokens: frozenset[str], qn: str | None = None, index: SearchIndex | None = None) -> list[int]:
+        if index is None:
+            index = self._index
+        candidates = index.candidate_ids(q_tokens, self.candidate_budget)
+        if not self.trigram_budget or qn is None:
+            return candidates
+        typo_candidates = index.trigram_candidate_ids(qn, self.trigram_budget, self.min_trigram_dice)
+        if not candidates:
+            return typo_candidates
+        if not typo_candidates:
+            return candidates
+        return sorted(set(candidates).union(typo_candidates))
 
     def normalize(self, text: str) -> str:
         return normalize_text(text)
@@ -33,56 +112,174 @@ class SearchEngine:
         qn = self.normalize(question)
         if not qn:
             return []
+        # Read the index once so a concurrent swap_index never mixes two versions.
+        index = self._index
+        if self.cache is None:
+            return self._search(index, qn, category_hint, top_k)
 
+        key = (qn, category_hint, top_k)
+        cached = self.cache.get(key, index.kb_version)
+        if cached is not None:
+            return cached
+        results = self._search(index, qn, category_hint, top_k)
+        self.cache.put(key, index.kb_version, results)
+        return results
+
+    def _search(self, index: SearchIndex, qn: str, category_hint: str | None, top_k: int) -> list[SearchResult]:
         # 1) Exact question
-        exact = self.by_question_norm.get(qn)
+        exact = index.by_question_norm.get(qn)
         if exact:
             return [SearchResult(row=exact, score=100.0, reason="exact_question")]
 
         # 2) Exact alias
-        alias_hits = self.alias_to_rows.get(qn, [])
+        alias_hits = index.alias_to_rows.get(qn, [])
         if alias_hits:
             return [SearchResult(row=x, score=90.0, reason="exact_alias") for x in alias_hits[:top_k]]
 
         # 3) Keywords + fuzzy
-        q_tokens = set(qn.split())
-        ranked: list[SearchResult] = []
-        for row in self.rows:
-            row_score = 0.0
-            reason = "keywords_fuzzy"
+        if top_k <= 0:
+            return []
+        q_tokens = frozenset(qn.split())
+        # Pruning is opt-in: without a budget every article is scored, as before the token index.
+        candidates = self.candidate_ids(q_tokens, qn, index) if self.candidate_budget is not None else []
+        ranked = self._score(index, qn, q_tokens, candidates, category_hint, top_k)
+        # A weak pruned best may lose to an article sharing no token with the query; rescore everything.
+        if candidates and (not ranked or ranked[0].score < self.full_scan_below):
+            ranked = self._score(index, qn, q_tokens, [], category_hint, top_k)
+        if ranked:
+            return ranked
 
-            rq = row["question_norm"]
-            ratio_q = fuzz.ratio(qn, rq)
-            row_score += ratio_q * 0.45
+        # 4) Category fallback
+        if category_hint and category_hint in index.category_map:
+            return [
+                SearchResult(row=x, score=20.0, reason="category_fallback")
+                for x in index.category_map[category_hint][:top_k]
+            ]
+        return []
+
+    def _score(
+        self,
+        index: SearchIndex,
+        qn: str,
+        q_tokens: frozenset[str],
+        candidates: list[int],
+        category_hint: str | None,
+        top_k: int,
+    ) -> list[SearchResult]:
+        if self.mode == "batch":
+            return self._score_batch(index, qn, q_tokens, candidates, category_hint, top_k)
+        articles = [index.articles[i] for i in candidates] if candidates else index.articles
+        return self._score_loop(qn, q_tokens, articles, category_hint, top_k)
 
-            aliases = json.loads(row["aliases_json"])
-            if aliases:
-                alias_ratio = max(fuzz.ratio(qn, a) for a in aliases)
-                row_score += alias_ratio * 0.25
+    def _score_loop(
+        self,
+        qn: str,
+        q_tokens: frozenset[str],
+        articles: list[CompiledArticle],
+        category_hint: str | None,
+        top_k: int,
+    ) -> list[SearchResult]:
+        ratio = fuzz.ratio
+        # Min-heap of the best top_k rows keyed by (score, -order): the root is the
+        # current k-th result, and earlier rows win ties as with a stable sort.
+        heap: list[tuple[float, int, str, dict]] = []
+        for order, article in enumerate(articles):
+            reason = "keywords_fuzzy"
+            in_category = bool(category_hint) and article.category == category_hint
+            overlap = min(len(q_tokens & article.tokens) * _OVERLAP_STEP, _OVERLAP_CAP)
+            row_score = ratio(qn, article.question_norm) * _QUESTION_WEIGHT
+
+            if article.aliases:
+                # Same operation order as the real score with a perfect alias ratio,
+                # so the bound is never below the attainable score.
+                bound = row_score + 100.0 * _ALIAS_WEIGHT + overlap
+                if in_category:
+                    bound += _CATEGORY_BONUS
+                if not article.is_active:
+                    bound -= _INACTIVE_PENALTY
+                if bound < _MIN_FUZZY_SCORE or (len(heap) == top_k and bound <= heap[0][0]):
+                    continue
+                row_score += max(ratio(qn, a) for a in article.aliases) * _ALIAS_WEIGHT
 
-            tag_tokens = set(json.loads(row["tags_json"]))
-            row_tokens = set(rq.split()) | tag_tokens
-            overlap = len(q_tokens & row_tokens)
-            row_score += min(overlap * 6.0, 24.0)
+            row_score += overlap
 
-            if category_hint and row.get("category") == category_hint:
-                row_score += 5.0
+            if in_category:
+                row_score += _CATEGORY_BONUS
                 reason = "keywords_fuzzy_category"
 
-            if row.get("status") != "active":
-                row_score -= 40.0
+            if not article.is_active:
+                row_score -= _INACTIVE_PENALTY
 
-            if row_score >= 35.0:
-                ranked.append(SearchResult(row=row, score=row_score, reason=reason))
+            if row_score < _MIN_FUZZY_SCORE:
+                continue
+            item = (row_score, -order, reason, article.row)
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+        return [SearchResult(row=row, score=score, reason=reason) for score, _, reason, row in sorted(heap, reverse=True)]
 
-        ranked.sort(key=lambda x: x.score, reverse=True)
-        if ranked:
-            return ranked[:top_k]
+    def _score_batch(
+        self,
+        index: SearchIndex,
+        qn: str,
+        q_tokens: frozenset[str],
+        candidates: list[int],
+        category_hint: str | None,
+        top_k: int,
+    ) -> list[SearchResult]:
+        if candidates:
+            ids: list[int] | range = candidates
+            questions = [index.articles[i].question_norm for i in candidates]
+            alias_choices, alias_owners = index.alias_batch(candidates)
+            active = index.active[candidates]
+        else:
+            ids = range(len(index))
+            questions = index.question_choices
+            alias_choices, alias_owners = index.alias_choices, index.alias_owners
+            active = index.active
+        if not questions:
+            return []
 
-        # 4) Category fallback
-        if category_hint and category_hint in self.category_map:
-            return [
-                SearchResult(row=x, score=20.0, reason="category_fallback")
-                for x in self.category_map[category_hint][:top_k]
-            ]
-        return []
+        # Rows whose question ratio is below this cannot reach the threshold even
+        # with every bonus, so rapidfuzz may zero them without changing the result.
+        best_bonus = _ALIAS_WEIGHT * 100.0 + _OVERLAP_CAP + (_CATEGORY_BONUS if category_hint else 0.0)
+        if not active.any():
+            best_bonus -= _INACTIVE_PENALTY
+        cutoff = max(0.0, (_MIN_FUZZY_SCORE - best_bonus) / _QUESTION_WEIGHT)
+
+        q_scores = process.cdist(
+            [qn], questions, scorer=fuzz.ratio, dtype=np.float64, workers=self.workers, score_cutoff=cutoff
+        )[0]
+        scores = q_scores * _QUESTION_WEIGHT
+        if alias_choices:
+            alias_scores = process.cdist(
+                [qn], alias_choices, scorer=fuzz.ratio, dtype=np.float64, workers=self.workers
+            )[0]
+            alias_max = np.full(len(questions), -1.0)
+            np.maximum.at(alias_max, alias_owners, alias_scores)
+            scores = np.where(alias_max >= 0.0, scores + alias_max * _ALIAS_WEIGHT, scores)
+
+        articles = index.articles
+        overlap = np.fromiter(
+            (min(len(q_tokens & articles[i].tokens) * _OVERLAP_STEP, _OVERLAP_CAP) for i in ids),
+            dtype=np.float64,
+            count=len(questions),
+        )
+        scores = scores + overlap
+        in_category = np.zeros(len(questions), dtype=bool)
+        if category_hint:
+            in_category = np.fromiter((articles[i].category == category_hint for i in ids), dtype=bool, count=len(questions))
+            scores = scores + np.where(in_category, _CATEGORY_BONUS, 0.0)
+        scores = scores - np.where(active, 0.0, _INACTIVE_PENALTY)
+
+        passing = np.flatnonzero(scores >= _MIN_FUZZY_SCORE).tolist()
+        top = heapq.nsmallest(top_k, passing, key=lambda pos: (-scores[pos], pos))
+        return [
+            SearchResult(
+                row=articles[ids[pos]].row,
+                score=float(scores[pos]),
+                reason="keywords_fuzzy_category" if in_category[pos] else "keywords_fuzzy",
+            )
+            for pos in top
+        ]
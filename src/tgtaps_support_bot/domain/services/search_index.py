@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+
+from tgtaps_support_bot.domain.value_objects.text_normalization import (
+    char_trigrams,
+    normalize_text,
+)
+
+
+def compute_kb_version(rows: Iterable[dict]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for row in sorted(rows, key=lambda r: r["id"]):
+        digest.update(f"{row['id']}\x1f{row.get('updated_at')}\x1f{row.get('status')}\x1e".encode())
+    return digest.hexdigest()
+
+
+@dataclass(slots=True, frozen=True)
+class ArticleContent:
+    steps: tuple[str, ...]
+    docs_links: tuple[dict, ...]
+    video_links: tuple[dict, ...]
+
+    @classmethod
+    def from_row(cls, row: dict) -> ArticleContent:
+        return cls(
+            steps=tuple(json.loads(row["steps_json"])),
+            docs_links=tuple(json.loads(row["docs_links_json"])),
+            video_links=tuple(json.loads(row["video_links_json"])),
+        )
+
+
+class CompiledArticle:
+    __slots__ = ("_content", "aliases", "category", "id", "is_active", "question_norm", "row", "tags", "tokens")
+
+    def __init__(self, row: dict, aliases: tuple[str, ...] | None = None, tags: tuple[str, ...] | None = None):
+        self.row = row
+        self.id: str = row["id"]
+        self.question_norm: str = row["question_norm"]
+        self.aliases: tuple[str, ...] = tuple(json.loads(row["aliases_json"])) if aliases is None else aliases
+        self.tags: tuple[str, ...] = tuple(json.loads(row["tags_json"])) if tags is None else tags
+        self.tokens: frozenset[str] = frozenset(self.question_norm.split()) | frozenset(self.tags)
+        self.category: str | None = row.get("category")
+        self.is_active: bool = row.get("status") == "active"
+        self._content: ArticleContent | None = None
+
+    def __reduce__(self):
+        # Pickle the decoded JSON columns; the token set is cheaper to rebuild than to unpickle.
+        return (CompiledArticle, (self.row, self.aliases, self.tags))
+
+    def content(self) -> ArticleContent:
+        # Decoded on first use and kept for as long as the article stays in the index.
+        if self._content is None:
+            self._content = ArticleContent.from_row(self.row)
+        return self._content
+
+    def index_terms(self) -> set[str]:
+        out = set(self.tokens)
+        for alias in self.aliases:
+            out.update(alias.split())
+        for tag in self.tags:
+            out.update(normalize_text(tag).split())
+        return out
+
+    def trigrams(self) -> set[str]:
+        grams = char_trigrams(self.question_norm)
+        for alias in self.aliases:
+            grams |= char_trigrams(alias)
+        return grams
+
+
+class SearchIndex:
+    def __init__(self, articles: list[CompiledArticle]):
+        self.articles = articles
+        self.token_postings: dict[str, list[int]] = {}
+        trigram_lists: dict[str, list[int]] = {}
+        trigram_sizes: list[int] = []
+        for idx, article in enumerate(articles):
+            for token in article.index_terms():
+                self.token_postings.setdefault(token, []).append(idx)
+            grams = article.trigrams()
+            for gram in grams:
+                trigram_lists.setdefault(gram, []).append(idx)
+            trigram_sizes.append(len(grams))
+        self.trigram_postings = {g: np.asarray(ids, dtype=np.int32) for g, ids in trigram_lists.items()}
+        self.trigram_sizes = np.asarray(trigram_sizes, dtype=np.float64)
+        self._build_lookups()
+
+    # Snapshots carry the postings, which are the expensive part to build;
+    # the lookup maps below are rebuilt from the articles on load.
+    def __getstate__(self) -> dict:
+        return {
+            "articles": self.articles,
+            "token_postings": self.token_postings,
+            "trigram_postings": self.trigram_postings,
+            "trigram_sizes": self.trigram_sizes,
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._build_lookups()
+
+    def _build_lookups(self) -> None:
+        articles = self.articles
+        self.rows = [a.row for a in articles]
+        self.kb_version = compute_kb_version(self.rows)
+        self.by_question_norm: dict[str, dict] = {}
+        self.alias_to_rows: dict[str, list[dict]] = {}
+        self.category_map: dict[str, list[dict]] = {}
+        self.by_id: dict[str, CompiledArticle] = {}
+        for article in articles:
+            self.by_id[article.id] = article
+            self.by_question_norm[article.question_norm] = article.row
+            for alias in article.aliases:
+                self.alias_to_rows.setdefault(alias, []).append(article.row)
+            self.category_map.setdefault(article.row["category"], []).append(article.row)
+        self.question_choices = [a.question_norm for a in articles]
+        self.alias_choices, self.alias_owners = self.alias_batch(range(len(articles)))
+        self.active = np.fromiter((a.is_active for a in articles), dtype=bool, count=len(articles))
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> SearchIndex:
+        return cls([CompiledArticle(r) for r in rows])
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def with_changes(self, upserts: Iterable[dict], removed_ids: Iterable[str] = ()) -> SearchIndex:
+        changed = {row["id"]: row for row in upserts}
+        removed = set(removed_ids)
+        articles: list[CompiledArticle] = []
+        for article in self.articles:
+            if article.id in removed:
+                continue
+            row = changed.pop(article.id, None)
+            articles.append(article if row is None else CompiledArticle(row))
+        articles.extend(CompiledArticle(row) for row in changed.values())
+        return SearchIndex(articles)
+
+    def alias_batch(self, ids: Sequence[int]) -> tuple[list[str], np.ndarray]:
+        choices: list[str] = []
+        owners: list[int] = []
+        for pos, idx in enumerate(ids):
+            aliases = self.articles[idx].aliases
+            choices.extend(aliases)
+            owners.extend([pos] * len(aliases))
+        return choices, np.asarray(owners, dtype=np.intp)
+
+    def candidate_ids(self, q_tokens: frozenset[str], budget: int | None = None) -> list[int]:
+        postings = [self.token_postings[t] for t in q_tokens if t in self.token_postings]
+        if not postings:
+            return []
+        if len(postings) == 1 and (not budget or len(postings[0]) <= budget):
+            return postings[0]
+
+        total = len(self.articles)
+        weights: dict[int, float] = defaultdict(float)
+        for posting in postings:
+            idf = math.log(1.0 + total / len(posting))
+            for idx in posting:
+                weights[idx] += idf
+        if budget and len(weights) > budget:
+            best = sorted(weights, key=lambda i: (-weights[i], i))[:budget]
+            return sorted(best)
+        return sorted(weights)
+
+    def trigram_candidate_ids(self, qn: str, budget: int, min_dice: float) -> list[int]:
+        grams = char_trigrams(qn)
+        postings = [self.trigram_postings[g] for g in grams if g in self.trigram_postings]
+        if not postings:
+            return []
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.articles))
+        # Dice estimate over the union of question and alias trigrams of each article.
+        dice = 2.0 * shared / (len(grams) + self.trigram_sizes)
+        hits = np.flatnonzero(dice >= min_dice)
+        if len(hits) > budget:
+            hits = hits[np.argpartition(-dice[hits], budget - 1)[:budget]]
+        return sorted(hits.tolist())
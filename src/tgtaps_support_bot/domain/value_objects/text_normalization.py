@@ -14,6 +14,11 @@ def normalize_text(text: str) -> str:
     return text.strip()
 
 
+def char_trigrams(text: str) -> set[str]:
+    padded = f" {text.replace('ё', 'е')} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
 QUESTION_HINT_RE = re.compile(
     r"(\?$|^как\b|^почему\b|^зачем\b|^где\b|^что\b|не работает|ошибка|проблема|как сделать)",
     re.IGNORECASE,
@@ -1,43 +1,119 @@
 from __future__ import annotations
 
 import hashlib
+import logging
 import time
+from collections.abc import Callable
 
-import aiosqlite
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    GROUP_DEDUP_UPSERT_SQL,
+    fetch_group_dedup,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import write_connection
+from tgtaps_support_bot.infrastructure.persistence.write_behind import WriteBehindQueue
+
+log = logging.getLogger(__name__)
 
 
 class GroupAntiSpam:
-    def __init__(self, sqlite_path: str, ttl_sec: int):
+    def __init__(
+        self,
+        sqlite_path: str,
+        ttl_sec: int,
+        *,
+        persist: bool = True,
+        write_queue: WriteBehindQueue | None = None,
+        max_entries: int = 100_000,
+        clock: Callable[[], float] = time.time,
+    ):
         self.sqlite_path = sqlite_path
         self.ttl_sec = ttl_sec
+        self.persist = persist
+        self.write_queue = write_queue
+        self.max_entries = max(1, max_entries)
+        self._clock = clock
+        # Every entry gets the same TTL, so insertion order is expiry order: expired keys
+        # are always at the front and pruning never scans live ones.
+        self._expires: dict[str, float] = {}
+        self.checks = 0
+        self.suppressed = 0
+        self.expired = 0
+        self.evicted = 0
+        self.restored = 0
+
+    def __len__(self) -> int:
+        return len(self._expires)
 
     @staticmethod
     def _dedup_key(chat_id: int, question_norm: str) -> str:
         digest = hashlib.sha1(question_norm.encode("utf-8")).hexdigest()[:20]
         return f"{chat_id}:{digest}"
 
-    async def should_answer(self, chat_id: int, question_norm: str) -> bool:
-        now = int(time.time())
-        dedup_key = self._dedup_key(chat_id, question_norm)
+    def _prune(self, now: float) -> None:
+        expires = self._expires
+        while expires:
+            key = next(iter(expires))
+            # Leave room for the key about to be inserted.
+            if expires[key] >= now and len(expires) < self.max_entries:
+                return
+            if expires.pop(key) >= now:
+                self.evicted += 1
+            else:
+                self.expired += 1
+
+    def _claim(self, key: str) -> float | None:
+        now = self._clock()
+        self.checks += 1
+        self._prune(now)
+        current = self._expires.get(key)
+        if current is not None:
+            if current >= now:
+                self.suppressed += 1
+                return None
+            # Expired but not yet at the front (restored under a different TTL): re-insert
+            # at the back so order still follows expiry.
+            del self._expires[key]
+            self.expired += 1
         expires_at = now + self.ttl_sec
+        self._expires[key] = expires_at
+        return expires_at
+
+    def check_and_set(self, chat_id: int, question_norm: str) -> bool:
+        return self._claim(self._dedup_key(chat_id, question_norm)) is not None
+
+    async def should_answer(self, chat_id: int, question_norm: str) -> bool:
+        key = self._dedup_key(chat_id, question_norm)
+        expires_at = self._claim(key)
+        if expires_at is None:
+            return False
+        if self.persist:
+            params = (key, chat_id, question_norm, int(expires_at))
+            if self.write_queue is not None:
+                await self.write_queue.put(GROUP_DEDUP_UPSERT_SQL, params)
+            else:
+                async with write_connection(self.sqlite_path) as db:
+                    await db.execute(GROUP_DEDUP_UPSERT_SQL, params)
+        return True
+
+    async def load(self) -> int:
+        if not self.persist:
+            return 0
+        now = self._clock()
+        rows = await fetch_group_dedup(self.sqlite_path, int(now))
+        # Rows come back by expiry, keeping the front-expires-first order intact.
+        for row in rows:
+            self._expires.setdefault(row["dedup_key"], float(row["expires_at_epoch"]))
+        self._prune(now)
+        self.restored = len(self._expires)
+        log.info("Restored %s group dedup entries", self.restored)
+        return self.restored
 
-        async with aiosqlite.connect(self.sqlite_path) as db:
-            await db.execute("DELETE FROM group_question_dedup WHERE expires_at_epoch < ?", (now,))
-            cursor = await db.execute(
-                "SELECT dedup_key FROM group_question_dedup WHERE dedup_key = ?",
-                (dedup_key,),
-            )
-            exists = await cursor.fetchone()
-            if exists:
-                await db.commit()
-                return False
-
-            await db.execute(
-                """
-                INSERT INTO group_question_dedup (dedup_key, chat_id, question_norm, expires_at_epoch)
-                VALUES (?, ?, ?, ?)
-                """,
-                (dedup_key, chat_id, question_norm, expires_at),
-            )
-            await db.commit()
-            return True
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._expires),
+            "checks": self.checks,
+            "suppressed": self.suppressed,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "restored": self.restored,
+        }
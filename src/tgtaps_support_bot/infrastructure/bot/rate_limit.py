@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+
+log = logging.getLogger(__name__)
+
+RATE_LIMIT_SCOPES = ("global", "chat", "user")
+
+
+@dataclass(slots=True)
+class TokenBucket:
+    tokens: float
+    updated: float
+
+    def refill(self, now: float, rate: float, burst: float) -> float:
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        return self.tokens
+
+
+@dataclass(slots=True, frozen=True)
+class BucketLimit:
+    rate: float
+    burst: float
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 and self.burst > 0
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        *,
+        user: BucketLimit,
+        chat: BucketLimit,
+        global_: BucketLimit,
+        notice_interval_sec: float = 10.0,
+        sweep_interval_sec: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limits = {"user": user, "chat": chat, "global": global_}
+        self.notice_interval_sec = notice_interval_sec
+        self.sweep_interval_sec = sweep_interval_sec
+        self._clock = clock
+        self._buckets: dict[tuple[str, int], TokenBucket] = {}
+        self._notified: dict[int, float] = {}
+        self._next_sweep = clock() + sweep_interval_sec
+        self.allowed = 0
+        self.rejected: Counter[str] = Counter()
+        self.notices = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _bucket(self, scope: str, key: int, now: float) -> TokenBucket:
+        bucket = self._buckets.get((scope, key))
+        if bucket is None:
+            bucket = self._buckets[(scope, key)] = TokenBucket(self.limits[scope].burst, now)
+        return bucket
+
+    def _sweep(self, now: float) -> None:
+        # A bucket that has refilled is indistinguishable from a new one.
+        for (scope, key), bucket in list(self._buckets.items()):
+            limit = self.limits[scope]
+            if bucket.refill(now, limit.rate, limit.burst) >= limit.burst:
+                del self._buckets[(scope, key)]
+        for user_id, at in list(self._notified.items()):
+            if now - at >= self.notice_interval_sec:
+                del self._notified[user_id]
+
+    def acquire(
+        self,
+        user_id: int | None,
+        chat_id: int | None,
+        *,
+        scopes: tuple[str, ...] = RATE_LIMIT_SCOPES,
+    ) -> str | None:
+        now = self._clock()
+        if now >= self._next_sweep:
+            self._sweep(now)
+            self._next_sweep = now + self.sweep_interval_sec
+        keys = {"global": 0, "chat": chat_id, "user": user_id}
+        buckets: list[TokenBucket] = []
+        # Check every bucket before taking from any, so a rejection costs nothing.
+        for scope in scopes:
+            limit = self.limits[scope]
+            if not limit.enabled or keys[scope] is None:
+                continue
+            bucket = self._bucket(scope, keys[scope], now)
+            if bucket.refill(now, limit.rate, limit.burst) < 1.0:
+                self.rejected[scope] += 1
+                return scope
+            buckets.append(bucket)
+        for bucket in buckets:
+            bucket.tokens -= 1.0
+        self.allowed += 1
+        return None
+
+    def should_notify(self, user_id: int) -> bool:
+        now = self._clock()
+        last = self._notified.get(user_id)
+        if last is not None and now - last < self.notice_interval_sec:
+            return False
+        self._notified[user_id] = now
+        self.notices += 1
+        return True
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "allowed": self.allowed,
+            **{f"rejected_{scope}": self.rejected[scope] for scope in RATE_LIMIT_SCOPES},
+            "notices": self.notices,
+            "buckets": len(self._buckets),
+        }
+
+    async def stop(self) -> None:
+        log.info("Rate limiter stopped: %s", self.stats())
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.types import Message
+
+log = logging.getLogger(__name__)
+
+PRIORITY_PRIVATE = 0
+PRIORITY_GROUP = 1
+
+
+@dataclass(slots=True)
+class OutboundMessage:
+    chat_id: int
+    priority: int
+    seq: int
+    send: Callable[[], Awaitable[Any]]
+    enqueued_at: float
+    attempts: int = 0
+
+
+class OutboundQueue:
+    def __init__(
+        self,
+        *,
+        per_chat_interval_sec: float = 1.0,
+        group_interval_sec: float = 3.0,
+        global_rate: float = 30.0,
+        max_pending: int = 2000,
+        max_per_chat: int = 50,
+        max_attempts: int = 5,
+        max_in_flight: int = 16,
+        drain_timeout_sec: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.per_chat_interval_sec = per_chat_interval_sec
+        self.group_interval_sec = group_interval_sec
+        self.global_rate = global_rate
+        self.max_pending = max_pending
+        # A quarter of the queue is kept for private answers so group traffic cannot crowd them out.
+        self.max_group_pending = max_pending * 3 // 4
+        self.max_per_chat = max_per_chat
+        self.max_attempts = max_attempts
+        self.drain_timeout_sec = drain_timeout_sec
+        self._clock = clock
+        self._seq = itertools.count()
+        self._chats: dict[int, deque[OutboundMessage]] = {}
+        # Each chat with queued messages and nothing in flight sits in exactly one heap:
+        # _ready by its head's (priority, seq), or _waiting until its pacing delay passes.
+        self._ready: list[tuple[int, int, int]] = []
+        self._waiting: list[tuple[float, int]] = []
+        self._scheduled: set[int] = set()
+        self._sending: set[int] = set()
+        self._not_before: dict[int, float] = {}
+        self._tokens = 1.0
+        self._tokens_at = clock()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+        self._deliveries: set[asyncio.Task] = set()
+        self.pending = 0
+        self.enqueued = 0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.retry_after = 0
+        self.retried = 0
+        self.max_depth = 0
+        self.max_wait_ms = 0.0
+        self.total_wait_ms = 0.0
+
+    def enqueue(self, chat_id: int, send: Callable[[], Awaitable[Any]], *, priority: int = PRIORITY_PRIVATE) -> bool:
+        if self._closed:
+            # Handlers still running after shutdown take their dropped path instead of queueing into a dead loop.
+            self.dropped += 1
+            log.warning("Outbound queue stopped, dropped message to chat %s", chat_id)
+            return False
+        queue = self._chats.get(chat_id)
+        limit = self.max_pending if priority == PRIORITY_PRIVATE else self.max_group_pending
+        if self.pending >= limit or (queue is not None and len(queue) >= self.max_per_chat):
+            self.dropped += 1
+            log.warning("Outbound queue full, dropped message to chat %s", chat_id)
+            return False
+        if queue is None:
+            queue = self._chats[chat_id] = deque()
+        queue.append(OutboundMessage(chat_id, priority, next(self._seq), send, self._clock()))
+        self.pending += 1
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self.pending)
+        self._idle.clear()
+        if chat_id not in self._scheduled and chat_id not in self._sending:
+            self._schedule(chat_id)
+        return True
+
+    def answer(self, message: Message, text: str, **kwargs: Any) -> bool:
+        return self.enqueue(message.chat.id, lambda: message.answer(text, **kwargs), priority=self._priority(message))
+
+    def reply(self, message: Message, text: str, **kwargs: Any) -> bool:
+        return self.enqueue(message.chat.id, lambda: message.reply(text, **kwargs), priority=self._priority(message))
+
+    @staticmethod
+    def _priority(message: Message) -> int:
+        return PRIORITY_PRIVATE if message.chat.type == "private" else PRIORITY_GROUP
+
+    def _schedule(self, chat_id: int) -> None:
+        head = self._chats[chat_id][0]
+        not_before = self._not_before.get(chat_id, 0.0)
+        if not_before <= self._clock():
+            heapq.heappush(self._ready, (head.priority, head.seq, chat_id))
+        else:
+            heapq.heappush(self._waiting, (not_before, chat_id))
+        self._scheduled.add(chat_id)
+        self._wakeup.set()
+
+    def _take_token(self, now: float) -> float:
+        # Capacity of one token: sends are spaced evenly, never a burst above the global rate.
+        self._tokens = min(1.0, self._tokens + (now - self._tokens_at) * self.global_rate)
+        self._tokens_at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.global_rate
+
+    async def _run(self) -> None:
+        while True:
+            now = self._clock()
+            while self._waiting and self._waiting[0][0] <= now:
+                _, chat_id = heapq.heappop(self._waiting)
+                head = self._chats[chat_id][0]
+                heapq.heappush(self._ready, (head.priority, head.seq, chat_id))
+            if not self._ready:
+                timeout = self._waiting[0][0] - now if self._waiting else None
+                self._wakeup.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                continue
+            delay = self._take_token(now)
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+            await self._slots.acquire()
+            _, _, chat_id = heapq.heappop(self._ready)
+            self._scheduled.discard(chat_id)
+            self._sending.add(chat_id)
+            item = self._chats[chat_id].popleft()
+            task = asyncio.create_task(self._deliver(item))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, item: OutboundMessage) -> None:
+        chat_id = item.chat_id
+        delivered = requeue = False
+        pause = self.per_chat_interval_sec if item.priority == PRIORITY_PRIVATE else self.group_interval_sec
+        item.attempts += 1
+        try:
+            await item.send()
+            delivered = True
+        except TelegramRetryAfter as exc:
+            # Flood control is per chat in practice; only this chat waits, the rest keep flowing.
+            self.retry_after += 1
+            requeue = item.attempts < self.max_attempts
+            pause = max(pause, float(exc.retry_after))
+            log.warning("Flood limit for chat %s, retrying in %s s", chat_id, exc.retry_after)
+        except (TelegramNetworkError, TelegramServerError):
+            requeue = item.attempts < self.max_attempts
+            pause = max(pause, min(30.0, 2.0 ** item.attempts))
+            log.warning("Send to chat %s failed (attempt %s)", chat_id, item.attempts, exc_info=True)
+        except Exception:
+            log.exception("Send to chat %s failed permanently", chat_id)
+        finally:
+            now = self._clock()
+            self._slots.release()
+            self._sending.discard(chat_id)
+            self._not_before[chat_id] = now + pause
+            queue = self._chats[chat_id]
+            if delivered:
+                self.sent += 1
+                wait_ms = (now - item.enqueued_at) * 1000
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+                self.total_wait_ms += wait_ms
+            elif requeue:
+                self.retried += 1
+                queue.appendleft(item)
+            else:
+                self.failed += 1
+            if not requeue:
+                self.pending -= 1
+            if queue:
+                self._schedule(chat_id)
+            else:
+                del self._chats[chat_id]
+                if not self.pending:
+                    self._idle.set()
+            if len(self._not_before) > 2 * len(self._chats) + 1024:
+                self._not_before = {k: at for k, at in self._not_before.items() if at > now or k in self._chats}
+
+    async def start(self) -> None:
+        self._closed = False
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            self._closed = True
+            return
+        # Messages queued while draining still go out; only the ones after it are refused.
+        if self.pending:
+            try:
+                await asyncio.wait_for(self._idle.wait(), self.drain_timeout_sec)
+            except TimeoutError:
+                log.warning("Outbound queue drain timed out with %s messages pending", self.pending)
+        self._closed = True
+        self._task.cancel()
+        for task in list(self._deliveries):
+            task.cancel()
+        await asyncio.gather(self._task, *self._deliveries, return_exceptions=True)
+        self._task = None
+        log.info("Outbound queue stopped: %s", self.stats())
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "pending": self.pending,
+            "chats": len(self._chats),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "retry_after": self.retry_after,
+            "retried": self.retried,
+            "max_depth": self.max_depth,
+            "avg_wait_ms": round(self.total_wait_ms / self.sent, 1) if self.sent else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 1),
+        }
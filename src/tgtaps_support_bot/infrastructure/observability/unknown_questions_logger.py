@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-import aiosqlite
-
-from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import utc_now_iso
-from tgtaps_support_bot.domain.value_objects.text_normalization import normalize_text
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    UNKNOWN_QUESTION_INSERT_SQL,
+    unknown_question_params,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import write_connection
+from tgtaps_support_bot.infrastructure.persistence.write_behind import WriteBehindQueue
 
 
 class UnknownQuestionsLogger:
-    def __init__(self, sqlite_path: str):
+    def __init__(self, sqlite_path: str, write_queue: WriteBehindQueue | None = None):
         self.sqlite_path = sqlite_path
+        self.write_queue = write_queue
 
     async def log(
         self,
@@ -19,20 +22,15 @@ class UnknownQuestionsLogger:
         question: str,
         category_hint: str | None = None,
     ) -> None:
-        sql = """
-        INSERT INTO kb_unknown_questions (
-            user_id, chat_id, is_group, question, question_norm, category_hint, created_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        params = (
-            user_id,
-            chat_id,
-            1 if is_group else 0,
-            question.strip(),
-            normalize_text(question),
-            category_hint,
-            utc_now_iso(),
-        )
-        async with aiosqlite.connect(self.sqlite_path) as db:
-            await db.execute(sql, params)
-            await db.commit()
+        event = {
+            "user_id": user_id,
+            "chat_id": chat_id,
+            "is_group": is_group,
+            "question": question,
+            "category_hint": category_hint,
+        }
+        if self.write_queue is not None:
+            await self.write_queue.log_unknown_question(**event)
+            return
+        async with write_connection(self.sqlite_path) as db:
+            await db.execute(UNKNOWN_QUESTION_INSERT_SQL, unknown_question_params(**event))
@@ -44,6 +44,13 @@ def _extract_messages(html_path: Path) -> list[dict[str, Any]]:
     return out
 
 
+def extract_questions(export_dir: str) -> list[str]:
+    out: list[str] = []
+    for p in sorted(Path(export_dir).glob("messages*.html")):
+        out.extend(m["text"] for m in _extract_messages(p) if looks_like_question(m["text"]))
+    return out
+
+
 def build_qa_from_exports(export_dir: str, support_usernames: set[str]) -> list[dict[str, Any]]:
     paths = sorted(Path(export_dir).glob("messages*.html"))
     if not paths:
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+from tgtaps_support_bot.infrastructure.persistence.sqlite_backup import (
+    copy_database,
+    readonly_uri,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    query_analytics_snapshot,
+    utc_now_iso,
+)
+
+log = logging.getLogger(__name__)
+
+
+class AnalyticsReader:
+    def __init__(
+        self,
+        sqlite_path: str,
+        *,
+        copy_path: str = "",
+        refresh_interval_sec: float = 300.0,
+        timeout_sec: float = 5.0,
+        busy_timeout_ms: int = 1000,
+    ):
+        self.sqlite_path = sqlite_path
+        self.copy_path = copy_path
+        self.refresh_interval_sec = refresh_interval_sec
+        self.timeout_sec = timeout_sec
+        self.busy_timeout_ms = busy_timeout_ms
+        self._db: aiosqlite.Connection | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._last_good: dict[int, dict[str, Any]] = {}
+        self.reports = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.stale_served = 0
+        self.last_report_ms = 0.0
+        self.copies = 0
+        self.copy_failures = 0
+        self.last_copy_ms = 0.0
+
+    async def _connect(self) -> aiosqlite.Connection:
+        use_copy = bool(self.copy_path) and Path(self.copy_path).exists()
+        source = self.copy_path if use_copy else self.sqlite_path
+        # The copy never changes under an open connection (refresh swaps the file), so it
+        # can skip locking entirely; the live file is opened read-only and query_only.
+        db = await aiosqlite.connect(readonly_uri(source, immutable=use_copy), uri=True)
+        db.row_factory = aiosqlite.Row
+        await db.execute("PRAGMA query_only=ON")
+        await db.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return db
+
+    async def _close_db(self) -> None:
+        db, self._db = self._db, None
+        if db is not None:
+            await db.close()
+
+    async def refresh_copy(self) -> None:
+        if not self.copy_path:
+            return
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(copy_database, self.sqlite_path, self.copy_path)
+        except (OSError, sqlite3.Error):
+            self.copy_failures += 1
+            log.warning("Analytics snapshot copy failed; keeping the previous one", exc_info=True)
+            return
+        self.copies += 1
+        self.last_copy_ms = (time.perf_counter() - started) * 1000
+        async with self._lock:
+            # Reopen lazily so the next report reads the fresh copy.
+            await self._close_db()
+
+    async def _query(self, window_days: int) -> dict[str, Any]:
+        async with self._lock:
+            if self._db is None:
+                self._db = await self._connect()
+            try:
+                return await query_analytics_snapshot(self._db, window_days=window_days)
+            except asyncio.CancelledError:
+                # The statement keeps running on the connection thread unless interrupted.
+                await self._db.interrupt()
+                raise
+
+    async def snapshot(self, *, window_days: int = 30) -> dict[str, Any] | None:
+        started = time.perf_counter()
+        try:
+            snapshot = await asyncio.wait_for(self._query(window_days), self.timeout_sec)
+        except TimeoutError:
+            self.timeouts += 1
+            log.warning("Analytics report exceeded %.1f s; serving last good snapshot", self.timeout_sec)
+        except sqlite3.Error:
+            self.failures += 1
+            log.exception("Analytics report failed; serving last good snapshot")
+            async with self._lock:
+                await self._close_db()
+        else:
+            self.reports += 1
+            self.last_report_ms = (time.perf_counter() - started) * 1000
+            snapshot["generated_at"] = utc_now_iso()
+            self._last_good[window_days] = snapshot
+            return snapshot
+
+        last = self._last_good.get(window_days)
+        if last is None:
+            return None
+        self.stale_served += 1
+        return {**last, "stale": True}
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "reports": self.reports,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "stale_served": self.stale_served,
+            "last_report_ms": round(self.last_report_ms, 2),
+            "copies": self.copies,
+            "copy_failures": self.copy_failures,
+            "last_copy_ms": round(self.last_copy_ms, 2),
+        }
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval_sec)
+            await self.refresh_copy()
+
+    async def start(self) -> None:
+        if not self.copy_path or self._task is not None:
+            return
+        await self.refresh_copy()
+        if self.refresh_interval_sec > 0:
+            self._task = asyncio.create_task(self.run(), name="analytics-copy")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        async with self._lock:
+            await self._close_db()
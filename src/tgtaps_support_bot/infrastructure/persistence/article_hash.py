@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+# updated_at and a defaulted valid_from are bookkeeping, not content: re-importing the
+# same article must produce the same hash.
+HASHED_COLUMNS = (
+    "question",
+    "question_norm",
+    "summary",
+    "steps_json",
+    "docs_links_json",
+    "video_links_json",
+    "category",
+    "tags_json",
+    "aliases_json",
+    "related_ids_json",
+    "answer_version",
+    "status",
+    "valid_from",
+    "valid_to",
+    "source",
+)
+
+
+def article_content_hash(values: dict[str, Any]) -> str:
+    content = "\x1f".join("" if values.get(c) is None else str(values[c]) for c in HASHED_COLUMNS)
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+from tgtaps_support_bot.domain.services.search_index import (
+    ArticleContent,
+    CompiledArticle,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    get_article_by_id,
+)
+
+
+class ArticleStore:
+    def __init__(self, sqlite_path: str, search_engine: SearchEngine):
+        self.sqlite_path = sqlite_path
+        self.search_engine = search_engine
+        self.memory_hits = 0
+        self.sqlite_fallbacks = 0
+
+    def get_cached(self, article_id: str) -> CompiledArticle | None:
+        return self.search_engine.get_article(article_id)
+
+    def content_for(self, row: dict) -> ArticleContent | None:
+        article = self.search_engine.get_article(row["id"])
+        # A hot reload between search and formatting may have replaced the article; its steps and
+        # links must not be mixed into an answer built from the older row. Rows from the process
+        # executor are copies, hence the equality check behind the identity one.
+        if article is None or (article.row is not row and article.row != row):
+            return None
+        return article.content()
+
+    async def get(self, article_id: str) -> CompiledArticle | None:
+        article = self.search_engine.get_article(article_id)
+        if article is not None:
+            self.memory_hits += 1
+            return article
+        # Only ids outside the index get here: archived articles or ones removed
+        # after the keyboard was sent.
+        self.sqlite_fallbacks += 1
+        row = await get_article_by_id(self.sqlite_path, article_id)
+        return CompiledArticle(row) if row else None
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import struct
+from pathlib import Path
+
+from tgtaps_support_bot.domain.services.search_index import SearchIndex
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    fetch_all_articles,
+    fetch_article_hashes,
+)
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"TGTIDX"
+# Bump whenever SearchIndex/CompiledArticle change shape.
+SNAPSHOT_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<6sH32s")
+
+
+def snapshot_path_for(sqlite_path: str) -> str:
+    return f"{sqlite_path}.index"
+
+
+def kb_checksum(rows: list[dict]) -> str:
+    # content_hash already covers every indexed column; rows written outside the importer
+    # have none and fall back to updated_at.
+    digest = hashlib.blake2b(digest_size=16)
+    for row in sorted(rows, key=lambda r: r["id"]):
+        digest.update(f"{row['id']}\x1f{row.get('content_hash') or row.get('updated_at')}\x1e".encode())
+    return digest.hexdigest()
+
+
+def save_index_snapshot(path: str, index: SearchIndex, checksum: str | None = None) -> None:
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_suffix(target.suffix + ".tmp")
+    checksum = checksum or kb_checksum(index.rows)
+    with tmp.open("wb") as fh:
+        fh.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, checksum.encode("ascii")))
+        pickle.dump(index, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, target)
+
+
+def load_index_snapshot(path: str, checksum: str) -> SearchIndex | None:
+    source = Path(path)
+    if not source.exists() or source.stat().st_size <= _HEADER.size:
+        return None
+    # Unpickling copies everything into the heap anyway, so one plain read is all it needs.
+    data = source.read_bytes()
+    magic, version, stored = _HEADER.unpack_from(data, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION:
+        return None
+    if stored.decode("ascii") != checksum:
+        return None
+    try:
+        index = pickle.loads(memoryview(data)[_HEADER.size :])
+    except Exception:
+        log.warning("Search index snapshot %s is unreadable; rebuilding", path, exc_info=True)
+        return None
+    return index if isinstance(index, SearchIndex) else None
+
+
+async def load_or_build_index(sqlite_path: str, snapshot_path: str | None) -> tuple[SearchIndex, str]:
+    if not snapshot_path:
+        return SearchIndex.from_rows(await fetch_all_articles(sqlite_path)), "rebuild"
+
+    # Only ids and hashes are read to validate the snapshot; full rows only on a rebuild.
+    checksum = kb_checksum(await fetch_article_hashes(sqlite_path))
+    index = load_index_snapshot(snapshot_path, checksum)
+    if index is not None:
+        return index, "snapshot"
+    rows = await fetch_all_articles(sqlite_path)
+    index = SearchIndex.from_rows(rows)
+    try:
+        save_index_snapshot(snapshot_path, index, checksum)
+    except OSError:
+        log.warning("Could not write search index snapshot to %s", snapshot_path, exc_info=True)
+    return index, "rebuild"
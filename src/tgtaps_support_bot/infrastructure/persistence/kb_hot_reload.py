@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+
+from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+from tgtaps_support_bot.infrastructure.persistence.index_snapshot import (
+    save_index_snapshot,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    fetch_changed_articles,
+    get_kb_change_seq,
+    prune_kb_changes,
+)
+
+log = logging.getLogger(__name__)
+
+
+class KBHotReloader:
+    def __init__(
+        self,
+        sqlite_path: str,
+        search_engine: SearchEngine,
+        *,
+        interval_sec: float,
+        last_seq: int = 0,
+        snapshot_path: str | None = None,
+    ):
+        self.sqlite_path = sqlite_path
+        self.search_engine = search_engine
+        self.interval_sec = interval_sec
+        self.last_seq = last_seq
+        self.snapshot_path = snapshot_path
+        self._task: asyncio.Task | None = None
+
+    async def poll_once(self) -> bool:
+        seq = await get_kb_change_seq(self.sqlite_path)
+        if seq <= self.last_seq:
+            return False
+
+        started = time.perf_counter()
+        upserts, removed_ids = await fetch_changed_articles(self.sqlite_path, self.last_seq, seq)
+        current = self.search_engine.index
+        # Build off the event loop; handlers keep searching the old index until the swap.
+        index = await asyncio.to_thread(current.with_changes, upserts, removed_ids)
+        self.search_engine.swap_index(index)
+        self.last_seq = seq
+        await prune_kb_changes(self.sqlite_path, seq)
+        log.info(
+            "KB hot reload: %s upserted, %s removed, %s -> %s articles in %.1f ms",
+            len(upserts),
+            len(removed_ids),
+            len(current),
+            len(index),
+            (time.perf_counter() - started) * 1000,
+        )
+        if self.snapshot_path:
+            try:
+                await asyncio.to_thread(save_index_snapshot, self.snapshot_path, index)
+            except OSError:
+                log.warning("Could not refresh search index snapshot %s", self.snapshot_path, exc_info=True)
+        return True
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_sec)
+            try:
+                await self.poll_once()
+            except Exception:
+                log.exception("KB hot reload failed")
+
+    async def start(self) -> None:
+        if self._task is None and self.interval_sec > 0:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
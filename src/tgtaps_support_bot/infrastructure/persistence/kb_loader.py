@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import upsert_articles
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import UpsertResult, upsert_articles
 from tgtaps_support_bot.domain.value_objects.text_normalization import normalize_text
 
 
@@ -38,6 +38,6 @@ def load_json_articles(path: str) -> list[dict]:
     return out
 
 
-async def load_seed_to_db(sqlite_path: str, seed_path: str) -> int:
+async def load_seed_to_db(sqlite_path: str, seed_path: str) -> UpsertResult:
     items = load_json_articles(seed_path)
     return await upsert_articles(sqlite_path, items)
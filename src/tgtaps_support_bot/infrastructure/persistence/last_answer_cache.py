@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections import OrderedDict
+from typing import Any
+
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    USER_LAST_ANSWER_UPSERT_SQL,
+    get_user_last_answer,
+    user_last_answer_params,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import write_connection
+
+log = logging.getLogger(__name__)
+
+_ABSENT: dict[str, Any] = {}
+
+
+class LastAnswerCache:
+    def __init__(self, sqlite_path: str, *, max_entries: int = 10000, flush_interval_sec: float = 5.0):
+        self.sqlite_path = sqlite_path
+        self.max_entries = max(1, max_entries)
+        self.flush_interval_sec = flush_interval_sec
+        # user_id -> row, or _ABSENT when the table is known to have no row for the user.
+        self._entries: OrderedDict[int, dict[str, Any]] = OrderedDict()
+        # Pending upserts live outside the LRU so evicting an entry never drops a write.
+        self._dirty: dict[int, tuple] = {}
+        self._task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+
+    async def get(self, user_id: int) -> dict[str, Any] | None:
+        row = self._entries.get(user_id)
+        if row is not None:
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return row or None
+        pending = self._dirty.get(user_id)
+        if pending is not None:
+            self.hits += 1
+            row = self._row(pending)
+        else:
+            self.misses += 1
+            row = await get_user_last_answer(self.sqlite_path, user_id)
+            if user_id in self._entries or user_id in self._dirty:
+                # A set() landed while the row was loading; it is newer than the table.
+                return await self.get(user_id)
+        self._remember(user_id, row or _ABSENT)
+        return row
+
+    async def set(self, user_id: int, article_id: str, question_norm: str) -> None:
+        params = user_last_answer_params(user_id, article_id, question_norm)
+        self._dirty[user_id] = params
+        self._remember(user_id, self._row(params))
+
+    async def flush(self) -> int:
+        if not self._dirty:
+            return 0
+        batch, self._dirty = self._dirty, {}
+        try:
+            async with write_connection(self.sqlite_path) as db:
+                await db.executemany(USER_LAST_ANSWER_UPSERT_SQL, list(batch.values()))
+        except BaseException:
+            # Also on cancellation; keep newer writes that arrived during the failed flush.
+            for user_id, params in batch.items():
+                self._dirty.setdefault(user_id, params)
+            raise
+        self.flushes += 1
+        self.flushed_rows += len(batch)
+        return len(batch)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "dirty": len(self._dirty),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+        }
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_sec)
+            try:
+                await self.flush()
+            except Exception:
+                log.exception("Flushing user_last_answer cache failed")
+
+    async def start(self) -> None:
+        if self._task is None and self.flush_interval_sec > 0:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+        log.info("user_last_answer cache stopped: %s", self.stats())
+
+    def _remember(self, user_id: int, row: dict[str, Any]) -> None:
+        self._entries[user_id] = row
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @staticmethod
+    def _row(params: tuple) -> dict[str, Any]:
+        user_id, article_id, question_norm, answered_at = params
+        return {"user_id": user_id, "article_id": article_id, "question_norm": question_norm, "answered_at": answered_at}
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from tgtaps_support_bot.infrastructure.persistence.article_hash import (
+    article_content_hash,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import (
+    read_connection,
+    write_connection,
+)
+
+log = logging.getLogger(__name__)
+
+BACKFILL_CHUNK_ROWS = 5000
+
+
+@dataclass(slots=True, frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[str], Awaitable[None]]
+
+
+async def _has_column(sqlite_path: str, table: str, column: str) -> bool:
+    async with read_connection(sqlite_path) as db:
+        rows = await db.execute_fetchall(f"PRAGMA table_info({table})")
+    return any(r["name"] == column for r in rows)
+
+
+async def _backfill_epoch(sqlite_path: str, table: str) -> int:
+    async with read_connection(sqlite_path) as db:
+        max_id = (await db.execute_fetchall(f"SELECT COALESCE(MAX(id), 0) FROM {table}"))[0][0]
+    updated = 0
+    # One short transaction per id range, releasing the write lock in between so the
+    # bot and scripts can keep writing while a large table is converted.
+    for start in range(0, max_id, BACKFILL_CHUNK_ROWS):
+        async with write_connection(sqlite_path) as db:
+            cursor = await db.execute(
+                f"""
+                UPDATE {table}
+                SET created_at_epoch = CAST(strftime('%s', created_at) AS INTEGER)
+                WHERE id > ? AND id <= ? AND created_at_epoch IS NULL
+                """,
+                (start, start + BACKFILL_CHUNK_ROWS),
+            )
+            updated += cursor.rowcount
+        await asyncio.sleep(0)
+    return updated
+
+
+async def _m001_epoch_timestamps(sqlite_path: str) -> None:
+    for table, index in (
+        ("query_logs", "idx_query_logs_created_epoch"),
+        ("kb_unknown_questions", "idx_unknown_created_epoch"),
+    ):
+        if not await _has_column(sqlite_path, table, "created_at_epoch"):
+            async with write_connection(sqlite_path) as db:
+                await db.execute(f"ALTER TABLE {table} ADD COLUMN created_at_epoch INTEGER")
+        updated = await _backfill_epoch(sqlite_path, table)
+        async with write_connection(sqlite_path) as db:
+            await db.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table}(created_at_epoch)")
+        log.info("Backfilled %s.created_at_epoch for %s rows", table, updated)
+
+
+async def _m002_article_content_hash(sqlite_path: str) -> None:
+    if not await _has_column(sqlite_path, "kb_articles", "content_hash"):
+        async with write_connection(sqlite_path) as db:
+            await db.execute("ALTER TABLE kb_articles ADD COLUMN content_hash TEXT")
+    last_id = ""
+    updated = 0
+    while True:
+        async with read_connection(sqlite_path) as db:
+            rows = await db.execute_fetchall(
+                "SELECT * FROM kb_articles WHERE id > ? AND content_hash IS NULL ORDER BY id LIMIT ?",
+                (last_id, BACKFILL_CHUNK_ROWS),
+            )
+        if not rows:
+            break
+        # Stored valid_from may be an import-time default, which the importer does not
+        # hash; articles with an explicit valid_from get rewritten once on next import.
+        params = [(article_content_hash({**dict(r), "valid_from": None}), r["id"]) for r in rows]
+        async with write_connection(sqlite_path) as db:
+            await db.executemany("UPDATE kb_articles SET content_hash = ? WHERE id = ?", params)
+        updated += len(params)
+        last_id = rows[-1]["id"]
+        await asyncio.sleep(0)
+    log.info("Backfilled kb_articles.content_hash for %s rows", updated)
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "epoch timestamps on query_logs and kb_unknown_questions", _m001_epoch_timestamps),
+    Migration(2, "content hash on kb_articles for diff imports", _m002_article_content_hash),
+)
+
+
+async def get_schema_version(sqlite_path: str) -> int:
+    async with read_connection(sqlite_path) as db:
+        return int((await db.execute_fetchall("PRAGMA user_version"))[0][0])
+
+
+async def run_migrations(sqlite_path: str, migrations: tuple[Migration, ...] = MIGRATIONS) -> list[int]:
+    current = await get_schema_version(sqlite_path)
+    latest = max((m.version for m in migrations), default=0)
+    if current > latest:
+        raise RuntimeError(f"Database schema version {current} is newer than this code supports ({latest})")
+
+    applied: list[int] = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= current:
+            continue
+        log.info("Applying schema migration %s: %s", migration.version, migration.name)
+        # Migrations are written to be re-runnable, so a crash before the version bump
+        # only repeats the unfinished one.
+        await migration.apply(sqlite_path)
+        async with write_connection(sqlite_path) as db:
+            await db.execute(f"PRAGMA user_version = {int(migration.version)}")
+        applied.append(migration.version)
+    return applied
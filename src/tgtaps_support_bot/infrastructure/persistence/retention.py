@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import gzip
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import (
+    read_connection,
+    write_connection,
+)
+
+log = logging.getLogger(__name__)
+
+ARCHIVED_TABLES = ("query_logs", "kb_unknown_questions")
+# (table, bucket column, primary key); buckets are ISO strings, so they compare against a cutoff day.
+ROLLUP_TABLES = (
+    ("query_rollup_hourly", "hour", "hour, is_group, match_status, category"),
+    ("query_rollup_questions_daily", "day", "day, question_norm"),
+)
+VACUUM_STEP_PAGES = 2000
+
+
+@dataclass(slots=True)
+class RetentionReport:
+    cutoff_epoch: int
+    archived: dict[str, int] = field(default_factory=dict)
+    expired_dedup_rows: int = 0
+    purged_rollups: dict[str, int] = field(default_factory=dict)
+    incremental_vacuum: bool = True
+    archive_files: set[str] = field(default_factory=set)
+    freed_pages: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+
+def database_bytes(sqlite_path: str) -> int:
+    total = 0
+    for suffix in ("", "-wal", "-shm"):
+        with contextlib.suppress(OSError):
+            total += os.path.getsize(sqlite_path + suffix)
+    return total
+
+
+def archive_path(archive_dir: str, table: str, day: str) -> Path:
+    year, month, _ = day.split("-")
+    return Path(archive_dir) / table / year / month / f"{table}-{day}.jsonl.gz"
+
+
+def _append_archive(archive_dir: str, table: str, rows: list[dict]) -> list[str]:
+    by_day: dict[str, list[dict]] = {}
+    for row in rows:
+        day = datetime.fromtimestamp(row["created_at_epoch"], UTC).strftime("%Y-%m-%d")
+        by_day.setdefault(day, []).append(row)
+    written: list[str] = []
+    for day, day_rows in by_day.items():
+        path = archive_path(archive_dir, table, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in day_rows).encode("utf-8")
+        # Appending adds a gzip member per batch; gzip readers treat the file as one stream.
+        with open(path, "ab") as fh:
+            fh.write(gzip.compress(payload, compresslevel=6))
+            fh.flush()
+            os.fsync(fh.fileno())
+        written.append(path.as_posix())
+    return written
+
+
+async def _archive_table(
+    sqlite_path: str,
+    table: str,
+    cutoff_epoch: int,
+    archive_dir: str,
+    batch_rows: int,
+    report: RetentionReport,
+) -> None:
+    archived = 0
+    while True:
+        async with read_connection(sqlite_path) as db:
+            rows = [
+                dict(r)
+                for r in await db.execute_fetchall(
+                    f"SELECT * FROM {table} WHERE created_at_epoch < ? ORDER BY id LIMIT ?",
+                    (cutoff_epoch, batch_rows),
+                )
+            ]
+        if not rows:
+            break
+        # The archive is written and synced before the rows are deleted; a crash in
+        # between re-archives that batch on the next run rather than losing it.
+        report.archive_files.update(await asyncio.to_thread(_append_archive, archive_dir, table, rows))
+        ids = [r["id"] for r in rows]
+        async with write_connection(sqlite_path) as db:
+            await db.execute(f"DELETE FROM {table} WHERE id IN ({','.join('?' * len(ids))})", ids)
+        archived += len(rows)
+        await asyncio.sleep(0)
+    report.archived[table] = archived
+
+
+async def _purge_dedup(sqlite_path: str, now_epoch: int, batch_rows: int) -> int:
+    purged = 0
+    while True:
+        async with write_connection(sqlite_path) as db:
+            cursor = await db.execute(
+                """
+                DELETE FROM group_question_dedup WHERE rowid IN (
+                    SELECT rowid FROM group_question_dedup WHERE expires_at_epoch < ? LIMIT ?
+                )
+                """,
+                (now_epoch, batch_rows),
+            )
+            deleted = cursor.rowcount
+        purged += deleted
+        if deleted < batch_rows:
+            return purged
+        await asyncio.sleep(0)
+
+
+async def _purge_rollup(sqlite_path: str, table: str, column: str, key: str, cutoff_day: str, batch_rows: int) -> int:
+    purged = 0
+    while True:
+        async with write_connection(sqlite_path) as db:
+            cursor = await db.execute(
+                f"""
+                DELETE FROM {table} WHERE ({key}) IN (
+                    SELECT {key} FROM {table} WHERE {column} < ? LIMIT ?
+                )
+                """,
+                (cutoff_day, batch_rows),
+            )
+            deleted = cursor.rowcount
+        purged += deleted
+        if deleted < batch_rows:
+            return purged
+        await asyncio.sleep(0)
+
+
+async def incremental_vacuum_enabled(sqlite_path: str) -> bool:
+    async with read_connection(sqlite_path) as db:
+        return (await db.execute_fetchall("PRAGMA auto_vacuum"))[0][0] == 2
+
+
+async def check_incremental_vacuum(sqlite_path: str) -> bool:
+    # New files get INCREMENTAL from SCHEMA_SQL; older ones keep warning until the explicit VACUUM is run.
+    if await incremental_vacuum_enabled(sqlite_path):
+        return True
+    log.warning(
+        "%s does not use incremental auto_vacuum; retention cannot shrink it until "
+        "`python -m scripts.run_retention --vacuum` is run once",
+        sqlite_path,
+    )
+    return False
+
+
+async def enable_incremental_vacuum(sqlite_path: str) -> bool:
+    if await incremental_vacuum_enabled(sqlite_path):
+        return False
+    # The mode only takes effect after a full VACUUM, which rewrites the file under the write lock.
+    async with write_connection(sqlite_path) as db:
+        await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        await db.execute("VACUUM")
+    return True
+
+
+async def compact_database(sqlite_path: str) -> int:
+    freed = 0
+    while True:
+        async with read_connection(sqlite_path) as db:
+            free_pages = (await db.execute_fetchall("PRAGMA freelist_count"))[0][0]
+            auto_vacuum = (await db.execute_fetchall("PRAGMA auto_vacuum"))[0][0]
+        # 2 = INCREMENTAL; without it the pragma is a no-op and pages stay on the freelist.
+        if not free_pages or auto_vacuum != 2:
+            break
+        # executescript steps the pragma to completion; Cursor.execute frees a single page.
+        async with write_connection(sqlite_path) as db:
+            await db.executescript(f"PRAGMA incremental_vacuum({min(free_pages, VACUUM_STEP_PAGES)});")
+            remaining = (await db.execute_fetchall("PRAGMA freelist_count"))[0][0]
+        if remaining >= free_pages:
+            break
+        freed += free_pages - remaining
+        await asyncio.sleep(0)
+    async with write_connection(sqlite_path) as db:
+        await db.execute_fetchall("PRAGMA wal_checkpoint(TRUNCATE)")
+    return freed
+
+
+async def run_retention(
+    sqlite_path: str,
+    *,
+    horizon_days: int,
+    archive_dir: str,
+    batch_rows: int = 5000,
+    rollup_horizon_days: int = 0,
+    now: float | None = None,
+) -> RetentionReport:
+    started = time.perf_counter()
+    now_epoch = int(time.time() if now is None else now)
+    report = RetentionReport(cutoff_epoch=now_epoch - horizon_days * 86400)
+    report.bytes_before = database_bytes(sqlite_path)
+    for table in ARCHIVED_TABLES:
+        await _archive_table(sqlite_path, table, report.cutoff_epoch, archive_dir, batch_rows, report)
+    report.expired_dedup_rows = await _purge_dedup(sqlite_path, now_epoch, batch_rows)
+    if rollup_horizon_days > 0:
+        cutoff_day = datetime.fromtimestamp(now_epoch - rollup_horizon_days * 86400, UTC).strftime("%Y-%m-%d")
+        for table, column, key in ROLLUP_TABLES:
+            report.purged_rollups[table] = await _purge_rollup(
+                sqlite_path, table, column, key, cutoff_day, batch_rows
+            )
+    report.incremental_vacuum = await check_incremental_vacuum(sqlite_path)
+    if report.incremental_vacuum:
+        report.freed_pages = await compact_database(sqlite_path)
+    report.bytes_after = database_bytes(sqlite_path)
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
+
+
+class RetentionService:
+    def __init__(
+        self,
+        sqlite_path: str,
+        *,
+        horizon_days: int,
+        archive_dir: str,
+        batch_rows: int,
+        interval_sec: float,
+        rollup_horizon_days: int = 0,
+    ):
+        self.sqlite_path = sqlite_path
+        self.horizon_days = horizon_days
+        self.rollup_horizon_days = rollup_horizon_days
+        self.archive_dir = archive_dir
+        self.batch_rows = batch_rows
+        self.interval_sec = interval_sec
+        self._task: asyncio.Task | None = None
+
+    async def run_once(self) -> RetentionReport:
+        report = await run_retention(
+            self.sqlite_path,
+            horizon_days=self.horizon_days,
+            archive_dir=self.archive_dir,
+            batch_rows=self.batch_rows,
+            rollup_horizon_days=self.rollup_horizon_days,
+        )
+        log.info(
+            "Retention: archived %s, purged %s dedup rows and rollups %s, freed %s pages, "
+            "reclaimed %s bytes in %.1f ms",
+            report.archived,
+            report.expired_dedup_rows,
+            report.purged_rollups,
+            report.freed_pages,
+            report.reclaimed_bytes,
+            report.elapsed_ms,
+        )
+        return report
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_sec)
+            try:
+                await self.run_once()
+            except Exception:
+                log.exception("Retention run failed")
+
+    async def start(self) -> None:
+        await check_incremental_vacuum(self.sqlite_path)
+        if self._task is None and self.interval_sec > 0 and self.horizon_days > 0:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+BACKUP_SUFFIX = ".sqlite3"
+
+
+@dataclass(slots=True)
+class BackupReport:
+    path: str
+    pages: int = 0
+    steps: int = 0
+    duration_ms: float = 0.0
+    max_step_pause_ms: float = 0.0
+    check: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.check == "ok"
+
+
+def readonly_uri(sqlite_path: str, *, immutable: bool = False) -> str:
+    uri = f"{Path(sqlite_path).resolve().as_uri()}?mode=ro"
+    return f"{uri}&immutable=1" if immutable else uri
+
+
+def quick_check(sqlite_path: str) -> str:
+    db = sqlite3.connect(readonly_uri(sqlite_path), uri=True)
+    try:
+        rows = db.execute("PRAGMA quick_check").fetchall()
+    finally:
+        db.close()
+    return "; ".join(str(r[0]) for r in rows)
+
+
+def _backup_to(source_path: str, target: Path, *, step_pages: int, pause_sec: float) -> BackupReport:
+    report = BackupReport(path=target.as_posix())
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    started = time.perf_counter()
+    step_started = 0.0
+
+    def progress(status: int, remaining: int, total: int) -> None:
+        nonlocal step_started
+        now = time.perf_counter()
+        report.steps += 1
+        report.max_step_pause_ms = max(report.max_step_pause_ms, (now - step_started) * 1000)
+        if pause_sec and remaining:
+            time.sleep(pause_sec)
+        step_started = time.perf_counter()
+
+    source = sqlite3.connect(readonly_uri(source_path), uri=True, isolation_level=None)
+    try:
+        # Holding one read transaction across all steps pins a WAL snapshot: writers keep
+        # committing, and the copy is not restarted by each of their commits.
+        source.execute("BEGIN")
+        source.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+        copy = sqlite3.connect(tmp.as_posix())
+        try:
+            # The copy is synced once below, so the final step does not also pay for an
+            # fsync of the whole file while the snapshot is held.
+            copy.execute("PRAGMA synchronous=OFF")
+            step_started = time.perf_counter()
+            source.backup(copy, pages=step_pages, progress=progress)
+            # A single self-contained file: no -wal/-shm to carry around, and it can be
+            # opened immutable.
+            copy.execute("PRAGMA journal_mode=DELETE")
+            report.pages = copy.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            copy.close()
+        source.execute("COMMIT")
+    finally:
+        source.close()
+    fd = os.open(tmp, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    report.check = quick_check(tmp.as_posix())
+    if not report.ok:
+        tmp.unlink(missing_ok=True)
+        raise sqlite3.DatabaseError(f"Backup of {source_path} failed quick_check: {report.check}")
+    os.replace(tmp, target)
+    report.duration_ms = (time.perf_counter() - started) * 1000
+    return report
+
+
+def copy_database(source_path: str, target_path: str, *, step_pages: int = -1, pause_sec: float = 0.0) -> int:
+    return _backup_to(source_path, Path(target_path), step_pages=step_pages, pause_sec=pause_sec).pages
+
+
+def backup_name(sqlite_path: str, moment: datetime | None = None) -> str:
+    stamp = (moment or datetime.now(UTC)).strftime("%Y%m%dT%H%M%S%fZ")
+    return f"{Path(sqlite_path).stem}-{stamp}{BACKUP_SUFFIX}"
+
+
+def list_backups(backup_dir: str, sqlite_path: str) -> list[Path]:
+    # Timestamps sort lexicographically, oldest first.
+    return sorted(Path(backup_dir).glob(f"{Path(sqlite_path).stem}-*{BACKUP_SUFFIX}"))
+
+
+def rotate_backups(backup_dir: str, sqlite_path: str, keep: int) -> list[str]:
+    removed: list[str] = []
+    backups = list_backups(backup_dir, sqlite_path)
+    for path in backups[: max(0, len(backups) - max(1, keep))]:
+        path.unlink(missing_ok=True)
+        removed.append(path.as_posix())
+    return removed
+
+
+def create_backup(
+    sqlite_path: str,
+    backup_dir: str,
+    *,
+    keep: int = 7,
+    step_pages: int = 256,
+    pause_sec: float = 0.0,
+) -> BackupReport:
+    target = Path(backup_dir) / backup_name(sqlite_path)
+    report = _backup_to(sqlite_path, target, step_pages=step_pages, pause_sec=pause_sec)
+    rotate_backups(backup_dir, sqlite_path, keep)
+    return report
+
+
+def restore_backup(backup_path: str, sqlite_path: str) -> int:
+    check = quick_check(backup_path)
+    if check != "ok":
+        raise sqlite3.DatabaseError(f"Backup {backup_path} failed quick_check: {check}")
+    source = sqlite3.connect(readonly_uri(backup_path), uri=True)
+    try:
+        target = sqlite3.connect(sqlite_path)
+        try:
+            # Restoring through the backup API goes through the target's own locks and
+            # WAL, unlike copying the file over it.
+            source.backup(target)
+            target.execute("PRAGMA journal_mode=WAL")
+            pages = target.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            target.close()
+    finally:
+        source.close()
+    return pages
+
+
+class BackupService:
+    def __init__(
+        self,
+        sqlite_path: str,
+        *,
+        backup_dir: str,
+        keep: int,
+        interval_sec: float,
+        step_pages: int = 256,
+        step_pause_ms: float = 0.0,
+    ):
+        self.sqlite_path = sqlite_path
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.interval_sec = interval_sec
+        self.step_pages = step_pages
+        self.step_pause_sec = max(0.0, step_pause_ms) / 1000
+        self._task: asyncio.Task | None = None
+        self.backups = 0
+        self.failures = 0
+        self.last_report: BackupReport | None = None
+        self.max_duration_ms = 0.0
+        self.max_step_pause_ms = 0.0
+
+    async def run_once(self) -> BackupReport:
+        report = await asyncio.to_thread(
+            create_backup,
+            self.sqlite_path,
+            self.backup_dir,
+            keep=self.keep,
+            step_pages=self.step_pages,
+            pause_sec=self.step_pause_sec,
+        )
+        self.backups += 1
+        self.last_report = report
+        self.max_duration_ms = max(self.max_duration_ms, report.duration_ms)
+        self.max_step_pause_ms = max(self.max_step_pause_ms, report.max_step_pause_ms)
+        log.info(
+            "Backup %s: %s pages in %s steps, %.1f ms (max step %.2f ms)",
+            report.path,
+            report.pages,
+            report.steps,
+            report.duration_ms,
+            report.max_step_pause_ms,
+        )
+        return report
+
+    def stats(self) -> dict[str, float]:
+        last = self.last_report
+        return {
+            "backups": self.backups,
+            "failures": self.failures,
+            "last_duration_ms": round(last.duration_ms, 2) if last else 0.0,
+            "last_max_step_pause_ms": round(last.max_step_pause_ms, 2) if last else 0.0,
+            "max_duration_ms": round(self.max_duration_ms, 2),
+            "max_step_pause_ms": round(self.max_step_pause_ms, 2),
+        }
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_sec)
+            try:
+                await self.run_once()
+            except Exception:
+                self.failures += 1
+                log.exception("Backup of %s failed", self.sqlite_path)
+
+    async def start(self) -> None:
+        if self._task is None and self.interval_sec > 0 and self.keep > 0:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
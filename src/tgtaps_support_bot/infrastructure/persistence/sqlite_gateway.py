@@ -1,18 +1,36 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime, timezone
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any
 
 import aiosqlite
 
+from tgtaps_support_bot.domain.value_objects.text_normalization import normalize_text
+from tgtaps_support_bot.infrastructure.persistence.article_hash import (
+    HASHED_COLUMNS,
+    article_content_hash,
+)
+from tgtaps_support_bot.infrastructure.persistence.migrations import run_migrations
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import (
+    read_connection,
+    write_connection,
+)
+
 
 def utc_now_iso() -> str:
-    return datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+    return datetime.now(UTC).replace(microsecond=0).isoformat()
+
+
+def utc_now_iso_and_epoch() -> tuple[str, int]:
+    now = datetime.now(UTC).replace(microsecond=0)
+    return now.isoformat(), int(now.timestamp())
 
 
 SCHEMA_SQL = """
+PRAGMA auto_vacuum=INCREMENTAL;
 PRAGMA journal_mode=WAL;
 PRAGMA foreign_keys=ON;
 
@@ -40,6 +58,26 @@ CREATE INDEX IF NOT EXISTS idx_kb_question_norm ON kb_articles(question_norm);
 CREATE INDEX IF NOT EXISTS idx_kb_category ON kb_articles(category);
 CREATE INDEX IF NOT EXISTS idx_kb_status ON kb_articles(status);
 
+CREATE TABLE IF NOT EXISTS kb_article_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    article_id TEXT NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_kb_articles_insert AFTER INSERT ON kb_articles
+BEGIN
+    INSERT INTO kb_article_changes (article_id) VALUES (NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_kb_articles_update AFTER UPDATE ON kb_articles
+BEGIN
+    INSERT INTO kb_article_changes (article_id) VALUES (NEW.id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_kb_articles_delete AFTER DELETE ON kb_articles
+BEGIN
+    INSERT INTO kb_article_changes (article_id) VALUES (OLD.id);
+END;
+
 CREATE TABLE IF NOT EXISTS kb_unknown_questions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER,
@@ -85,111 +123,340 @@ CREATE TABLE IF NOT EXISTS query_logs (
 
 CREATE INDEX IF NOT EXISTS idx_query_logs_created_at ON query_logs(created_at);
 CREATE INDEX IF NOT EXISTS idx_query_logs_question_norm ON query_logs(question_norm);
+
+CREATE TABLE IF NOT EXISTS query_rollup_hourly (
+    hour TEXT NOT NULL,
+    is_group INTEGER NOT NULL,
+    match_status TEXT NOT NULL,
+    category TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (hour, is_group, match_status, category)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS query_rollup_questions_daily (
+    day TEXT NOT NULL,
+    question_norm TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, question_norm)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_query_logs_rollup AFTER INSERT ON query_logs
+BEGIN
+    INSERT INTO query_rollup_hourly (hour, is_group, match_status, category, count)
+    VALUES (
+        substr(NEW.created_at, 1, 13),
+        NEW.is_group,
+        CASE WHEN NEW.matched_article_id IS NOT NULL THEN 'matched' ELSE COALESCE(NEW.match_reason, 'not_found') END,
+        COALESCE(NEW.category, 'unknown'),
+        1
+    )
+    ON CONFLICT (hour, is_group, match_status, category) DO UPDATE SET count = count + 1;
+    INSERT INTO query_rollup_questions_daily (day, question_norm, count)
+    VALUES (substr(NEW.created_at, 1, 10), NEW.question_norm, 1)
+    ON CONFLICT (day, question_norm) DO UPDATE SET count = count + 1;
+END;
+"""
+
+# Rollups for rows logged before the trigger existed. Each insert only fires while its
+# table is still empty and runs in one IMMEDIATE transaction, so no row is counted twice.
+ROLLUP_BACKFILL_SQL = """
+BEGIN IMMEDIATE;
+
+INSERT INTO query_rollup_hourly (hour, is_group, match_status, category, count)
+SELECT
+    substr(created_at, 1, 13),
+    is_group,
+    CASE WHEN matched_article_id IS NOT NULL THEN 'matched' ELSE COALESCE(match_reason, 'not_found') END,
+    COALESCE(category, 'unknown'),
+    COUNT(*)
+FROM query_logs
+WHERE NOT EXISTS (SELECT 1 FROM query_rollup_hourly)
+GROUP BY 1, 2, 3, 4;
+
+INSERT INTO query_rollup_questions_daily (day, question_norm, count)
+SELECT substr(created_at, 1, 10), question_norm, COUNT(*)
+FROM query_logs
+WHERE NOT EXISTS (SELECT 1 FROM query_rollup_questions_daily)
+GROUP BY 1, 2;
+
+COMMIT;
 """
 
 
 async def ensure_db(sqlite_path: str) -> None:
     path = Path(sqlite_path)
     path.parent.mkdir(parents=True, exist_ok=True)
-    async with aiosqlite.connect(path.as_posix()) as db:
+    async with write_connection(path.as_posix()) as db:
         await db.executescript(SCHEMA_SQL)
-        await db.commit()
+        await db.executescript(ROLLUP_BACKFILL_SQL)
+    await run_migrations(path.as_posix())
 
 
 async def fetch_all_articles(sqlite_path: str) -> list[dict[str, Any]]:
-    async with aiosqlite.connect(sqlite_path) as db:
-        db.row_factory = aiosqlite.Row
-        query = "SELECT * FROM kb_articles WHERE status IN ('active','deprecated')"
-        async with db.execute(query) as cursor:
-            rows = await cursor.fetchall()
+    async with read_connection(sqlite_path) as db:
+        rows = await db.execute_fetchall("SELECT * FROM kb_articles WHERE status IN ('active','deprecated')")
     return [dict(x) for x in rows]
 
 
-async def upsert_articles(sqlite_path: str, articles: list[dict[str, Any]]) -> int:
+async def fetch_article_hashes(sqlite_path: str) -> list[dict[str, Any]]:
+    async with read_connection(sqlite_path) as db:
+        rows = await db.execute_fetchall(
+            "SELECT id, content_hash, updated_at FROM kb_articles WHERE status IN ('active','deprecated')"
+        )
+    return [dict(x) for x in rows]
+
+
+async def get_kb_change_seq(sqlite_path: str) -> int:
+    async with read_connection(sqlite_path) as db:
+        # sqlite_sequence keeps the AUTOINCREMENT high-water mark after pruning.
+        rows = await db.execute_fetchall("SELECT seq FROM sqlite_sequence WHERE name = 'kb_article_changes'")
+    return int(rows[0][0]) if rows else 0
+
+
+async def fetch_changed_articles(sqlite_path: str, after_seq: int, upto_seq: int) -> tuple[list[dict[str, Any]], list[str]]:
+    async with read_connection(sqlite_path) as db:
+        changed = await db.execute_fetchall(
+            "SELECT DISTINCT article_id FROM kb_article_changes WHERE seq > ? AND seq <= ?",
+            (after_seq, upto_seq),
+        )
+        changed_ids = [r["article_id"] for r in changed]
+        rows: list[dict[str, Any]] = []
+        for start in range(0, len(changed_ids), 500):
+            chunk = changed_ids[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows.extend(
+                dict(x)
+                for x in await db.execute_fetchall(
+                    f"SELECT * FROM kb_articles WHERE id IN ({placeholders}) AND status IN ('active','deprecated')",
+                    chunk,
+                )
+            )
+    present = {r["id"] for r in rows}
+    return rows, [x for x in changed_ids if x not in present]
+
+
+async def prune_kb_changes(sqlite_path: str, upto_seq: int) -> None:
+    async with write_connection(sqlite_path) as db:
+        await db.execute("DELETE FROM kb_article_changes WHERE seq <= ?", (upto_seq,))
+
+
+UPSERT_CHUNK_ROWS = 500
+
+ARTICLE_UPSERT_COLUMNS = ("id", *HASHED_COLUMNS, "updated_at", "content_hash")
+
+ARTICLE_UPSERT_SQL = f"""
+INSERT INTO kb_articles ({", ".join(ARTICLE_UPSERT_COLUMNS)})
+VALUES ({", ".join("?" * len(ARTICLE_UPSERT_COLUMNS))})
+ON CONFLICT(id) DO UPDATE SET
+  question=excluded.question,
+  question_norm=excluded.question_norm,
+  summary=excluded.summary,
+  steps_json=excluded.steps_json,
+  docs_links_json=excluded.docs_links_json,
+  video_links_json=excluded.video_links_json,
+  category=excluded.category,
+  tags_json=excluded.tags_json,
+  aliases_json=excluded.aliases_json,
+  related_ids_json=excluded.related_ids_json,
+  answer_version=excluded.answer_version,
+  status=excluded.status,
+  valid_from=excluded.valid_from,
+  valid_to=excluded.valid_to,
+  source=excluded.source,
+  updated_at=excluded.updated_at,
+  content_hash=excluded.content_hash
+"""
+
+
+@dataclass(slots=True)
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def written(self) -> int:
+        return self.inserted + self.updated
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+
+def article_columns(a: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "id": a["id"],
+        "question": a["question"],
+        "question_norm": a["question_norm"],
+        "summary": a["summary"],
+        "steps_json": json.dumps(a.get("steps", []), ensure_ascii=False),
+        "docs_links_json": json.dumps(a.get("docs_links", []), ensure_ascii=False),
+        "video_links_json": json.dumps(a.get("video_links", []), ensure_ascii=False),
+        "category": a.get("category", "general"),
+        "tags_json": json.dumps(a.get("tags", []), ensure_ascii=False),
+        "aliases_json": json.dumps(a.get("aliases", []), ensure_ascii=False),
+        "related_ids_json": json.dumps(a.get("related_ids", []), ensure_ascii=False),
+        "answer_version": int(a.get("answer_version", 1)),
+        "status": a.get("status", "active"),
+        "valid_from": a.get("valid_from"),
+        "valid_to": a.get("valid_to"),
+        "source": a.get("source", "manual"),
+    }
+
+
+async def upsert_articles(
+    sqlite_path: str,
+    articles: list[dict[str, Any]],
+    *,
+    chunk_rows: int = UPSERT_CHUNK_ROWS,
+) -> UpsertResult:
+    result = UpsertResult()
     if not articles:
-        return 0
+        return result
     now = utc_now_iso()
-    payload = []
+    # Later duplicates of an id win, as they did when every row was written in order.
+    incoming: dict[str, tuple[dict[str, Any], str]] = {}
     for a in articles:
-        payload.append(
-            (
-                a["id"],
-                a["question"],
-                a["question_norm"],
-                a["summary"],
-                json.dumps(a.get("steps", []), ensure_ascii=False),
-                json.dumps(a.get("docs_links", []), ensure_ascii=False),
-                json.dumps(a.get("video_links", []), ensure_ascii=False),
-                a.get("category", "general"),
-                json.dumps(a.get("tags", []), ensure_ascii=False),
-                json.dumps(a.get("aliases", []), ensure_ascii=False),
-                json.dumps(a.get("related_ids", []), ensure_ascii=False),
-                int(a.get("answer_version", 1)),
-                a.get("status", "active"),
-                a.get("valid_from") or now,
-                a.get("valid_to"),
-                a.get("source", "manual"),
-                now,
+        columns = article_columns(a)
+        incoming[columns["id"]] = (columns, article_content_hash(columns))
+    ids = list(incoming)
+    chunk_rows = max(1, chunk_rows)
+
+    async with write_connection(sqlite_path) as db:
+        # Take the write lock before diffing so another process cannot change rows in between.
+        await db.execute("BEGIN IMMEDIATE")
+        existing: dict[str, str | None] = {}
+        for start in range(0, len(ids), chunk_rows):
+            chunk = ids[start : start + chunk_rows]
+            rows = await db.execute_fetchall(
+                f"SELECT id, content_hash FROM kb_articles WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
             )
-        )
-    sql = """
-    INSERT INTO kb_articles (
-      id, question, question_norm, summary, steps_json, docs_links_json, video_links_json,
-      category, tags_json, aliases_json, related_ids_json, answer_version, status, valid_from,
-      valid_to, source, updated_at
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ON CONFLICT(id) DO UPDATE SET
-      question=excluded.question,
-      question_norm=excluded.question_norm,
-      summary=excluded.summary,
-      steps_json=excluded.steps_json,
-      docs_links_json=excluded.docs_links_json,
-      video_links_json=excluded.video_links_json,
-      category=excluded.category,
-      tags_json=excluded.tags_json,
-      aliases_json=excluded.aliases_json,
-      related_ids_json=excluded.related_ids_json,
-      answer_version=excluded.answer_version,
-      status=excluded.status,
-      valid_from=excluded.valid_from,
-      valid_to=excluded.valid_to,
-      source=excluded.source,
-      updated_at=excluded.updated_at
-    """
-    async with aiosqlite.connect(sqlite_path) as db:
-        await db.executemany(sql, payload)
-        await db.commit()
-    return len(payload)
+            existing.update((r["id"], r["content_hash"]) for r in rows)
+
+        payload = []
+        for article_id, (columns, digest) in incoming.items():
+            if article_id not in existing:
+                result.inserted += 1
+            elif existing[article_id] == digest:
+                result.unchanged += 1
+                continue
+            else:
+                result.updated += 1
+            values = {**columns, "valid_from": columns["valid_from"] or now, "updated_at": now, "content_hash": digest}
+            payload.append(tuple(values[c] for c in ARTICLE_UPSERT_COLUMNS))
+        # Chunks bound each statement's parameter list; they all share one transaction.
+        for start in range(0, len(payload), chunk_rows):
+            await db.executemany(ARTICLE_UPSERT_SQL, payload[start : start + chunk_rows])
+    return result
 
 
 async def get_article_by_id(sqlite_path: str, article_id: str) -> dict[str, Any] | None:
-    async with aiosqlite.connect(sqlite_path) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute("SELECT * FROM kb_articles WHERE id = ?", (article_id,))
-        row = await cursor.fetchone()
-    return dict(row) if row else None
+    async with read_connection(sqlite_path) as db:
+        rows = await db.execute_fetchall("SELECT * FROM kb_articles WHERE id = ?", (article_id,))
+    return dict(rows[0]) if rows else None
+
+
+USER_LAST_ANSWER_UPSERT_SQL = """
+INSERT INTO user_last_answer (user_id, article_id, question_norm, answered_at)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(user_id) DO UPDATE SET
+  article_id=excluded.article_id,
+  question_norm=excluded.question_norm,
+  answered_at=excluded.answered_at
+"""
+
+QUERY_LOG_INSERT_SQL = """
+INSERT INTO query_logs (
+  user_id, chat_id, is_group, question, question_norm, matched_article_id, score, match_reason, category,
+  created_at, created_at_epoch
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+UNKNOWN_QUESTION_INSERT_SQL = """
+INSERT INTO kb_unknown_questions (
+    user_id, chat_id, is_group, question, question_norm, category_hint, created_at, created_at_epoch
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+GROUP_DEDUP_UPSERT_SQL = """
+INSERT OR REPLACE INTO group_question_dedup (dedup_key, chat_id, question_norm, expires_at_epoch)
+VALUES (?, ?, ?, ?)
+"""
+
+
+def user_last_answer_params(user_id: int, article_id: str, question_norm: str) -> tuple:
+    return (user_id, article_id, question_norm, utc_now_iso())
+
+
+def query_event_params(
+    *,
+    user_id: int | None,
+    chat_id: int | None,
+    is_group: bool,
+    question: str,
+    question_norm: str,
+    matched_article_id: str | None,
+    score: float | None,
+    match_reason: str | None,
+    category: str | None,
+) -> tuple:
+    return (
+        user_id,
+        chat_id,
+        1 if is_group else 0,
+        question.strip(),
+        question_norm,
+        matched_article_id,
+        score,
+        match_reason,
+        category,
+        *utc_now_iso_and_epoch(),
+    )
+
+
+def unknown_question_params(
+    *,
+    user_id: int | None,
+    chat_id: int | None,
+    is_group: bool,
+    question: str,
+    category_hint: str | None = None,
+) -> tuple:
+    return (
+        user_id,
+        chat_id,
+        1 if is_group else 0,
+        question.strip(),
+        normalize_text(question),
+        category_hint,
+        *utc_now_iso_and_epoch(),
+    )
+
+
+async def fetch_group_dedup(sqlite_path: str, now_epoch: int) -> list[dict[str, Any]]:
+    async with read_connection(sqlite_path) as db:
+        rows = await db.execute_fetchall(
+            """
+            SELECT dedup_key, expires_at_epoch FROM group_question_dedup
+            WHERE expires_at_epoch >= ?
+            ORDER BY expires_at_epoch
+            """,
+            (now_epoch,),
+        )
+    return [dict(x) for x in rows]
 
 
 async def set_user_last_answer(sqlite_path: str, user_id: int, article_id: str, question_norm: str) -> None:
-    sql = """
-    INSERT INTO user_last_answer (user_id, article_id, question_norm, answered_at)
-    VALUES (?, ?, ?, ?)
-    ON CONFLICT(user_id) DO UPDATE SET
-      article_id=excluded.article_id,
-      question_norm=excluded.question_norm,
-      answered_at=excluded.answered_at
-    """
-    async with aiosqlite.connect(sqlite_path) as db:
-        await db.execute(sql, (user_id, article_id, question_norm, utc_now_iso()))
-        await db.commit()
+    async with write_connection(sqlite_path) as db:
+        await db.execute(USER_LAST_ANSWER_UPSERT_SQL, user_last_answer_params(user_id, article_id, question_norm))
 
 
 async def get_user_last_answer(sqlite_path: str, user_id: int) -> dict[str, Any] | None:
-    async with aiosqlite.connect(sqlite_path) as db:
-        db.row_factory = aiosqlite.Row
-        cursor = await db.execute("SELECT * FROM user_last_answer WHERE user_id = ?", (user_id,))
-        row = await cursor.fetchone()
-    return dict(row) if row else None
+    async with read_connection(sqlite_path) as db:
+        rows = await db.execute_fetchall("SELECT * FROM user_last_answer WHERE user_id = ?", (user_id,))
+    return dict(rows[0]) if rows else None
 
 
 async def log_query_event(
@@ -205,89 +472,90 @@ async def log_query_event(
     match_reason: str | None,
     category: str | None,
 ) -> None:
-    sql = """
-    INSERT INTO query_logs (
-      user_id, chat_id, is_group, question, question_norm, matched_article_id, score, match_reason, category, created_at
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """
-    async with aiosqlite.connect(sqlite_path) as db:
-        await db.execute(
-            sql,
-            (
-                user_id,
-                chat_id,
-                1 if is_group else 0,
-                question.strip(),
-                question_norm,
-                matched_article_id,
-                score,
-                match_reason,
-                category,
-                utc_now_iso(),
-            ),
-        )
-        await db.commit()
+    params = query_event_params(
+        user_id=user_id,
+        chat_id=chat_id,
+        is_group=is_group,
+        question=question,
+        question_norm=question_norm,
+        matched_article_id=matched_article_id,
+        score=score,
+        match_reason=match_reason,
+        category=category,
+    )
+    async with write_connection(sqlite_path) as db:
+        await db.execute(QUERY_LOG_INSERT_SQL, params)
 
 
-async def get_analytics_snapshot(sqlite_path: str, *, window_days: int = 30) -> dict[str, Any]:
-    async with aiosqlite.connect(sqlite_path) as db:
-        db.row_factory = aiosqlite.Row
-        since_expr = f"datetime('now', '-{int(window_days)} days')"
+def rollup_hour(moment: datetime) -> str:
+    return moment.astimezone(UTC).strftime("%Y-%m-%dT%H")
 
-        total_query = f"SELECT COUNT(*) AS c FROM query_logs WHERE datetime(created_at) >= {since_expr}"
-        total = (await (await db.execute(total_query)).fetchone())["c"]
 
-        top_query = f"""
-        SELECT question_norm, COUNT(*) AS c
-        FROM query_logs
-        WHERE datetime(created_at) >= {since_expr}
+async def get_analytics_snapshot(sqlite_path: str, *, window_days: int = 30) -> dict[str, Any]:
+    async with read_connection(sqlite_path) as db:
+        return await query_analytics_snapshot(db, window_days=window_days)
+
+
+async def query_analytics_snapshot(db: aiosqlite.Connection, *, window_days: int = 30) -> dict[str, Any]:
+    # Counts are bucketed by hour (questions by day), so the window is rounded down to the bucket start.
+    since = datetime.now(UTC) - timedelta(days=window_days)
+    since_hour = rollup_hour(since)
+    totals = (
+        await db.execute_fetchall(
+            """
+            SELECT
+              SUM(count) AS total,
+              SUM(CASE WHEN match_status != 'matched' THEN count ELSE 0 END) AS unknown_count,
+              SUM(CASE WHEN is_group = 1 THEN count ELSE 0 END) AS group_count,
+              SUM(CASE WHEN is_group = 0 THEN count ELSE 0 END) AS private_count
+            FROM query_rollup_hourly
+            WHERE hour >= ?
+            """,
+            (since_hour,),
+        )
+    )[0]
+
+    top_rows = await db.execute_fetchall(
+        """
+        SELECT question_norm, SUM(count) AS c
+        FROM query_rollup_questions_daily
+        WHERE day >= ?
         GROUP BY question_norm
         ORDER BY c DESC
         LIMIT 10
+        """,
+        (since_hour[:10],),
+    )
+
+    category_rows = await db.execute_fetchall(
         """
-        top_rows = await (await db.execute(top_query)).fetchall()
+        SELECT category, SUM(count) AS c
+        FROM query_rollup_hourly
+        WHERE hour >= ?
+        GROUP BY category
+        ORDER BY c DESC
+        LIMIT 5
+        """,
+        (since_hour,),
+    )
 
-        latest_query = f"""
+    latest_rows = await db.execute_fetchall(
+        """
         SELECT question, question_norm, matched_article_id, created_at, is_group
         FROM query_logs
-        WHERE datetime(created_at) >= {since_expr}
+        WHERE created_at_epoch >= ?
         ORDER BY id DESC
         LIMIT 10
-        """
-        latest_rows = await (await db.execute(latest_query)).fetchall()
-
-        unknown_query = f"""
-        SELECT COUNT(*) AS c
-        FROM query_logs
-        WHERE datetime(created_at) >= {since_expr} AND matched_article_id IS NULL
-        """
-        unknown_count = (await (await db.execute(unknown_query)).fetchone())["c"]
-
-        group_query = f"""
-        SELECT
-          SUM(CASE WHEN is_group = 1 THEN 1 ELSE 0 END) AS group_count,
-          SUM(CASE WHEN is_group = 0 THEN 1 ELSE 0 END) AS private_count
-        FROM query_logs
-        WHERE datetime(created_at) >= {since_expr}
-        """
-        group_row = await (await db.execute(group_query)).fetchone()
-
-        category_query = f"""
-        SELECT COALESCE(category, 'unknown') AS category, COUNT(*) AS c
-        FROM query_logs
-        WHERE datetime(created_at) >= {since_expr}
-        GROUP BY COALESCE(category, 'unknown')
-        ORDER BY c DESC
-        LIMIT 5
-        """
-        category_rows = await (await db.execute(category_query)).fetchall()
+        """,
+        (int(since.timestamp()),),
+    )
 
     return {
         "window_days": window_days,
-        "total": int(total or 0),
-        "unknown_count": int(unknown_count or 0),
-        "group_count": int((group_row["group_count"] if group_row else 0) or 0),
-        "private_count": int((group_row["private_count"] if group_row else 0) or 0),
+        "total": int(totals["total"] or 0),
+        "unknown_count": int(totals["unknown_count"] or 0),
+        "group_count": int(totals["group_count"] or 0),
+        "private_count": int(totals["private_count"] or 0),
         "top10": [dict(x) for x in top_rows],
         "latest10": [dict(x) for x in latest_rows],
         "top_categories": [dict(x) for x in category_rows],
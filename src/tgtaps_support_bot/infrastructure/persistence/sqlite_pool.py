@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+log = logging.getLogger(__name__)
+
+
+async def _configure(
+    db: aiosqlite.Connection,
+    *,
+    cache_size_kib: int,
+    mmap_size: int,
+    busy_timeout_ms: int,
+) -> aiosqlite.Connection:
+    db.row_factory = aiosqlite.Row
+    # Negative cache_size is in KiB rather than pages.
+    await db.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+    await db.execute("PRAGMA synchronous=NORMAL")
+    await db.execute(f"PRAGMA cache_size=-{int(cache_size_kib)}")
+    await db.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+    await db.execute("PRAGMA foreign_keys=ON")
+    return db
+
+
+class SQLiteConnectionManager:
+    def __init__(
+        self,
+        sqlite_path: str,
+        *,
+        read_pool_size: int = 2,
+        cache_size_kib: int = 16384,
+        mmap_size: int = 268435456,
+        busy_timeout_ms: int = 5000,
+    ):
+        self.sqlite_path = sqlite_path
+        self.read_pool_size = max(1, read_pool_size)
+        self.pragmas = {"cache_size_kib": cache_size_kib, "mmap_size": mmap_size, "busy_timeout_ms": busy_timeout_ms}
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock = asyncio.Lock()
+        self._readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
+        self._all_readers: list[aiosqlite.Connection] = []
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def connect(self) -> aiosqlite.Connection:
+        return await _configure(await aiosqlite.connect(self.sqlite_path), **self.pragmas)
+
+    async def open(self) -> None:
+        if self._writer is not None:
+            return
+        self._writer = await self.connect()
+        for _ in range(self.read_pool_size):
+            db = await self.connect()
+            self._all_readers.append(db)
+            self._readers.put_nowait(db)
+        log.info("SQLite pool opened: %s (1 writer, %s readers)", self.sqlite_path, self.read_pool_size)
+
+    async def close(self) -> None:
+        writer, self._writer = self._writer, None
+        readers, self._all_readers = self._all_readers, []
+        self._readers = asyncio.Queue()
+        if writer is not None:
+            async with self._write_lock:
+                await writer.close()
+        for db in readers:
+            await db.close()
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        if self._writer is None:
+            raise RuntimeError(f"SQLite pool for {self.sqlite_path} is not open")
+        db = await self._readers.get()
+        try:
+            yield db
+        finally:
+            if db in self._all_readers:
+                self._readers.put_nowait(db)
+
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        # One writer serializes transactions; SQLite would serialize them anyway, but
+        # without SQLITE_BUSY retries and without a connection per caller.
+        async with self._write_lock:
+            db = self._writer
+            if db is None:
+                raise RuntimeError(f"SQLite pool for {self.sqlite_path} is not open")
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                raise
+            await db.commit()
+
+
+_managers: dict[str, SQLiteConnectionManager] = {}
+
+
+def _key(sqlite_path: str) -> str:
+    return os.path.abspath(sqlite_path)
+
+
+def get_connection_manager(sqlite_path: str) -> SQLiteConnectionManager | None:
+    return _managers.get(_key(sqlite_path))
+
+
+async def open_connection_manager(sqlite_path: str, **options) -> SQLiteConnectionManager:
+    manager = _managers.get(_key(sqlite_path))
+    if manager is None:
+        manager = SQLiteConnectionManager(sqlite_path, **options)
+        _managers[_key(sqlite_path)] = manager
+    await manager.open()
+    return manager
+
+
+async def close_connection_manager(sqlite_path: str) -> None:
+    manager = _managers.pop(_key(sqlite_path), None)
+    if manager is not None:
+        await manager.close()
+
+
+# Scripts and tests that never open a manager fall back to a short-lived connection.
+@asynccontextmanager
+async def _transient(sqlite_path: str, *, write: bool) -> AsyncIterator[aiosqlite.Connection]:
+    db = await _configure(
+        await aiosqlite.connect(sqlite_path),
+        cache_size_kib=2000,
+        mmap_size=0,
+        busy_timeout_ms=5000,
+    )
+    try:
+        yield db
+        if write:
+            await db.commit()
+    finally:
+        await db.close()
+
+
+def read_connection(sqlite_path: str):
+    manager = get_connection_manager(sqlite_path)
+    if manager is not None and manager.is_open:
+        return manager.reader()
+    return _transient(sqlite_path, write=False)
+
+
+def write_connection(sqlite_path: str):
+    manager = get_connection_manager(sqlite_path)
+    if manager is not None and manager.is_open:
+        return manager.writer()
+    return _transient(sqlite_path, write=True)
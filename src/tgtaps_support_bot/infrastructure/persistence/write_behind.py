@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    QUERY_LOG_INSERT_SQL,
+    UNKNOWN_QUESTION_INSERT_SQL,
+    query_event_params,
+    unknown_question_params,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import write_connection
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        sqlite_path: str,
+        *,
+        batch_rows: int = 200,
+        flush_interval_ms: float = 250.0,
+        max_queue: int = 10000,
+    ):
+        self.sqlite_path = sqlite_path
+        self.batch_rows = max(1, batch_rows)
+        self.flush_interval_sec = max(0.0, flush_interval_ms) / 1000
+        self.max_queue = max_queue
+        # Flush early once a full batch is waiting, or once producers would block.
+        self._flush_at = min(self.batch_rows, max_queue) if max_queue > 0 else self.batch_rows
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._batch_ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.enqueued = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.batches = 0
+        self.backpressure_waits = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="write-behind")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            await self._queue.put(_STOP)
+            self._batch_ready.set()
+            await task
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            await self._flush(leftover)
+        log.info("Write-behind queue stopped: %s", self.stats())
+
+    async def put(self, sql: str, params: tuple) -> None:
+        if self._task is None:
+            # Not running (scripts, tests, after shutdown): write through.
+            await self._flush([(sql, params)])
+            return
+        if self._queue.full():
+            self.backpressure_waits += 1
+            self._batch_ready.set()
+        await self._queue.put((sql, params))
+        self.enqueued += 1
+        if self._queue.qsize() >= self._flush_at:
+            self._batch_ready.set()
+
+    async def log_query_event(self, **event) -> None:
+        await self.put(QUERY_LOG_INSERT_SQL, query_event_params(**event))
+
+    async def log_unknown_question(self, **event) -> None:
+        await self.put(UNKNOWN_QUESTION_INSERT_SQL, unknown_question_params(**event))
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "depth": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "flushed_rows": self.flushed_rows,
+            "failed_rows": self.failed_rows,
+            "batches": self.batches,
+            "backpressure_waits": self.backpressure_waits,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size": self.max_batch_size,
+            "avg_batch_size": round(self.flushed_rows / self.batches, 1) if self.batches else 0.0,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self.total_flush_ms / self.batches, 2) if self.batches else 0.0,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            if first is not _STOP and self._queue.qsize() + 1 < self._flush_at:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval_sec)
+                except TimeoutError:
+                    pass
+            self._batch_ready.clear()
+
+            batch = [] if first is _STOP else [first]
+            stopping = first is _STOP
+            while len(batch) < self.batch_rows and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            if self._queue.qsize() >= self._flush_at:
+                self._batch_ready.set()
+            if batch:
+                await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: list[tuple[str, tuple]]) -> None:
+        grouped: dict[str, list[tuple]] = {}
+        for sql, params in batch:
+            grouped.setdefault(sql, []).append(params)
+        started = time.perf_counter()
+        try:
+            async with write_connection(self.sqlite_path) as db:
+                for sql, rows in grouped.items():
+                    await db.executemany(sql, rows)
+        except Exception:
+            self.failed_rows += len(batch)
+            log.exception("Write-behind flush failed, dropped %s rows", len(batch))
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.batches += 1
+        self.flushed_rows += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
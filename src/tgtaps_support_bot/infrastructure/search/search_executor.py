@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from collections.abc import Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from tgtaps_support_bot.domain.services.search_engine import SearchEngine, SearchResult
+
+EXECUTOR_KINDS = ("inline", "thread", "process")
+
+SearchRequest = tuple[str, str | None, int]
+
+_worker_engine: SearchEngine | None = None
+
+
+def _init_worker(rows: list[dict], options: dict) -> None:
+    global _worker_engine
+    _worker_engine = SearchEngine(rows, **options)
+
+
+def _worker_search_many(requests: Sequence[SearchRequest]) -> list[list[SearchResult]]:
+    assert _worker_engine is not None
+    return [_worker_engine.search(q, category_hint=hint, top_k=top_k) for q, hint, top_k in requests]
+
+
+def _search_many(engine: SearchEngine, requests: Sequence[SearchRequest]) -> list[list[SearchResult]]:
+    return [engine.search(q, category_hint=hint, top_k=top_k) for q, hint, top_k in requests]
+
+
+class AsyncSearchService:
+    def __init__(self, search_engine: SearchEngine, *, executor_kind: str = "thread", max_workers: int = 4):
+        if executor_kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown search executor: {executor_kind!r}. Expected one of {EXECUTOR_KINDS}.")
+        self.search_engine = search_engine
+        self.executor_kind = executor_kind
+        self.max_workers = max_workers
+        self._executor: Executor | None = None
+        self._executor_kb_version: str | None = None
+
+    def normalize(self, text: str) -> str:
+        return self.search_engine.normalize(text)
+
+    def _get_executor(self) -> Executor:
+        if self.executor_kind == "thread":
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="search")
+            return self._executor
+
+        # Worker processes hold their own index copy; rebuild them after a hot reload.
+        kb_version = self.search_engine.kb_version
+        if self._executor is None or self._executor_kb_version != kb_version:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(self.search_engine.rows, self.search_engine.options()),
+            )
+            self._executor_kb_version = kb_version
+        return self._executor
+
+    async def search(self, question: str, category_hint: str | None = None, top_k: int = 5) -> list[SearchResult]:
+        if self.executor_kind == "inline":
+            return self.search_engine.search(question, category_hint=category_hint, top_k=top_k)
+        results = await self.search_many([(question, category_hint, top_k)])
+        return results[0]
+
+    async def search_many(self, requests: Sequence[SearchRequest]) -> list[list[SearchResult]]:
+        if not requests:
+            return []
+        if self.executor_kind == "inline":
+            return _search_many(self.search_engine, requests)
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        if self.executor_kind == "process":
+            return await loop.run_in_executor(executor, _worker_search_many, list(requests))
+        return await loop.run_in_executor(executor, functools.partial(_search_many, self.search_engine, list(requests)))
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
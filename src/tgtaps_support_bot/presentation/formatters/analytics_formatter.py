@@ -11,6 +11,10 @@ def format_analytics(snapshot: dict) -> str:
     unknown_rate = (unknown / total * 100.0) if total else 0.0
     lines: list[str] = [
         f"📊 Аналитика за {window_days} дн.",
+    ]
+    if snapshot.get("stale"):
+        lines.append(f"⚠️ Отчёт не успел обновиться, показаны данные на {snapshot['generated_at']}")
+    lines += [
         "",
         f"2) Количество запросов: {total}",
         f"   • ЛС: {private_count}",
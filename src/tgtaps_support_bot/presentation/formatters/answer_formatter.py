@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-import json
 import re
 
 from tgtaps_support_bot.domain.services.search_engine import SearchResult
+from tgtaps_support_bot.domain.services.search_index import ArticleContent
 
 
 _OLD_DOCS_PREFIX = "https://docs.tgtaps.com/tgtaps-docs"
@@ -40,11 +40,18 @@ def _extract_doc_urls(*texts: str) -> list[dict[str, str]]:
     return links
 
 
-def format_full_answer(primary: dict, similar: list[SearchResult], previous_article_id: str | None = None) -> str:
+def format_full_answer(
+    primary: dict,
+    similar: list[SearchResult],
+    previous_article_id: str | None = None,
+    content: ArticleContent | None = None,
+) -> str:
+    if content is None:
+        content = ArticleContent.from_row(primary)
     summary = _normalize_docs_urls(primary["summary"])
-    steps = [_normalize_docs_urls(step) for step in json.loads(primary["steps_json"])]
-    docs_links = json.loads(primary["docs_links_json"])
-    video_links = json.loads(primary["video_links_json"])
+    steps = [_normalize_docs_urls(step) for step in content.steps]
+    docs_links = content.docs_links
+    video_links = content.video_links
     docs_links = [{**link, "url": _normalize_docs_urls(link["url"])} for link in docs_links if link.get("url")]
 
     if not steps:
@@ -2,19 +2,39 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from pathlib import Path
 
 from aiogram import Bot, Dispatcher
 from dotenv import load_dotenv
 
+from tgtaps_support_bot.application.use_cases.group_pipeline import GroupMessagePipeline
 from tgtaps_support_bot.infrastructure.bot.anti_spam import GroupAntiSpam
+from tgtaps_support_bot.infrastructure.bot.rate_limit import BucketLimit, RateLimiter
+from tgtaps_support_bot.infrastructure.bot.send_queue import OutboundQueue
 from tgtaps_support_bot.presentation.telegram.handlers import HandlerBundle
+from tgtaps_support_bot.presentation.telegram.webhook import BOT_MODES, WebhookServer
 from config.env.settings import get_settings
-from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import ensure_db, fetch_all_articles
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    get_kb_change_seq,
+    prune_kb_changes,
+)
+from tgtaps_support_bot.infrastructure.persistence.analytics_reader import AnalyticsReader
+from tgtaps_support_bot.infrastructure.persistence.article_store import ArticleStore
+from tgtaps_support_bot.infrastructure.persistence.index_snapshot import load_or_build_index, snapshot_path_for
+from tgtaps_support_bot.infrastructure.persistence.kb_hot_reload import KBHotReloader
+from tgtaps_support_bot.infrastructure.persistence.last_answer_cache import LastAnswerCache
 from tgtaps_support_bot.infrastructure.persistence.kb_loader import load_seed_to_db
+from tgtaps_support_bot.infrastructure.persistence.retention import RetentionService
+from tgtaps_support_bot.infrastructure.persistence.sqlite_backup import BackupService
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import close_connection_manager, open_connection_manager
+from tgtaps_support_bot.infrastructure.persistence.write_behind import WriteBehindQueue
 from tgtaps_support_bot.infrastructure.logging.logging_setup import setup_logging
 from tgtaps_support_bot.infrastructure.observability.unknown_questions_logger import UnknownQuestionsLogger
+from tgtaps_support_bot.domain.services.search_cache import SearchResultCache
 from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+from tgtaps_support_bot.infrastructure.search.search_executor import AsyncSearchService
 
 log = logging.getLogger(__name__)
 
@@ -25,41 +45,207 @@ async def bootstrap() -> tuple[Bot, Dispatcher]:
     setup_logging(settings.log_level)
 
     await ensure_db(settings.sqlite_path)
+    await open_connection_manager(
+        settings.sqlite_path,
+        read_pool_size=settings.sqlite_read_pool_size,
+        cache_size_kib=settings.sqlite_cache_size_kib,
+        mmap_size=settings.sqlite_mmap_size,
+        busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+    )
 
     seed_path = Path("data/seed/kb_seed.json")
     if seed_path.exists():
         loaded = await load_seed_to_db(settings.sqlite_path, seed_path.as_posix())
-        log.info("Loaded seed KB articles: %s", loaded)
-
-    rows = await fetch_all_articles(settings.sqlite_path)
-    if not rows:
+        log.info(
+            "Loaded seed KB articles: %s inserted, %s updated, %s unchanged",
+            loaded.inserted,
+            loaded.updated,
+            loaded.unchanged,
+        )
+
+    change_seq = await get_kb_change_seq(settings.sqlite_path)
+    snapshot_path = snapshot_path_for(settings.sqlite_path) if settings.search_index_snapshot else None
+    started = time.perf_counter()
+    index, index_source = await load_or_build_index(settings.sqlite_path, snapshot_path)
+    log.info(
+        "Search index ready: %s articles from %s in %.1f ms",
+        len(index),
+        index_source,
+        (time.perf_counter() - started) * 1000,
+    )
+    await prune_kb_changes(settings.sqlite_path, change_seq)
+    if not len(index):
         log.warning("KB is empty. Add seed or run parser scripts before bot start.")
 
-    search_engine = SearchEngine(rows)
-    anti_spam = GroupAntiSpam(settings.sqlite_path, settings.group_antispam_ttl_sec)
-    unknown_logger = UnknownQuestionsLogger(settings.sqlite_path)
+    search_engine = SearchEngine.from_index(
+        index,
+        candidate_budget=settings.search_candidate_budget or None,
+        trigram_budget=settings.search_trigram_budget,
+        min_trigram_dice=settings.search_trigram_min_dice,
+        full_scan_below=settings.min_confidence,
+        mode=settings.search_engine_mode,
+        workers=settings.search_workers,
+        cache=SearchResultCache(settings.search_cache_size, settings.search_cache_ttl_sec)
+        if settings.search_cache_size > 0
+        else None,
+    )
+    kb_reloader = KBHotReloader(
+        settings.sqlite_path,
+        search_engine,
+        interval_sec=settings.kb_reload_interval_sec,
+        last_seq=change_seq,
+        snapshot_path=snapshot_path,
+    )
+    search_service = AsyncSearchService(
+        search_engine,
+        executor_kind=settings.search_executor,
+        max_workers=settings.search_executor_workers,
+    )
+    write_queue = WriteBehindQueue(
+        settings.sqlite_path,
+        batch_rows=settings.write_behind_batch_rows,
+        flush_interval_ms=settings.write_behind_flush_ms,
+        max_queue=settings.write_behind_max_queue,
+    )
+    anti_spam = GroupAntiSpam(
+        settings.sqlite_path,
+        settings.group_antispam_ttl_sec,
+        persist=settings.group_antispam_persist,
+        write_queue=write_queue,
+        max_entries=settings.group_antispam_max_entries,
+    )
+    await anti_spam.load()
+    unknown_logger = UnknownQuestionsLogger(settings.sqlite_path, write_queue)
+    last_answers = LastAnswerCache(
+        settings.sqlite_path,
+        max_entries=settings.last_answer_cache_size,
+        flush_interval_sec=settings.last_answer_flush_sec,
+    )
+    analytics = AnalyticsReader(
+        settings.sqlite_path,
+        copy_path=settings.analytics_copy_path,
+        refresh_interval_sec=settings.analytics_copy_refresh_sec,
+        timeout_sec=settings.analytics_timeout_sec,
+    )
+    retention = RetentionService(
+        settings.sqlite_path,
+        horizon_days=settings.retention_days,
+        rollup_horizon_days=settings.retention_rollup_days,
+        archive_dir=settings.retention_archive_dir,
+        batch_rows=settings.retention_batch_rows,
+        interval_sec=settings.retention_interval_sec,
+    )
+    backups = BackupService(
+        settings.sqlite_path,
+        backup_dir=settings.backup_dir,
+        keep=settings.backup_keep,
+        interval_sec=settings.backup_interval_sec,
+        step_pages=settings.backup_step_pages,
+        step_pause_ms=settings.backup_step_pause_ms,
+    )
+    group_pipeline = GroupMessagePipeline(
+        search_service=search_service,
+        anti_spam=anti_spam,
+        min_confidence=settings.min_confidence,
+        require_question=settings.group_require_question,
+        min_tokens=settings.group_min_tokens,
+        chat_cooldown_sec=settings.group_chat_cooldown_sec,
+        max_chats=settings.group_stats_max_chats,
+    )
+    rate_limiter = (
+        RateLimiter(
+            user=BucketLimit(settings.rate_limit_user_rate, settings.rate_limit_user_burst),
+            chat=BucketLimit(settings.rate_limit_chat_rate, settings.rate_limit_chat_burst),
+            global_=BucketLimit(settings.rate_limit_global_rate, settings.rate_limit_global_burst),
+            notice_interval_sec=settings.rate_limit_notice_sec,
+        )
+        if settings.rate_limit_enabled
+        else None
+    )
+    outbox = OutboundQueue(
+        per_chat_interval_sec=settings.outbox_chat_interval_sec,
+        group_interval_sec=settings.outbox_group_interval_sec,
+        global_rate=settings.outbox_global_rate,
+        max_pending=settings.outbox_max_pending,
+        max_per_chat=settings.outbox_max_per_chat,
+        max_attempts=settings.outbox_max_attempts,
+        drain_timeout_sec=settings.outbox_drain_timeout_sec,
+    )
 
     bundle = HandlerBundle(
         sqlite_path=settings.sqlite_path,
         bot_username=settings.bot_username,
-        search_engine=search_engine,
-        anti_spam=anti_spam,
+        search_service=search_service,
+        article_store=ArticleStore(settings.sqlite_path, search_engine),
+        group_pipeline=group_pipeline,
         unknown_logger=unknown_logger,
+        write_queue=write_queue,
+        last_answers=last_answers,
+        analytics=analytics,
+        outbox=outbox,
         min_confidence=settings.min_confidence,
         ambiguity_delta=settings.ambiguity_delta,
         owner_ids=settings.owner_ids_set,
+        rate_limiter=rate_limiter,
     )
 
     if not settings.bot_token:
         raise RuntimeError("BOT_TOKEN is empty. Set it in .env before running the bot.")
+    if settings.bot_mode not in BOT_MODES:
+        raise RuntimeError(f"BOT_MODE must be one of {', '.join(BOT_MODES)}, got {settings.bot_mode!r}.")
+    if settings.bot_mode == "webhook" and not (settings.webhook_url and settings.webhook_secret):
+        raise RuntimeError("BOT_MODE=webhook needs WEBHOOK_URL and WEBHOOK_SECRET in .env.")
     bot = Bot(settings.bot_token)
     dp = Dispatcher()
     dp.include_router(bundle.create_router())
+    dp.startup.register(outbox.start)
+    dp.startup.register(kb_reloader.start)
+    dp.startup.register(write_queue.start)
+    dp.startup.register(retention.start)
+    dp.startup.register(last_answers.start)
+    dp.startup.register(analytics.start)
+    dp.startup.register(backups.start)
+    # Drained first, while the bot session is still open.
+    dp.shutdown.register(outbox.stop)
+    dp.shutdown.register(group_pipeline.stop)
+    if rate_limiter is not None:
+        dp.shutdown.register(rate_limiter.stop)
+    dp.shutdown.register(kb_reloader.stop)
+    dp.shutdown.register(retention.stop)
+    dp.shutdown.register(analytics.stop)
+    dp.shutdown.register(backups.stop)
+    dp.shutdown.register(search_service.close)
+    dp.shutdown.register(write_queue.stop)
+    dp.shutdown.register(last_answers.stop)
+
+    async def close_db() -> None:
+        await close_connection_manager(settings.sqlite_path)
+
+    # Registered last: shutdown hooks run in order and the ones above may still write.
+    dp.shutdown.register(close_db)
     return bot, dp
 
 
 async def run() -> None:
     bot, dp = await bootstrap()
+    settings = get_settings()
+    if settings.bot_mode == "webhook":
+        server = WebhookServer(
+            bot,
+            dp,
+            url=settings.webhook_url,
+            path=settings.webhook_path,
+            secret_token=settings.webhook_secret,
+            host=settings.webhook_host,
+            port=settings.webhook_port,
+            max_connections=settings.webhook_max_connections,
+            max_in_flight=settings.webhook_max_in_flight,
+            drain_timeout_sec=settings.webhook_drain_timeout_sec,
+        )
+        await server.serve()
+        return
+    # getUpdates is refused while a webhook is set, e.g. after switching back from webhook mode.
+    await bot.delete_webhook()
     await dp.start_polling(bot)
 
 
@@ -7,24 +7,25 @@ from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.types import CallbackQuery, Message
 
+from tgtaps_support_bot.application.use_cases.group_pipeline import GroupMessagePipeline
 from tgtaps_support_bot.application.use_cases.owner_analytics import build_owner_analytics_report
-from tgtaps_support_bot.application.use_cases.query_resolution import (
-    resolve_group_question,
-    resolve_private_question,
-)
+from tgtaps_support_bot.application.use_cases.query_resolution import resolve_private_question_async
 from tgtaps_support_bot.presentation.telegram.keyboards import category_keyboard, disambiguation_keyboard
-from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
-    get_article_by_id,
-    get_user_last_answer,
-    log_query_event,
-    set_user_last_answer,
-)
+from tgtaps_support_bot.presentation.telegram.rate_limit_middleware import RateLimitMiddleware
+from tgtaps_support_bot.infrastructure.bot.rate_limit import RateLimiter
+from tgtaps_support_bot.infrastructure.bot.send_queue import OutboundQueue
+from tgtaps_support_bot.infrastructure.persistence.analytics_reader import AnalyticsReader
+from tgtaps_support_bot.infrastructure.persistence.article_store import ArticleStore
+from tgtaps_support_bot.infrastructure.persistence.last_answer_cache import LastAnswerCache
 from tgtaps_support_bot.presentation.formatters.answer_formatter import format_full_answer, format_group_answer
 from tgtaps_support_bot.infrastructure.observability.unknown_questions_logger import UnknownQuestionsLogger
-from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+from tgtaps_support_bot.infrastructure.persistence.write_behind import WriteBehindQueue
+from tgtaps_support_bot.infrastructure.search.search_executor import AsyncSearchService
 
 log = logging.getLogger(__name__)
 
+DROPPED_TEXT = "Бот сейчас перегружен. Попробуйте ещё раз через минуту."
+
 
 class HandlerBundle:
     def __init__(
@@ -32,29 +33,46 @@ class HandlerBundle:
         *,
         sqlite_path: str,
         bot_username: str,
-        search_engine: SearchEngine,
-        anti_spam,
+        search_service: AsyncSearchService,
+        article_store: ArticleStore,
+        group_pipeline: GroupMessagePipeline,
         unknown_logger: UnknownQuestionsLogger,
+        write_queue: WriteBehindQueue,
+        last_answers: LastAnswerCache,
+        analytics: AnalyticsReader,
+        outbox: OutboundQueue,
         min_confidence: float,
         ambiguity_delta: float,
         owner_ids: set[int],
+        rate_limiter: RateLimiter | None = None,
     ):
         self.sqlite_path = sqlite_path
         self.bot_username = bot_username
-        self.search_engine = search_engine
-        self.anti_spam = anti_spam
+        self.search_service = search_service
+        self.article_store = article_store
+        self.group_pipeline = group_pipeline
         self.unknown_logger = unknown_logger
+        self.write_queue = write_queue
+        self.last_answers = last_answers
+        self.analytics = analytics
+        self.outbox = outbox
         self.min_confidence = min_confidence
         self.ambiguity_delta = ambiguity_delta
         self.owner_ids = owner_ids
+        self.rate_limiter = rate_limiter
         self.pending_results: dict[int, list] = defaultdict(list)
 
     def create_router(self) -> Router:
         router = Router()
+        if self.rate_limiter is not None:
+            # Inner middleware: only updates that matched a handler spend tokens.
+            router.message.middleware(RateLimitMiddleware(self.rate_limiter, self.outbox))
+            router.callback_query.middleware(RateLimitMiddleware(self.rate_limiter, self.outbox))
 
         @router.message(F.chat.type == "private", Command("start", "help"))
         async def private_start_help(message: Message) -> None:
-            await message.answer(
+            self._answer(
+                message,
                 (
                     "Привет! Я бот поддержки TgTaps.\n\n"
                     "Напишите вопрос в свободной форме, и я подберу ответ из базы знаний.\n"
@@ -67,14 +85,15 @@ class HandlerBundle:
         async def owner_analytics(message: Message) -> None:
             user_id = message.from_user.id if message.from_user else 0
             if user_id not in self.owner_ids:
-                await message.answer("Команда доступна только владельцу бота.")
+                self._answer(message, "Команда доступна только владельцу бота.")
                 return
-            report = await build_owner_analytics_report(self.sqlite_path, window_days=30)
-            await message.answer(report)
+            report = await build_owner_analytics_report(self.analytics, window_days=30)
+            self._answer(message, report)
 
         @router.message(F.chat.type == "private", F.text.startswith("/"))
         async def private_unknown_command(message: Message) -> None:
-            await message.answer(
+            self._answer(
+                message,
                 "Неизвестная команда. Используйте /start или просто напишите ваш вопрос."
             )
 
@@ -92,16 +111,23 @@ class HandlerBundle:
             if not callback.from_user:
                 return
             article_id = callback.data.split(":", 1)[1]
-            row = await get_article_by_id(self.sqlite_path, article_id)
-            if not row:
+            article = await self.article_store.get(article_id)
+            if not article:
                 await callback.answer("Ответ устарел. Задайте вопрос заново.", show_alert=True)
                 return
-            last = await get_user_last_answer(self.sqlite_path, callback.from_user.id)
-            text = format_full_answer(row, [], previous_article_id=last["article_id"] if last else None)
-            await callback.message.answer(text, disable_web_page_preview=True)
-            await set_user_last_answer(self.sqlite_path, callback.from_user.id, row["id"], row["question_norm"])
-            await log_query_event(
-                self.sqlite_path,
+            row = article.row
+            last = await self.last_answers.get(callback.from_user.id)
+            text = format_full_answer(
+                row,
+                [],
+                previous_article_id=last["article_id"] if last else None,
+                content=article.content(),
+            )
+            if not self._answer(callback.message, text, disable_web_page_preview=True):
+                await callback.answer(DROPPED_TEXT, show_alert=True)
+                return
+            await self.last_answers.set(callback.from_user.id, row["id"], row["question_norm"])
+            await self.write_queue.log_query_event(
                 user_id=callback.from_user.id,
                 chat_id=callback.message.chat.id if callback.message else None,
                 is_group=False,
@@ -117,10 +143,11 @@ class HandlerBundle:
         @router.callback_query(F.data.startswith("cat:"))
         async def callback_category(callback: CallbackQuery) -> None:
             category = callback.data.split(":", 1)[1]
-            results = self.search_engine.search(category, category_hint=category)
+            results = await self.search_service.search(category, category_hint=category)
             if not results:
                 if callback.message:
-                    await callback.message.answer(
+                    self._answer(
+                        callback.message,
                         "По этой теме пока нет точного сценария в базе. "
                         "Напишите вопрос подробнее: что хотите сделать и какой результат нужен.",
                         reply_markup=category_keyboard(),
@@ -128,17 +155,17 @@ class HandlerBundle:
                 await callback.answer("Тема уточнена")
                 return
             top = results[0]
-            text = format_full_answer(top.row, results[1:])
-            await callback.message.answer(text, disable_web_page_preview=True)
+            text = format_full_answer(top.row, results[1:], content=self.article_store.content_for(top.row))
+            if not self._answer(callback.message, text, disable_web_page_preview=True):
+                await callback.answer(DROPPED_TEXT, show_alert=True)
+                return
             if callback.from_user:
-                await set_user_last_answer(
-                    self.sqlite_path,
+                await self.last_answers.set(
                     callback.from_user.id,
                     top.row["id"],
                     top.row["question_norm"],
                 )
-                await log_query_event(
-                    self.sqlite_path,
+                await self.write_queue.log_query_event(
                     user_id=callback.from_user.id,
                     chat_id=callback.message.chat.id if callback.message else None,
                     is_group=False,
@@ -159,18 +186,13 @@ class HandlerBundle:
             if question.startswith("/"):
                 return
 
-            resolution = resolve_group_question(
-                search_engine=self.search_engine,
-                question=question,
-                min_confidence=self.min_confidence,
-            )
-            norm = resolution.question_norm
-            if not await self.anti_spam.should_answer(message.chat.id, norm):
+            resolution = await self.group_pipeline.process(message.chat.id, question)
+            if resolution is None:
                 return
+            norm = resolution.question_norm
 
             if resolution.status != "matched":
-                await log_query_event(
-                    self.sqlite_path,
+                await self.write_queue.log_query_event(
                     user_id=message.from_user.id if message.from_user else None,
                     chat_id=message.chat.id,
                     is_group=True,
@@ -193,9 +215,11 @@ class HandlerBundle:
             if not chosen:
                 return
             short = format_group_answer(chosen.row["summary"], self.bot_username)
-            await message.reply(short, disable_web_page_preview=True)
-            await log_query_event(
-                self.sqlite_path,
+            if not self.outbox.reply(message, short, disable_web_page_preview=True):
+                log.warning("Dropped group reply to chat %s, skipping its bookkeeping", message.chat.id)
+                return
+            self.group_pipeline.record_reply(message.chat.id)
+            await self.write_queue.log_query_event(
                 user_id=message.from_user.id if message.from_user else None,
                 chat_id=message.chat.id,
                 is_group=True,
@@ -209,9 +233,16 @@ class HandlerBundle:
 
         return router
 
+    def _answer(self, message: Message, text: str, **kwargs) -> bool:
+        # The answer is only recorded as given once the outbox has accepted it.
+        if self.outbox.answer(message, text, **kwargs):
+            return True
+        log.warning("Dropped answer to chat %s, skipping its bookkeeping", message.chat.id)
+        return False
+
     async def _handle_private_question(self, message: Message, question: str) -> None:
-        resolution = resolve_private_question(
-            search_engine=self.search_engine,
+        resolution = await resolve_private_question_async(
+            search_service=self.search_service,
             question=question,
             min_confidence=self.min_confidence,
             ambiguity_delta=self.ambiguity_delta,
@@ -219,8 +250,7 @@ class HandlerBundle:
         results = resolution.results
         norm = resolution.question_norm
         if resolution.status == "not_found":
-            await log_query_event(
-                self.sqlite_path,
+            await self.write_queue.log_query_event(
                 user_id=message.from_user.id if message.from_user else None,
                 chat_id=message.chat.id,
                 is_group=False,
@@ -237,17 +267,23 @@ class HandlerBundle:
                 is_group=False,
                 question=question,
             )
-            await message.answer(
+            self._answer(
+                message,
                 "Не нашёл точный ответ. Выберите категорию, и я уточню контекст:",
                 reply_markup=category_keyboard(),
             )
             return
 
         if resolution.status == "ambiguous":
+            if not self._answer(
+                message,
+                "Нашёл несколько близких вариантов. Выберите тему, чтобы дать точный и подробный ответ:",
+                reply_markup=disambiguation_keyboard(results),
+            ):
+                return
             uid = message.from_user.id if message.from_user else 0
             self.pending_results[uid] = results[:4]
-            await log_query_event(
-                self.sqlite_path,
+            await self.write_queue.log_query_event(
                 user_id=message.from_user.id if message.from_user else None,
                 chat_id=message.chat.id,
                 is_group=False,
@@ -258,18 +294,19 @@ class HandlerBundle:
                 match_reason="ambiguous",
                 category=None,
             )
-            await message.answer(
-                "Нашёл несколько близких вариантов. Выберите тему, чтобы дать точный и подробный ответ:",
-                reply_markup=disambiguation_keyboard(results),
-            )
             return
 
         chosen = results[0]
-        last = await get_user_last_answer(self.sqlite_path, message.from_user.id if message.from_user else 0)
-        text = format_full_answer(chosen.row, results[1:], previous_article_id=last["article_id"] if last else None)
-        await message.answer(text, disable_web_page_preview=True)
-        await log_query_event(
-            self.sqlite_path,
+        last = await self.last_answers.get(message.from_user.id if message.from_user else 0)
+        text = format_full_answer(
+            chosen.row,
+            results[1:],
+            previous_article_id=last["article_id"] if last else None,
+            content=self.article_store.content_for(chosen.row),
+        )
+        if not self._answer(message, text, disable_web_page_preview=True):
+            return
+        await self.write_queue.log_query_event(
             user_id=message.from_user.id if message.from_user else None,
             chat_id=message.chat.id,
             is_group=False,
@@ -281,5 +318,5 @@ class HandlerBundle:
             category=chosen.row.get("category"),
         )
         if message.from_user:
-            await set_user_last_answer(self.sqlite_path, message.from_user.id, chosen.row["id"], chosen.row["question_norm"])
+            await self.last_answers.set(message.from_user.id, chosen.row["id"], chosen.row["question_norm"])
         log.info("Answered private question with article_id=%s reason=%s", chosen.row["id"], chosen.reason)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+from tgtaps_support_bot.infrastructure.bot.rate_limit import (
+    RATE_LIMIT_SCOPES,
+    RateLimiter,
+)
+from tgtaps_support_bot.infrastructure.bot.send_queue import OutboundQueue
+
+THROTTLED_TEXT = "Слишком много запросов. Подождите немного и попробуйте снова."
+# Most group messages never reach a search, so they only spend the chat's own budget.
+GROUP_SCOPES = ("chat",)
+
+
+class RateLimitMiddleware(BaseMiddleware):
+    def __init__(self, limiter: RateLimiter, outbox: OutboundQueue):
+        self.limiter = limiter
+        self.outbox = outbox
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user = getattr(event, "from_user", None)
+        user_id = user.id if user else None
+        scopes = RATE_LIMIT_SCOPES
+        if isinstance(event, CallbackQuery):
+            chat_id = event.message.chat.id if event.message else None
+        elif isinstance(event, Message):
+            chat_id = event.chat.id
+            if event.chat.type != "private":
+                scopes = GROUP_SCOPES
+        else:
+            chat_id = None
+        if self.limiter.acquire(user_id, chat_id, scopes=scopes) is None:
+            return await handler(event, data)
+
+        if isinstance(event, CallbackQuery):
+            # answerCallbackQuery is not a chat send and expires quickly, so it bypasses the outbox.
+            if user_id is not None and self.limiter.should_notify(user_id):
+                await event.answer(THROTTLED_TEXT)
+            return None
+        # Group floods are dropped silently; a private sender hears about it once per interval, via the outbox.
+        if (
+            isinstance(event, Message)
+            and event.chat.type == "private"
+            and user_id is not None
+            and self.limiter.should_notify(user_id)
+        ):
+            self.outbox.answer(event, THROTTLED_TEXT)
+        return None
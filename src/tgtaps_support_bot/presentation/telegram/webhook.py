@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import secrets
+import signal
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiogram.webhook.aiohttp_server import setup_application
+from aiohttp import web
+
+log = logging.getLogger(__name__)
+
+BOT_MODES = ("polling", "webhook")
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookHandler:
+    # Only the dispatcher's public feed API is used, so aiogram upgrades cannot change what this handler does.
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        *,
+        secret_token: str,
+        max_in_flight: int = 200,
+        drain_timeout_sec: float = 15.0,
+    ):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.secret_token = secret_token
+        self.max_in_flight = max_in_flight
+        self.drain_timeout_sec = drain_timeout_sec
+        self.draining = False
+        self._tasks: set[asyncio.Task] = set()
+        self.accepted = 0
+        self.unauthorized = 0
+        self.malformed = 0
+        self.refused = 0
+        self.inline = 0
+        self.failed = 0
+        self.peak_in_flight = 0
+
+    def register(self, app: web.Application, *, path: str) -> None:
+        app.router.add_post(path, self.handle)
+        app.on_shutdown.append(self._close_session)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.draining:
+            # Non-2xx makes Telegram redeliver later, so the update survives the restart instead of being lost.
+            self.refused += 1
+            return web.Response(status=503)
+        if not secrets.compare_digest(request.headers.get(SECRET_HEADER, ""), self.secret_token):
+            self.unauthorized += 1
+            return web.Response(body="Unauthorized", status=401)
+        try:
+            update = await request.json(loads=self.bot.session.json_loads)
+        except ValueError:
+            update = None
+        if not isinstance(update, dict) or "update_id" not in update:
+            self.malformed += 1
+            return web.Response(status=400)
+
+        self.accepted += 1
+        if len(self._tasks) >= self.max_in_flight:
+            # Saturated: holding the request lets Telegram's max_connections throttle delivery.
+            self.inline += 1
+            await self._process(update)
+        else:
+            task = asyncio.create_task(self._process(update))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            self.peak_in_flight = max(self.peak_in_flight, len(self._tasks))
+        return web.json_response({})
+
+    async def _process(self, update: dict[str, Any]) -> None:
+        try:
+            result = await self.dispatcher.feed_raw_update(self.bot, update)
+            if isinstance(result, TelegramMethod):
+                await self.dispatcher.silent_call_request(self.bot, result)
+        except Exception:
+            self.failed += 1
+            log.exception("Webhook update %s failed", update.get("update_id"))
+
+    async def drain(self) -> None:
+        self.draining = True
+        tasks = set(self._tasks)
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=self.drain_timeout_sec)
+        if pending:
+            log.warning("Webhook drain timed out, cancelling %s updates", len(pending))
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _on_shutdown(self, app: web.Application) -> None:
+        await self.drain()
+
+    async def _close_session(self, app: web.Application) -> None:
+        await self.bot.session.close()
+
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.Response(status=503 if self.draining else 200, text="draining" if self.draining else "ok")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "accepted": self.accepted,
+            "unauthorized": self.unauthorized,
+            "malformed": self.malformed,
+            "refused": self.refused,
+            "inline": self.inline,
+            "failed": self.failed,
+            "in_flight": len(self._tasks),
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+
+def build_webhook_app(bot: Bot, dp: Dispatcher, handler: WebhookHandler, *, path: str) -> web.Application:
+    app = web.Application()
+    # aiohttp runs shutdown hooks in order: finish in-flight updates, then the dispatcher's
+    # shutdown hooks (outbox drain, DB close), and only then close the bot session they use.
+    app.on_shutdown.append(handler._on_shutdown)
+    setup_application(app, dp, bot=bot)
+    handler.register(app, path=path)
+    app.router.add_get("/healthz", handler._health)
+    return app
+
+
+class WebhookServer:
+    def __init__(
+        self,
+        bot: Bot,
+        dp: Dispatcher,
+        *,
+        url: str,
+        path: str,
+        secret_token: str,
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        max_connections: int = 40,
+        max_in_flight: int = 200,
+        drain_timeout_sec: float = 15.0,
+    ):
+        self.bot = bot
+        self.dp = dp
+        self.url = url.rstrip("/") + path
+        self.host = host
+        self.port = port
+        self.secret_token = secret_token
+        self.max_connections = max_connections
+        self.handler = WebhookHandler(
+            dp,
+            bot,
+            secret_token=secret_token,
+            max_in_flight=max_in_flight,
+            drain_timeout_sec=drain_timeout_sec,
+        )
+        self.app = build_webhook_app(bot, dp, self.handler, path=path)
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        # Set only once the server listens, so Telegram's first delivery is not refused.
+        await self.bot.set_webhook(
+            self.url,
+            secret_token=self.secret_token,
+            max_connections=self.max_connections,
+            allowed_updates=self.dp.resolve_used_update_types(),
+        )
+        log.info("Webhook server listening on %s:%s for %s", self.host, self.port, self.url)
+
+    async def stop(self) -> None:
+        if self._runner is None:
+            return
+        # The webhook stays registered: Telegram queues updates until the next instance is up.
+        # Drain while the site still listens, so new deliveries get a 503 and are redelivered later
+        # instead of failing to connect or landing on a half-closed server.
+        await self.handler.drain()
+        await self._runner.cleanup()
+        self._runner = None
+        log.info("Webhook server stopped: %s", self.handler.stats())
+
+    async def serve(self) -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(sig, stop.set)
+        try:
+            await self.start()
+            await stop.wait()
+        finally:
+            await self.stop()
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import json
 import sys
 from pathlib import Path
+from typing import Any
 
+import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
@@ -10,3 +13,52 @@ if str(ROOT) not in sys.path:
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_row(
+    row_id: str,
+    q_norm: str,
+    *,
+    aliases: list[str] | None = None,
+    tags: list[str] | None = None,
+    category: str = "general",
+    status: str = "active",
+    updated_at: str = "2026-01-01T00:00:00+00:00",
+) -> dict:
+    return {
+        "id": row_id,
+        "question": q_norm,
+        "question_norm": q_norm,
+        "summary": "summary",
+        "steps_json": "[]",
+        "docs_links_json": "[]",
+        "video_links_json": "[]",
+        "category": category,
+        "tags_json": json.dumps(tags or []),
+        "aliases_json": json.dumps(aliases or []),
+        "related_ids_json": "[]",
+        "answer_version": 1,
+        "status": status,
+        "valid_from": "2026-01-01T00:00:00+00:00",
+        "valid_to": None,
+        "source": "manual",
+        "updated_at": updated_at,
+    }
+
+
+def _make_article(article_id: str, question: str | None = None, **fields: Any) -> dict:
+    question = question or f"вопрос {article_id}"
+    return {"id": article_id, "question": question, "question_norm": question, "summary": "summary", **fields}
+
+
+@pytest.fixture
+def make_article():
+    return _make_article
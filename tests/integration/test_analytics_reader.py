@@ -0,0 +1,73 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from tgtaps_support_bot.infrastructure.persistence.analytics_reader import (
+    AnalyticsReader,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    log_query_event,
+)
+
+
+def _log(sqlite_path: str, question_norm: str):
+    return log_query_event(
+        sqlite_path,
+        user_id=1,
+        chat_id=1,
+        is_group=False,
+        question=question_norm,
+        question_norm=question_norm,
+        matched_article_id="a1",
+        score=80.0,
+        match_reason="keywords_fuzzy",
+        category="payments",
+    )
+
+
+def test_reader_is_read_only_and_falls_back_on_timeout(tmp_path):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        await _log(sqlite_path, "как вывести stars")
+        reader = AnalyticsReader(sqlite_path, timeout_sec=5.0)
+        try:
+            fresh = await reader.snapshot(window_days=30)
+            assert fresh["total"] == 1 and "stale" not in fresh
+            with pytest.raises(sqlite3.OperationalError):
+                await reader._db.execute("DELETE FROM query_logs")
+
+            await _log(sqlite_path, "где кошелек")
+            reader.timeout_sec = 0
+            stale = await reader.snapshot(window_days=30)
+            assert stale["stale"] and stale["total"] == 1
+            assert await reader.snapshot(window_days=7) is None
+            assert reader.stats()["timeouts"] == 2 and reader.stats()["stale_served"] == 1
+        finally:
+            await reader.stop()
+
+    asyncio.run(scenario())
+
+
+def test_reader_serves_periodic_copy(tmp_path):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+    copy_path = (tmp_path / "analytics.sqlite3").as_posix()
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        await _log(sqlite_path, "как вывести stars")
+        reader = AnalyticsReader(sqlite_path, copy_path=copy_path, refresh_interval_sec=0)
+        await reader.start()
+        try:
+            await _log(sqlite_path, "где кошелек")
+            assert (await reader.snapshot())["total"] == 1
+            await reader.refresh_copy()
+            assert (await reader.snapshot())["total"] == 2
+            assert reader.stats()["copies"] == 2
+        finally:
+            await reader.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,58 @@
+import asyncio
+import sqlite3
+from datetime import UTC, datetime, timedelta
+
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    get_analytics_snapshot,
+    log_query_event,
+)
+
+
+def _log(sqlite_path: str, question_norm: str, *, is_group: bool, article_id: str | None, category: str | None):
+    return log_query_event(
+        sqlite_path,
+        user_id=1,
+        chat_id=1,
+        is_group=is_group,
+        question=question_norm,
+        question_norm=question_norm,
+        matched_article_id=article_id,
+        score=80.0 if article_id else None,
+        match_reason="keywords_fuzzy" if article_id else "not_found",
+        category=category,
+    )
+
+
+def test_analytics_snapshot_is_served_from_rollups(tmp_path):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+    old = (datetime.now(UTC) - timedelta(days=40)).replace(microsecond=0)
+
+    async def scenario() -> tuple[dict, dict]:
+        await ensure_db(sqlite_path)
+        await _log(sqlite_path, "как вывести stars", is_group=False, article_id="a1", category="payments")
+        await _log(sqlite_path, "как вывести stars", is_group=True, article_id="a1", category="payments")
+        await _log(sqlite_path, "где кошелек", is_group=True, article_id=None, category=None)
+        with sqlite3.connect(sqlite_path) as db:
+            db.execute(
+                "INSERT INTO query_logs (is_group, question, question_norm, created_at, created_at_epoch) "
+                "VALUES (0, 'old', 'old', ?, ?)",
+                (old.isoformat(), int(old.timestamp())),
+            )
+        fresh = await get_analytics_snapshot(sqlite_path, window_days=30)
+
+        # Rows logged before the rollups existed are backfilled once by ensure_db.
+        with sqlite3.connect(sqlite_path) as db:
+            db.execute("DELETE FROM query_rollup_hourly")
+            db.execute("DELETE FROM query_rollup_questions_daily")
+        await ensure_db(sqlite_path)
+        await ensure_db(sqlite_path)
+        return fresh, await get_analytics_snapshot(sqlite_path, window_days=60)
+
+    fresh, backfilled = asyncio.run(scenario())
+    assert (fresh["total"], fresh["unknown_count"], fresh["group_count"], fresh["private_count"]) == (3, 1, 2, 1)
+    assert fresh["top10"][0] == {"question_norm": "как вывести stars", "c": 2}
+    assert fresh["top_categories"][0] == {"category": "payments", "c": 2}
+    assert [r["question_norm"] for r in fresh["latest10"]] == ["где кошелек", "как вывести stars", "как вывести stars"]
+    assert (backfilled["total"], backfilled["unknown_count"]) == (4, 2)
+    assert len(backfilled["latest10"]) == 4
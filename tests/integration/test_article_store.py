@@ -0,0 +1,68 @@
+import asyncio
+
+from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+from tgtaps_support_bot.infrastructure.persistence.article_store import ArticleStore
+from tgtaps_support_bot.infrastructure.persistence.kb_hot_reload import KBHotReloader
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    fetch_all_articles,
+    get_kb_change_seq,
+    upsert_articles,
+)
+from tgtaps_support_bot.presentation.formatters.answer_formatter import (
+    format_full_answer,
+)
+
+CONTENT = {
+    "summary": "Откройте настройки.",
+    "steps": ["Откройте настройки", "Смотрите https://docs.tgtaps.com/tgtaps-docs/wallet"],
+    "docs_links": [{"title": "Wallet", "url": "https://tgtaps.gitbook.io/tgtaps-docs/wallet"}],
+    "video_links": [{"title": "Обзор", "url": "https://youtu.be/x"}],
+}
+
+
+def test_article_store_serves_indexed_ids_from_memory(tmp_path, make_article):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        await upsert_articles(
+            sqlite_path, [make_article("live", **CONTENT), make_article("old", status="archived", **CONTENT)]
+        )
+        store = ArticleStore(sqlite_path, SearchEngine(await fetch_all_articles(sqlite_path)))
+
+        live = await store.get("live")
+        assert live is store.get_cached("live")
+        assert live.content() is live.content()
+        assert format_full_answer(live.row, [], content=live.content()) == format_full_answer(live.row, [])
+
+        archived = await store.get("old")
+        assert archived is not None and archived.row["status"] == "archived"
+        assert await store.get("missing") is None
+        assert (store.memory_hits, store.sqlite_fallbacks) == (1, 2)
+
+    asyncio.run(scenario())
+
+
+def test_content_is_not_borrowed_from_a_reloaded_article(tmp_path, make_article):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        await upsert_articles(sqlite_path, [make_article("live", **CONTENT)])
+        engine = SearchEngine(await fetch_all_articles(sqlite_path))
+        store = ArticleStore(sqlite_path, engine)
+        reloader = KBHotReloader(sqlite_path, engine, interval_sec=0, last_seq=await get_kb_change_seq(sqlite_path))
+
+        searched = engine.search("вопрос live")[0].row
+        assert store.content_for(searched) is store.get_cached("live").content()
+        assert store.content_for(dict(searched)) is store.get_cached("live").content()
+
+        # The index is swapped after the search but before the answer is formatted.
+        await upsert_articles(sqlite_path, [make_article("live", **{**CONTENT, "steps": ["Новый шаг"]})])
+        assert await reloader.poll_once()
+        assert store.content_for(searched) is None
+        text = format_full_answer(searched, [], content=store.content_for(searched))
+        assert "Откройте настройки" in text and "Новый шаг" not in text
+
+    asyncio.run(scenario())
@@ -0,0 +1,35 @@
+import asyncio
+
+from tests.conftest import FakeClock
+from tgtaps_support_bot.infrastructure.bot.anti_spam import GroupAntiSpam
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import ensure_db
+
+
+def test_dedup_expires_evicts_and_survives_restart(tmp_path):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+    clock = FakeClock(1_000_000.0)
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        anti_spam = GroupAntiSpam(sqlite_path, ttl_sec=60, max_entries=3, clock=clock)
+        assert await anti_spam.should_answer(1, "как вывести stars")
+        assert not await anti_spam.should_answer(1, "как вывести stars")
+        assert await anti_spam.should_answer(2, "как вывести stars")
+
+        clock.now += 30
+        assert await anti_spam.should_answer(1, "где кошелек")
+        clock.now += 31
+        assert await anti_spam.should_answer(1, "как вывести stars")
+        assert anti_spam.stats()["expired"] == 2 and len(anti_spam) == 2
+
+        for i in range(3):
+            assert anti_spam.check_and_set(3, f"вопрос {i}")
+        assert anti_spam.stats()["evicted"] == 2 and len(anti_spam) == 3
+
+        restarted = GroupAntiSpam(sqlite_path, ttl_sec=60, clock=clock)
+        assert await restarted.load() == 2
+        assert not await restarted.should_answer(1, "где кошелек")
+        assert not await restarted.should_answer(1, "как вывести stars")
+        assert await restarted.should_answer(2, "как вывести stars")
+
+    asyncio.run(scenario())
@@ -0,0 +1,35 @@
+import asyncio
+
+from tgtaps_support_bot.infrastructure.persistence.index_snapshot import (
+    load_or_build_index,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    upsert_articles,
+)
+
+
+def test_snapshot_is_reused_until_kb_content_changes(tmp_path, make_article):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+    snapshot_path = f"{sqlite_path}.index"
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        await upsert_articles(sqlite_path, [make_article("a1", "как подключить кошелек")])
+
+        index, source = await load_or_build_index(sqlite_path, snapshot_path)
+        assert source == "rebuild"
+        assert (tmp_path / "kb.sqlite3.index").exists()
+
+        await upsert_articles(sqlite_path, [make_article("a1", "как подключить кошелек")])
+        restored, source = await load_or_build_index(sqlite_path, snapshot_path)
+        assert source == "snapshot"
+        assert [a.id for a in restored.articles] == ["a1"]
+        assert restored.alias_to_rows == index.alias_to_rows
+        assert sorted(restored.trigram_postings) == sorted(index.trigram_postings)
+
+        await upsert_articles(sqlite_path, [make_article("a1", "как подключить кошелек", summary="new")])
+        _, source = await load_or_build_index(sqlite_path, snapshot_path)
+        assert source == "rebuild"
+
+    asyncio.run(scenario())
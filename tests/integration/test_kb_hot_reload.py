@@ -0,0 +1,41 @@
+import asyncio
+
+from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+from tgtaps_support_bot.infrastructure.persistence.kb_hot_reload import KBHotReloader
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    fetch_all_articles,
+    get_kb_change_seq,
+    upsert_articles,
+)
+
+
+def test_hot_reload_applies_only_changed_rows(tmp_path, make_article):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        await upsert_articles(
+            sqlite_path, [make_article("a1", "как подключить кошелек"), make_article("a2", "как вывести stars")]
+        )
+        engine = SearchEngine(await fetch_all_articles(sqlite_path))
+        reloader = KBHotReloader(sqlite_path, engine, interval_sec=0, last_seq=await get_kb_change_seq(sqlite_path))
+        untouched = engine.index.articles[0]
+
+        assert not await reloader.poll_once()
+
+        await upsert_articles(
+            sqlite_path,
+            [
+                make_article("a2", "как вывести stars", status="archived"),
+                make_article("a3", "как настроить рефералку"),
+            ],
+        )
+        assert await reloader.poll_once()
+
+        assert [a.id for a in engine.index.articles] == ["a1", "a3"]
+        assert engine.index.articles[0] is untouched
+        assert engine.search("как настроить рефералку")[0].row["id"] == "a3"
+        assert await get_kb_change_seq(sqlite_path) == reloader.last_seq
+
+    asyncio.run(scenario())
@@ -0,0 +1,43 @@
+import asyncio
+import sqlite3
+
+from tgtaps_support_bot.infrastructure.persistence.migrations import run_migrations
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    get_kb_change_seq,
+    upsert_articles,
+)
+
+
+def test_reimport_skips_unchanged_articles(tmp_path, make_article):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        first = await upsert_articles(sqlite_path, [make_article(f"a{i}") for i in range(7)], chunk_rows=3)
+        assert (first.inserted, first.updated, first.unchanged) == (7, 0, 0)
+        with sqlite3.connect(sqlite_path) as db:
+            db.execute("UPDATE kb_articles SET updated_at = 'before'")
+        seq = await get_kb_change_seq(sqlite_path)
+
+        again = await upsert_articles(sqlite_path, [make_article(f"a{i}") for i in range(7)], chunk_rows=3)
+        assert (again.inserted, again.updated, again.unchanged) == (0, 0, 7)
+        assert await get_kb_change_seq(sqlite_path) == seq
+
+        mixed = await upsert_articles(
+            sqlite_path, [make_article("a1", summary="new"), make_article("a2"), make_article("a9")]
+        )
+        assert (mixed.inserted, mixed.updated, mixed.unchanged) == (1, 1, 1)
+        with sqlite3.connect(sqlite_path) as db:
+            touched = {r[0] for r in db.execute("SELECT id FROM kb_articles WHERE updated_at != 'before'")}
+        assert touched == {"a1", "a9"}
+
+        # Rows from before the content_hash column get a hash that matches the importer's.
+        with sqlite3.connect(sqlite_path) as db:
+            db.execute("UPDATE kb_articles SET content_hash = NULL")
+            db.execute("PRAGMA user_version = 1")
+        assert await run_migrations(sqlite_path) == [2]
+        backfilled = await upsert_articles(sqlite_path, [make_article("a0"), make_article("a1", summary="new")])
+        assert backfilled.unchanged == 2
+
+    asyncio.run(scenario())
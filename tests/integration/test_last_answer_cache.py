@@ -0,0 +1,39 @@
+import asyncio
+
+from tgtaps_support_bot.infrastructure.persistence.last_answer_cache import (
+    LastAnswerCache,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    get_user_last_answer,
+    set_user_last_answer,
+)
+
+
+def test_last_answer_cache_writes_back_and_lazy_loads(tmp_path):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        await set_user_last_answer(sqlite_path, 1, "stored", "q")
+
+        cache = LastAnswerCache(sqlite_path, max_entries=2, flush_interval_sec=0)
+        assert (await cache.get(1))["article_id"] == "stored"
+        assert await cache.get(2) is None
+        assert await cache.get(2) is None
+        assert cache.misses == 2 and cache.hits == 1
+
+        await cache.set(2, "a2", "q2")
+        await cache.set(3, "a3", "q3")
+        await cache.set(4, "a4", "q4")
+        # Evicted from the LRU but not yet flushed: still served from the pending writes.
+        assert (await cache.get(2))["article_id"] == "a2"
+        assert await get_user_last_answer(sqlite_path, 3) is None
+
+        await cache.stop()
+        assert cache.flushed_rows == 3
+
+        restarted = LastAnswerCache(sqlite_path)
+        assert [(await restarted.get(uid))["article_id"] for uid in (1, 2, 3, 4)] == ["stored", "a2", "a3", "a4"]
+
+    asyncio.run(scenario())
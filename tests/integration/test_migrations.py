@@ -0,0 +1,37 @@
+import asyncio
+import sqlite3
+
+from tgtaps_support_bot.infrastructure.persistence import migrations
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    SCHEMA_SQL,
+    ensure_db,
+)
+
+
+def test_epoch_migration_backfills_legacy_rows_in_chunks(tmp_path, monkeypatch):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+    with sqlite3.connect(sqlite_path) as db:
+        db.executescript(SCHEMA_SQL)
+        db.executemany(
+            "INSERT INTO query_logs (is_group, question, question_norm, created_at) VALUES (0, 'q', 'q', ?)",
+            [(f"2026-01-0{day}T10:00:00+00:00",) for day in range(1, 8)],
+        )
+        db.execute(
+            "INSERT INTO kb_unknown_questions (is_group, question, question_norm, created_at) "
+            "VALUES (1, 'q', 'q', '2026-01-01T03:00:00+03:00')"
+        )
+    monkeypatch.setattr(migrations, "BACKFILL_CHUNK_ROWS", 3)
+
+    async def scenario() -> list[int]:
+        await ensure_db(sqlite_path)
+        await ensure_db(sqlite_path)
+        return await migrations.run_migrations(sqlite_path)
+
+    assert asyncio.run(scenario()) == []
+    with sqlite3.connect(sqlite_path) as db:
+        assert db.execute("PRAGMA user_version").fetchone()[0] == migrations.MIGRATIONS[-1].version
+        epochs = [r[0] for r in db.execute("SELECT created_at_epoch FROM query_logs ORDER BY id")]
+        assert epochs == [1767261600 + 86400 * i for i in range(7)]
+        assert db.execute("SELECT created_at_epoch FROM kb_unknown_questions").fetchone()[0] == 1767225600
+        plan = db.execute("EXPLAIN QUERY PLAN SELECT COUNT(*) FROM query_logs WHERE created_at_epoch < 1767300000")
+        assert "idx_query_logs_created_epoch" in str(plan.fetchall())
@@ -0,0 +1,87 @@
+import asyncio
+import gzip
+import json
+import sqlite3
+
+from tgtaps_support_bot.infrastructure.persistence.retention import (
+    archive_path,
+    enable_incremental_vacuum,
+    run_retention,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    SCHEMA_SQL,
+    ensure_db,
+)
+
+NOW = 1767225600  # 2026-01-01T00:00:00Z
+DAY = 86400
+
+
+def test_retention_archives_old_rows_and_compacts(tmp_path):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+    archive_dir = (tmp_path / "archive").as_posix()
+    asyncio.run(ensure_db(sqlite_path))
+    with sqlite3.connect(sqlite_path) as db:
+        db.executemany(
+            "INSERT INTO query_logs (is_group, question, question_norm, created_at, created_at_epoch) "
+            "VALUES (0, ?, ?, 'x', ?)",
+            [(f"question {i} " + "x" * 500, f"q{i}", NOW - (200 - i % 3) * DAY) for i in range(300)]
+            + [("fresh", "fresh", NOW - DAY)],
+        )
+        db.execute(
+            "INSERT INTO group_question_dedup (dedup_key, chat_id, question_norm, expires_at_epoch) "
+            "VALUES ('k', 1, 'q', ?)",
+            (NOW - 1,),
+        )
+        db.execute("INSERT INTO query_rollup_hourly VALUES ('2024-12-31T23', 0, 'matched', 'wallet', 5)")
+        db.executemany(
+            "INSERT INTO query_rollup_questions_daily VALUES (?, ?, 1)",
+            [("2024-12-31", f"old {i}") for i in range(100)] + [("2025-01-01", "kept")],
+        )
+        assert db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    report = asyncio.run(
+        run_retention(
+            sqlite_path, horizon_days=180, archive_dir=archive_dir, batch_rows=64, rollup_horizon_days=365, now=NOW
+        )
+    )
+
+    assert report.archived == {"query_logs": 300, "kb_unknown_questions": 0}
+    assert report.expired_dedup_rows == 1
+    assert report.purged_rollups == {"query_rollup_hourly": 1, "query_rollup_questions_daily": 100}
+    assert report.freed_pages > 0 and report.reclaimed_bytes > 0
+    assert len(report.archive_files) == 3
+    day_file = archive_path(archive_dir, "query_logs", "2025-06-15")
+    with gzip.open(day_file, "rt", encoding="utf-8") as fh:
+        rows = [json.loads(line) for line in fh]
+    assert len(rows) == 100 and all(r["created_at_epoch"] == NOW - 200 * DAY for r in rows)
+    with sqlite3.connect(sqlite_path) as db:
+        assert db.execute("SELECT question_norm FROM query_logs").fetchall() == [("fresh",)]
+        # Rollups keep the aggregate history after the raw rows are gone.
+        assert db.execute("SELECT SUM(count) FROM query_rollup_hourly").fetchone()[0] == 301
+        assert db.execute("SELECT day FROM query_rollup_questions_daily WHERE day < 'x'").fetchall() == [
+            ("2025-01-01",)
+        ]
+
+
+def test_legacy_auto_vacuum_is_reported_until_the_explicit_step(tmp_path):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+    archive_dir = (tmp_path / "archive").as_posix()
+    with sqlite3.connect(sqlite_path) as db:
+        db.executescript(SCHEMA_SQL.replace("PRAGMA auto_vacuum=INCREMENTAL;", "PRAGMA auto_vacuum=NONE;"))
+
+    async def retention_sees_incremental_vacuum() -> bool:
+        report = await run_retention(sqlite_path, horizon_days=180, archive_dir=archive_dir, now=NOW)
+        return report.incremental_vacuum
+
+    async def scenario() -> list[bool]:
+        # Startup does not rewrite the file, and the check repeats on every run instead of once per version.
+        await ensure_db(sqlite_path)
+        await ensure_db(sqlite_path)
+        checks = [await retention_sees_incremental_vacuum(), await retention_sees_incremental_vacuum()]
+        converted = [await enable_incremental_vacuum(sqlite_path), await enable_incremental_vacuum(sqlite_path)]
+        return checks + converted + [await retention_sees_incremental_vacuum()]
+
+    assert asyncio.run(scenario()) == [False, False, True, False, True]
+    with sqlite3.connect(sqlite_path) as db:
+        assert db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
@@ -0,0 +1,38 @@
+import asyncio
+import sqlite3
+
+from tgtaps_support_bot.infrastructure.persistence.sqlite_backup import (
+    BackupService,
+    list_backups,
+    restore_backup,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    upsert_articles,
+)
+
+
+def test_backups_rotate_verify_and_restore(tmp_path, make_article):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+    backup_dir = (tmp_path / "backups").as_posix()
+
+    async def scenario() -> BackupService:
+        await ensure_db(sqlite_path)
+        await upsert_articles(sqlite_path, [make_article(f"a{i}", summary="x" * 400) for i in range(300)])
+        service = BackupService(sqlite_path, backup_dir=backup_dir, keep=2, interval_sec=0, step_pages=5)
+        for _ in range(3):
+            report = await service.run_once()
+            assert report.ok and report.steps > 1
+        return service
+
+    service = asyncio.run(scenario())
+    backups = list_backups(backup_dir, sqlite_path)
+    assert len(backups) == 2
+    assert service.stats()["backups"] == 3 and service.stats()["max_step_pause_ms"] > 0
+
+    with sqlite3.connect(sqlite_path) as db:
+        db.execute("DELETE FROM kb_articles")
+    restore_backup(backups[-1].as_posix(), sqlite_path)
+    with sqlite3.connect(sqlite_path) as db:
+        assert db.execute("SELECT COUNT(*) FROM kb_articles").fetchone()[0] == 300
+        assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
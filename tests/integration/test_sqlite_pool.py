@@ -0,0 +1,40 @@
+import asyncio
+
+from tgtaps_support_bot.infrastructure.bot.anti_spam import GroupAntiSpam
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import (
+    ensure_db,
+    get_user_last_answer,
+    set_user_last_answer,
+)
+from tgtaps_support_bot.infrastructure.persistence.sqlite_pool import (
+    close_connection_manager,
+    get_connection_manager,
+    open_connection_manager,
+)
+
+
+def test_gateway_reuses_pooled_connections(tmp_path):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+
+    async def scenario() -> None:
+        await ensure_db(sqlite_path)
+        manager = await open_connection_manager(sqlite_path, read_pool_size=2, busy_timeout_ms=1234)
+        try:
+            anti_spam = GroupAntiSpam(sqlite_path, ttl_sec=60)
+            answers = await asyncio.gather(*(anti_spam.should_answer(1, "как вывести stars") for _ in range(5)))
+            assert sorted(answers) == [False, False, False, False, True]
+
+            await asyncio.gather(*(set_user_last_answer(sqlite_path, uid, "a1", "q") for uid in range(20)))
+            rows = await asyncio.gather(*(get_user_last_answer(sqlite_path, uid) for uid in range(20)))
+            assert all(row and row["article_id"] == "a1" for row in rows)
+
+            async with manager.reader() as db:
+                assert (await db.execute_fetchall("PRAGMA busy_timeout"))[0][0] == 1234
+                assert (await db.execute_fetchall("PRAGMA synchronous"))[0][0] == 1
+            assert manager._readers.qsize() == 2
+        finally:
+            await close_connection_manager(sqlite_path)
+        assert get_connection_manager(sqlite_path) is None
+        assert await get_user_last_answer(sqlite_path, 3) is not None
+
+    asyncio.run(scenario())
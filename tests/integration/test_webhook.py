@@ -0,0 +1,127 @@
+import asyncio
+import socket
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.base import BaseSession
+from aiogram.types import Message
+from aiohttp import ClientSession
+from aiohttp.test_utils import TestClient, TestServer
+
+from tgtaps_support_bot.presentation.telegram.webhook import (
+    SECRET_HEADER,
+    WebhookHandler,
+    WebhookServer,
+    build_webhook_app,
+)
+
+
+class _RecordingSession(BaseSession):
+    def __init__(self, events: list[str]):
+        super().__init__()
+        self.events = events
+
+    async def make_request(self, bot, method, timeout=None):
+        self.events.append(f"send:{getattr(method, 'text', type(method).__name__)}")
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self):
+        self.events.append("session_closed")
+
+
+def _update(update_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": 5, "type": "private"},
+            "from": {"id": 5, "is_bot": False, "first_name": "u"},
+            "text": text,
+        },
+    }
+
+
+def test_webhook_acks_fast_validates_and_drains_before_shutdown():
+    events: list[str] = []
+    bot = Bot("42:TEST", session=_RecordingSession(events))
+    dp = Dispatcher()
+    router = Router()
+
+    @router.message()
+    async def echo(message: Message) -> None:
+        await asyncio.sleep(0.05)
+        await message.answer(message.text)
+
+    async def on_shutdown() -> None:
+        events.append("dispatcher_shutdown")
+
+    dp.include_router(router)
+    dp.shutdown.register(on_shutdown)
+    handler = WebhookHandler(dp, bot, secret_token="s3cret", drain_timeout_sec=5)
+    app = build_webhook_app(bot, dp, handler, path="/hook")
+
+    async def scenario() -> list[int]:
+        client = TestClient(TestServer(app))
+        await client.start_server()
+        statuses = [
+            (await client.post("/hook", json=_update(1, "a"))).status,
+            (await client.post("/hook", data="{", headers={SECRET_HEADER: "s3cret"})).status,
+        ]
+        for update_id in (2, 3):
+            response = await client.post("/hook", json=_update(update_id, "q"), headers={SECRET_HEADER: "s3cret"})
+            statuses.append(response.status)
+        # Acknowledged before the handlers finish.
+        assert handler.stats()["in_flight"] == 2 and events == []
+        await client.close()
+        return statuses
+
+    assert asyncio.run(scenario()) == [401, 400, 200, 200]
+    assert events == ["send:q", "send:q", "dispatcher_shutdown", "session_closed"]
+    assert handler.stats()["unauthorized"] == 1 and handler.stats()["malformed"] == 1
+
+
+def test_server_refuses_new_deliveries_while_draining():
+    events: list[str] = []
+    bot = Bot("42:TEST", session=_RecordingSession(events))
+    dp = Dispatcher()
+    router = Router()
+
+    @router.message()
+    async def echo(message: Message) -> None:
+        await asyncio.sleep(0.2)
+        await message.answer(message.text)
+
+    dp.include_router(router)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = WebhookServer(
+        bot,
+        dp,
+        url=f"http://127.0.0.1:{port}",
+        path="/hook",
+        secret_token="s3cret",
+        host="127.0.0.1",
+        port=port,
+    )
+
+    async def scenario() -> list[int]:
+        await server.start()
+        url = f"http://127.0.0.1:{port}/hook"
+        headers = {SECRET_HEADER: "s3cret"}
+        # A fresh connection per delivery, as after the keep-alive ones are gone.
+        async with ClientSession() as http, http.post(url, json=_update(1, "a"), headers=headers) as response:
+            statuses = [response.status]
+        stopping = asyncio.create_task(server.stop())
+        await asyncio.sleep(0.05)
+        async with ClientSession() as http, http.post(url, json=_update(2, "b"), headers=headers) as response:
+            statuses.append(response.status)
+        await stopping
+        return statuses
+
+    assert asyncio.run(scenario()) == [200, 503]
+    assert events == ["send:SetWebhook", "send:a", "session_closed"]
+    assert server.handler.stats()["refused"] == 1
@@ -0,0 +1,41 @@
+import asyncio
+import sqlite3
+
+from tgtaps_support_bot.infrastructure.persistence.sqlite_gateway import ensure_db
+from tgtaps_support_bot.infrastructure.persistence.write_behind import WriteBehindQueue
+
+
+def _event(i: int) -> dict:
+    return {
+        "user_id": i,
+        "chat_id": 1,
+        "is_group": False,
+        "question": f"вопрос {i}",
+        "question_norm": f"вопрос {i}",
+        "matched_article_id": None,
+        "score": None,
+        "match_reason": "not_found",
+        "category": None,
+    }
+
+
+def test_write_behind_batches_and_flushes_on_stop(tmp_path):
+    sqlite_path = (tmp_path / "kb.sqlite3").as_posix()
+
+    async def scenario() -> WriteBehindQueue:
+        await ensure_db(sqlite_path)
+        queue = WriteBehindQueue(sqlite_path, batch_rows=25, flush_interval_ms=10_000, max_queue=10)
+        await queue.start()
+        await asyncio.gather(*(queue.log_query_event(**_event(i)) for i in range(120)))
+        await queue.log_unknown_question(user_id=7, chat_id=1, is_group=False, question="Что это?")
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(scenario())
+    stats = queue.stats()
+    assert stats["flushed_rows"] == 121 and stats["failed_rows"] == 0 and stats["depth"] == 0
+    assert stats["backpressure_waits"] > 0
+    assert stats["max_batch_size"] <= 25
+    with sqlite3.connect(sqlite_path) as db:
+        assert db.execute("SELECT COUNT(*) FROM query_logs").fetchone()[0] == 120
+        assert db.execute("SELECT question_norm FROM kb_unknown_questions").fetchone()[0] == "что это"
@@ -0,0 +1,70 @@
+import asyncio
+
+from tests.conftest import FakeClock, make_row
+from tgtaps_support_bot.application.use_cases.group_pipeline import GroupMessagePipeline
+from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+from tgtaps_support_bot.infrastructure.bot.anti_spam import GroupAntiSpam
+from tgtaps_support_bot.infrastructure.search.search_executor import AsyncSearchService
+
+
+def test_cheap_gates_run_before_search():
+    engine = SearchEngine([make_row("s1", "как вывести stars"), make_row("w1", "как подключить кошелек")])
+    service = AsyncSearchService(engine, executor_kind="inline")
+    clock = FakeClock(100.0)
+    pipeline = GroupMessagePipeline(
+        search_service=service,
+        anti_spam=GroupAntiSpam(":memory:", ttl_sec=900, persist=False),
+        min_confidence=55.0,
+        chat_cooldown_sec=5.0,
+        clock=clock,
+    )
+
+    async def scenario() -> None:
+        assert await pipeline.process(1, "ок") is None
+        assert await pipeline.process(1, "ок спасибо всем") is None
+        matched = await pipeline.process(1, "Как вывести stars?")
+        assert matched.status == "matched" and matched.result.row["id"] == "s1"
+        pipeline.record_reply(1)
+        assert await pipeline.process(1, "как подключить кошелек?") is None
+        assert (await pipeline.process(2, "как подключить кошелек?")).status == "matched"
+        clock.now += 6
+        assert await pipeline.process(1, "как вывести stars?") is None
+
+    asyncio.run(scenario())
+    stats = pipeline.stats()
+    assert {k: stats[k] for k in ("seen", "searched", "min_tokens", "not_question", "cooldown", "duplicate")} == {
+        "seen": 6,
+        "searched": 2,
+        "min_tokens": 1,
+        "not_question": 1,
+        "cooldown": 1,
+        "duplicate": 1,
+    }
+    assert stats["per_chat"][1]["searched"] == 1 and stats["per_chat"][2]["searched"] == 1
+
+
+def test_per_chat_state_is_bounded():
+    engine = SearchEngine([make_row("s1", "как вывести stars")])
+    clock = FakeClock(100.0)
+    pipeline = GroupMessagePipeline(
+        search_service=AsyncSearchService(engine, executor_kind="inline"),
+        anti_spam=GroupAntiSpam(":memory:", ttl_sec=900, persist=False),
+        min_confidence=55.0,
+        chat_cooldown_sec=5.0,
+        max_chats=2,
+        clock=clock,
+    )
+
+    async def scenario() -> None:
+        for chat_id in (1, 2, 1, 3):
+            await pipeline.process(chat_id, "ок")
+        for chat_id in (1, 2, 3):
+            pipeline.record_reply(chat_id)
+        clock.now += 6
+        pipeline.record_reply(4)
+
+    asyncio.run(scenario())
+    stats = pipeline.stats()
+    assert list(stats["per_chat"]) == [1, 3] and stats["evicted_chats"] == 1
+    assert stats["seen"] == 4
+    assert list(pipeline._last_reply) == [4]
@@ -0,0 +1,38 @@
+from tests.conftest import FakeClock, make_row
+from tgtaps_support_bot.domain.services.search_cache import SearchResultCache
+from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+
+
+def test_cache_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = SearchResultCache(max_entries=2, ttl_sec=10, clock=clock)
+    cache.put(("a", None, 5), "v1", [1])
+    cache.put(("b", None, 5), "v1", [2])
+    assert cache.get(("a", None, 5), "v1") == [1]
+    cache.put(("c", None, 5), "v1", [3])
+    assert cache.get(("b", None, 5), "v1") is None
+    assert cache.evictions == 1
+
+    clock.now = 11
+    assert cache.get(("a", None, 5), "v1") is None
+    assert cache.get(("c", None, 5), "v2") is None
+    assert cache.stats() == {"size": 0, "max_entries": 2, "hits": 1, "misses": 3, "evictions": 1, "expirations": 2}
+
+
+def test_engine_serves_repeated_queries_from_cache_per_kb_version():
+    cache = SearchResultCache(max_entries=16, ttl_sec=60)
+    rows = [make_row("w1", "как подключить кошелек", category="wallet", tags=["wallet"])]
+    engine = SearchEngine(rows, cache=cache)
+
+    first = engine.search("Как подключить кошелек в боте?", category_hint="wallet")
+    second = engine.search("как подключить  кошелек в боте", category_hint="wallet")
+    assert [r.row["id"] for r in second] == [r.row["id"] for r in first]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    edited = make_row(
+        "w1", "как подключить кошелек", category="wallet", tags=["wallet"], updated_at="2026-02-01T00:00:00+00:00"
+    )
+    reloaded = SearchEngine([edited], cache=cache)
+    assert reloaded.kb_version != engine.kb_version
+    reloaded.search("как подключить кошелек в боте", category_hint="wallet")
+    assert cache.misses == 2
@@ -48,3 +48,77 @@ def test_exact_alias_priority():
     assert res
     assert res[0].row["id"] == "a2"
     assert res[0].reason == "exact_alias"
+
+
+def test_keywords_fuzzy_penalizes_deprecated_rows():
+    rows = [
+        _row(q_norm="как подключить ton кошелек", aliases=[], status="deprecated", row_id="old"),
+        _row(q_norm="как подключить ton кошелек в боте", aliases=["подключение кошелька"], row_id="new"),
+    ]
+    engine = SearchEngine(rows)
+    res = engine.search("подключить ton кошелек")
+    assert res
+    assert res[0].row["id"] == "new"
+    assert res[0].reason == "keywords_fuzzy"
+    assert all(r.row["id"] != "old" or r.score < res[0].score for r in res)
+
+
+def test_candidate_pruning_uses_shared_tokens_and_falls_back_to_full_scan():
+    rows = [
+        _row(q_norm="кошелек", aliases=["wallet connect"], row_id="w1"),
+        _row(q_norm="реферальная программа", aliases=[], row_id="r1"),
+    ]
+    engine = SearchEngine(rows, candidate_budget=1)
+    assert [rows[i]["id"] for i in engine.candidate_ids(frozenset({"wallet", "программа"}))] == ["w1"]
+    assert engine.candidate_ids(frozenset({"кошелёк"})) == []
+
+    res = engine.search("кошелёк")
+    assert res
+    assert res[0].row["id"] == "w1"
+    assert res[0].reason == "keywords_fuzzy"
+
+
+def test_batch_mode_matches_loop_mode():
+    rows = [
+        _row(q_norm="как подключить ton кошелек", aliases=["wallet connect"], category="wallet", row_id="w1"),
+        _row(q_norm="как вывести stars", aliases=[], category="payments", row_id="p1"),
+        _row(q_norm="как подключить оплату stars", aliases=["оплата"], status="deprecated", row_id="p2"),
+        _row(q_norm="реферальная ссылка", aliases=["invite", "рефералка"], category="referrals", row_id="r1"),
+    ]
+    loop = SearchEngine(rows, mode="loop")
+    batch = SearchEngine(rows, mode="batch", workers=2)
+    for query, hint in [("как подключить stars", None), ("подключить кошелек", "wallet"), ("payments", "payments")]:
+        expected = [(r.row["id"], r.score, r.reason) for r in loop.search(query, category_hint=hint)]
+        assert [(r.row["id"], r.score, r.reason) for r in batch.search(query, category_hint=hint)] == expected
+
+
+def test_top_k_selection_keeps_earlier_rows_on_ties():
+    rows = [
+        _row(q_norm="как вывести stars на кошелек", aliases=["вывод stars"], row_id=f"s{i}")
+        for i in range(4)
+    ]
+    engine = SearchEngine(rows)
+    full = engine.search("вывести stars", top_k=4)
+    assert [r.row["id"] for r in full] == ["s0", "s1", "s2", "s3"]
+    top = engine.search("вывести stars", top_k=2)
+    assert [(r.row["id"], r.score) for r in top] == [(r.row["id"], r.score) for r in full[:2]]
+
+
+def test_pruned_search_returns_the_full_scan_results():
+    rows = [
+        _row(q_norm="подключить бота", aliases=[], row_id="b1"),
+        _row(q_norm="подключение кошелька", aliases=["подключение тон кошелька"], row_id="w1"),
+        _row(q_norm="как вывести stars", aliases=["вывод stars"], row_id="s1"),
+    ]
+    full = SearchEngine(rows)
+    assert [r.row["id"] for r in full.search("подключить кошелек")] == ["w1", "b1"]
+
+    pruned = [
+        SearchEngine(rows, candidate_budget=10, full_scan_below=55.0),
+        SearchEngine(rows, candidate_budget=10, trigram_budget=10),
+        SearchEngine(rows, candidate_budget=10, trigram_budget=10, full_scan_below=55.0, mode="batch"),
+    ]
+    for query in ("подключить кошелек", "подключить бота", "вывести stars", "кошелька подключение тон"):
+        expected = [(r.row["id"], r.score, r.reason) for r in full.search(query)]
+        for engine in pruned:
+            assert [(r.row["id"], r.score, r.reason) for r in engine.search(query)] == expected
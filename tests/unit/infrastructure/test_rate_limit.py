@@ -0,0 +1,128 @@
+import asyncio
+from datetime import UTC, datetime
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.types import CallbackQuery, Chat, Message, User
+
+from tests.conftest import FakeClock
+from tgtaps_support_bot.infrastructure.bot.rate_limit import BucketLimit, RateLimiter
+from tgtaps_support_bot.infrastructure.bot.send_queue import OutboundQueue
+from tgtaps_support_bot.presentation.telegram.rate_limit_middleware import (
+    RateLimitMiddleware,
+)
+
+
+def _limiter(clock: FakeClock) -> RateLimiter:
+    return RateLimiter(
+        user=BucketLimit(rate=1.0, burst=2),
+        chat=BucketLimit(rate=1.0, burst=3),
+        global_=BucketLimit(rate=100.0, burst=100),
+        sweep_interval_sec=5.0,
+        clock=clock,
+    )
+
+
+def test_buckets_limit_user_then_chat_and_refill():
+    clock = FakeClock()
+    limiter = _limiter(clock)
+    assert [limiter.acquire(1, 10) for _ in range(3)] == [None, None, "user"]
+    assert limiter.acquire(2, 10) is None
+    assert limiter.acquire(3, 10) == "chat"
+    clock.now += 1.0
+    assert limiter.acquire(1, 20) is None
+    clock.now += 10.0
+    limiter.acquire(4, 30)
+    assert len(limiter) == 3
+    assert limiter.stats() == {
+        "allowed": 5,
+        "rejected_global": 0,
+        "rejected_chat": 1,
+        "rejected_user": 1,
+        "notices": 0,
+        "buckets": 3,
+    }
+
+
+def _message(message_id: int, chat: Chat) -> Message:
+    return Message(
+        message_id=message_id,
+        date=datetime.now(UTC),
+        chat=chat,
+        from_user=User(id=7, is_bot=False, first_name="u"),
+        text="как вывести stars?",
+    )
+
+
+async def _handler(event, data):
+    return "ok"
+
+
+def test_middleware_charges_group_messages_to_the_chat_only():
+    limiter = _limiter(FakeClock())
+    outbox = OutboundQueue()
+    middleware = RateLimitMiddleware(limiter, outbox)
+    messages = [_message(i, Chat(id=-100, type="supergroup")) for i in range(4)]
+    handled: list[int] = []
+
+    async def handler(event, data):
+        handled.append(event.message_id)
+        return "ok"
+
+    async def scenario() -> list:
+        return [await middleware(handler, message, {}) for message in messages]
+
+    # User 7's burst is 2, but in a group only the chat's burst of 3 applies.
+    assert asyncio.run(scenario()) == ["ok", "ok", "ok", None]
+    assert handled == [0, 1, 2]
+    assert limiter.stats()["rejected_chat"] == 1 and limiter.stats()["rejected_user"] == 0
+    assert len(limiter) == 1 and outbox.enqueued == 0
+
+
+def test_middleware_queues_one_private_notice_per_interval():
+    limiter = _limiter(FakeClock())
+    outbox = OutboundQueue()
+    middleware = RateLimitMiddleware(limiter, outbox)
+    chat = Chat(id=7, type="private")
+
+    async def scenario() -> list:
+        return [await middleware(_handler, _message(i, chat), {}) for i in range(4)]
+
+    assert asyncio.run(scenario()) == ["ok", "ok", None, None]
+    # The notice waits in the outbox with the bot's other replies instead of being sent inline.
+    assert outbox.enqueued == 1 and limiter.stats()["notices"] == 1
+
+
+class _RecordingSession(BaseSession):
+    def __init__(self):
+        super().__init__()
+        self.methods: list[str] = []
+
+    async def make_request(self, bot, method, timeout=None):
+        self.methods.append(type(method).__name__)
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def test_middleware_answers_throttled_callbacks_directly_once_per_interval():
+    limiter = _limiter(FakeClock())
+    outbox = OutboundQueue()
+    middleware = RateLimitMiddleware(limiter, outbox)
+    session = _RecordingSession()
+    bot = Bot("42:TEST", session=session)
+    user = User(id=7, is_bot=False, first_name="u")
+    callbacks = [
+        CallbackQuery(id=str(i), from_user=user, chat_instance="c", data="cat:wallet").as_(bot) for i in range(5)
+    ]
+
+    async def scenario() -> list:
+        return [await middleware(_handler, callback, {}) for callback in callbacks]
+
+    assert asyncio.run(scenario()) == ["ok", "ok", None, None, None]
+    # One alert for the flood, sent at once: callback answers are not chat sends and expire quickly.
+    assert session.methods == ["AnswerCallbackQuery"] and outbox.enqueued == 0
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from tests.conftest import make_row
+from tgtaps_support_bot.domain.services.search_engine import SearchEngine
+from tgtaps_support_bot.infrastructure.search.search_executor import AsyncSearchService
+
+ROWS = [
+    make_row("w1", "как подключить кошелек", aliases=["wallet connect"]),
+    make_row("s1", "как вывести stars", aliases=["вывод звезд"]),
+    make_row("r1", "как включить реферальную систему", aliases=["рефералка"]),
+]
+REQUESTS = [("подключить кошелек", None, 5), ("рефералка", None, 5), ("вывести stars на карту", "payments", 3)]
+
+
+@pytest.mark.parametrize("executor_kind", ["inline", "thread", "process"])
+def test_executor_kinds_return_engine_results(executor_kind):
+    engine = SearchEngine(ROWS)
+    expected = [[(r.row["id"], r.score, r.reason) for r in engine.search(q, h, k)] for q, h, k in REQUESTS]
+
+    async def scenario() -> None:
+        service = AsyncSearchService(engine, executor_kind=executor_kind, max_workers=2)
+        try:
+            batch = await service.search_many(REQUESTS)
+            single = await service.search(*REQUESTS[0])
+        finally:
+            await service.close()
+        assert [[(r.row["id"], r.score, r.reason) for r in res] for res in batch] == expected
+        assert [(r.row["id"], r.score, r.reason) for r in single] == expected[0]
+
+    asyncio.run(scenario())
@@ -0,0 +1,97 @@
+import asyncio
+import json
+from datetime import UTC, datetime
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.types import Chat, Message
+
+from tgtaps_support_bot.infrastructure.bot.send_queue import OutboundQueue
+
+
+class _FloodSession(BaseSession):
+    def __init__(self, flood_chat_id: int):
+        super().__init__()
+        self.flood_chat_id = flood_chat_id
+        self.sent: list[tuple[int, str]] = []
+
+    async def make_request(self, bot, method, timeout=None):
+        if method.chat_id == self.flood_chat_id:
+            self.flood_chat_id = None
+            content = json.dumps(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                }
+            )
+            self.check_response(bot, method, 429, content)
+        self.sent.append((method.chat_id, method.text))
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def _message(bot: Bot, chat_id: int, chat_type: str) -> Message:
+    return Message(
+        message_id=1,
+        date=datetime.now(UTC),
+        chat=Chat(id=chat_id, type=chat_type),
+        text="q",
+    ).as_(bot)
+
+
+def test_private_first_and_retry_after_pauses_only_that_chat():
+    session = _FloodSession(flood_chat_id=1)
+    bot = Bot("42:TEST", session=session)
+    outbox = OutboundQueue(per_chat_interval_sec=0.01, group_interval_sec=0.01, global_rate=1000, max_in_flight=1)
+    group, first, second = _message(bot, -100, "supergroup"), _message(bot, 1, "private"), _message(bot, 2, "private")
+
+    async def scenario() -> None:
+        assert outbox.reply(group, "hint")
+        assert outbox.answer(first, "a1")
+        assert outbox.answer(first, "a2")
+        assert outbox.answer(second, "b1")
+        await outbox.start()
+        await outbox.stop()
+
+    asyncio.run(scenario())
+    assert session.sent == [(2, "b1"), (-100, "hint"), (1, "a1"), (1, "a2")]
+    stats = outbox.stats()
+    assert (stats["sent"], stats["retry_after"], stats["failed"], stats["pending"]) == (4, 1, 0, 0)
+    assert stats["max_wait_ms"] >= 1000
+
+
+def test_queue_is_bounded_and_keeps_room_for_private_answers():
+    bot = Bot("42:TEST", session=_FloodSession(flood_chat_id=0))
+    outbox = OutboundQueue(max_pending=8, max_per_chat=2)
+    assert [outbox.reply(_message(bot, -i, "group"), "hint") for i in range(1, 8)] == [True] * 6 + [False]
+    assert [outbox.answer(_message(bot, 7, "private"), t) for t in "abc"] == [True, True, False]
+    assert not outbox.answer(_message(bot, 8, "private"), "d")
+    assert outbox.stats()["dropped"] == 3
+
+
+def test_enqueue_during_drain_is_sent_and_after_stop_is_refused():
+    session = _FloodSession(flood_chat_id=0)
+    bot = Bot("42:TEST", session=session)
+    outbox = OutboundQueue(per_chat_interval_sec=0.05, global_rate=1000)
+    chat = _message(bot, 1, "private")
+
+    async def scenario() -> list[bool]:
+        await outbox.start()
+        accepted = [outbox.answer(chat, "a1"), outbox.answer(chat, "a2")]
+        stopping = asyncio.create_task(outbox.stop())
+        await asyncio.sleep(0.01)
+        accepted.append(outbox.answer(chat, "a3"))
+        await stopping
+        accepted.append(outbox.answer(chat, "late"))
+        return accepted
+
+    assert asyncio.run(scenario()) == [True, True, True, False]
+    assert session.sent == [(1, "a1"), (1, "a2"), (1, "a3")]
+    assert outbox.stats()["dropped"] == 1 and outbox.stats()["pending"] == 0